@@ -0,0 +1,111 @@
+"""
+Login storm benchmark.
+
+Fires concurrent /api/auth/login requests while probing /health/ and
+reports probe latency percentiles, once with bcrypt run inline on the event
+loop (previous behaviour) and once offloaded to the hashing thread pool.
+
+    cd pyapp && python benchmarks/bench_login_storm.py [logins] [concurrency]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+_db = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db.name}")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from httpx import AsyncClient  # noqa: E402
+
+from pyapp.core.database import Base, engine  # noqa: E402
+from pyapp.main import app  # noqa: E402
+from pyapp.modules.auth import security  # noqa: E402
+
+EMAIL = "storm@example.com"
+PASSWORD = "correct horse battery staple"
+
+
+async def _inline_verify(plain_password: str, hashed_password: str) -> bool:
+    return security.verify_password(plain_password, hashed_password)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(client, logins, concurrency):
+    done = asyncio.Event()
+    probes = []
+
+    async def probe():
+        # Latency is measured from when the probe was due, so time spent
+        # waiting for a blocked event loop counts against it
+        interval = 0.005
+        while not done.is_set():
+            due = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            await client.get("/health/")
+            probes.append((time.perf_counter() - due) * 1000)
+
+    sem = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with sem:
+            response = await client.post(
+                "/api/auth/login", data={"username": EMAIL, "password": PASSWORD}
+            )
+            assert response.status_code == 200, response.text
+
+    prober = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await prober
+    return elapsed, probes
+
+
+def report(label, logins, elapsed, probes):
+    print(
+        f"{label}: {logins / elapsed:.1f} logins/s; /health/ probes n={len(probes)} "
+        f"p50={statistics.median(probes):.1f}ms "
+        f"p99={percentile(probes, 99):.1f}ms max={max(probes):.1f}ms"
+    )
+
+
+async def amain(logins, concurrency):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncClient(app=app, base_url="http://bench") as client:
+        await client.post("/api/auth/register", json={"email": EMAIL, "password": PASSWORD})
+
+        offloaded = security.verify_password_async
+        security.verify_password_async = _inline_verify
+        try:
+            report("inline   ", logins, *await run(client, logins, concurrency))
+        finally:
+            security.verify_password_async = offloaded
+        report("offloaded", logins, *await run(client, logins, concurrency))
+
+    security.shutdown_hash_executor()
+    await engine.dispose()
+
+
+def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    try:
+        asyncio.run(amain(logins, concurrency))
+    finally:
+        os.unlink(_db.name)
+    print("BENCH DONE")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,19 +3,19 @@ from typing import Annotated
 from fastapi import Depends, Header, HTTPException
 
 from pyapp.services.ai.base import AIService
-from pyapp.services.ai.deepseek import DeepSeekService
-from pyapp.services.ai.nanobanana import NanoBananaService
+from pyapp.services.ai.deepseek import deepseek_service
+from pyapp.services.ai.nanobanana import nanobanana_service
 from pyapp.services.image.renderer import PlaywrightRenderer, renderer
 
 
 async def get_ai_service(x_model: Annotated[str | None, Header()] = "deepseek") -> AIService:
     """
     Factory dependency to get AI service based on header.
-    Defaults to DeepSeek.
+    Defaults to DeepSeek. Services are singletons sharing pooled clients.
     """
     if x_model == "nanobanana":
-        return NanoBananaService()
-    return DeepSeekService()
+        return nanobanana_service
+    return deepseek_service
 
 
 def get_image_renderer() -> PlaywrightRenderer:
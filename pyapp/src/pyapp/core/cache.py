@@ -0,0 +1,218 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional
+
+from pyapp.core.config import settings, logger
+
+
+class Cache(ABC):
+    """Async bytes cache with per-entry TTL"""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Store value; ttl in seconds (None = backend default, 0 = no expiry)"""
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class MemoryLRUCache(Cache):
+    """
+    Per-process LRU bounded by total value bytes and entry count.
+    Expired entries are dropped lazily on access and before eviction.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        max_entries: int = 0,
+        default_ttl: float = 0,
+    ):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._data: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self.bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at and expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        size = len(value)
+        if size > self.max_bytes:
+            # Never cache something that would flush the whole cache
+            self._remove(key)
+            return
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else 0.0
+        self._remove(key)
+        self._data[key] = (value, expires_at)
+        self.bytes += size
+        self._evict()
+
+    async def delete(self, key: str) -> None:
+        self._remove(key)
+
+    async def clear(self) -> None:
+        self._data.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **super().stats(),
+            "entries": len(self._data),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _remove(self, key: str) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.bytes -= len(entry[0])
+
+    def _evict(self) -> None:
+        over_entries = self.max_entries and len(self._data) > self.max_entries
+        if self.bytes <= self.max_bytes and not over_entries:
+            return
+        now = time.monotonic()
+        for key in [k for k, (_, exp) in self._data.items() if exp and exp <= now]:
+            self._remove(key)
+            self.expirations += 1
+        while self._data and (
+            self.bytes > self.max_bytes
+            or (self.max_entries and len(self._data) > self.max_entries)
+        ):
+            key, (value, _) = self._data.popitem(last=False)
+            self.bytes -= len(value)
+            self.evictions += 1
+
+
+class RedisCache(Cache):
+    """
+    Redis-backed cache shared by all uvicorn workers.
+    Connection failures degrade to cache misses rather than request errors.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        namespace: str,
+        default_ttl: float = 0,
+        client: Any = None,
+    ):
+        super().__init__()
+        if client is None:
+            import redis.asyncio as redis
+            client = redis.from_url(url)
+        self._client = client
+        self.prefix = f"{namespace}:"
+        self.default_ttl = default_ttl
+        self.errors = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            value = await self._client.get(self.prefix + key)
+        except Exception as e:
+            self._on_error("get", e)
+            value = None
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        try:
+            # Milliseconds, so sub-second TTLs still expire (0 = no expiry)
+            px = max(1, int(ttl * 1000)) if ttl > 0 else None
+            await self._client.set(self.prefix + key, value, px=px)
+        except Exception as e:
+            self._on_error("set", e)
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self._client.delete(self.prefix + key)
+        except Exception as e:
+            self._on_error("delete", e)
+
+    async def clear(self) -> None:
+        try:
+            async for key in self._client.scan_iter(match=self.prefix + "*"):
+                await self._client.delete(key)
+        except Exception as e:
+            self._on_error("clear", e)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    def stats(self) -> dict[str, Any]:
+        return {**super().stats(), "errors": self.errors}
+
+    def _on_error(self, op: str, e: Exception) -> None:
+        self.errors += 1
+        logger.warning(f"Redis cache {op} failed: {e}")
+
+
+def create_cache(namespace: str) -> Cache:
+    """Build the cache configured by CACHE_BACKEND ("memory" or "redis")"""
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCache(
+            settings.REDIS_URL,
+            namespace=f"{settings.CACHE_KEY_PREFIX}:{namespace}",
+            default_ttl=settings.CACHE_TTL_SECONDS,
+        )
+    if settings.CACHE_BACKEND != "memory":
+        logger.warning(f"Unknown CACHE_BACKEND {settings.CACHE_BACKEND!r}, using memory")
+    return MemoryLRUCache(
+        max_bytes=settings.CACHE_MAX_BYTES,
+        max_entries=settings.CACHE_MAX_ENTRIES,
+        default_ttl=settings.CACHE_TTL_SECONDS,
+    )
@@ -1,11 +1,14 @@
 import logging
 import sys
-import json
 from typing import Any, List, Optional, Union
 
+import orjson
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import PostgresDsn, RedisDsn, field_validator
 
+from pyapp.core.log_sink import QueueLogHandler
+from pyapp.core.metrics import metrics
+
 
 class Settings(BaseSettings):
     """Application Settings"""
@@ -28,23 +31,64 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str = "changeme_super_secret"
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_HASH_WORKERS: int = 0  # bcrypt thread pool size (0 = min(4, CPU cores))
+    AUTH_PRINCIPAL_CACHE_TTL: float = 30.0  # Seconds to reuse a resolved user (0 = disabled)
+    AUTH_PRINCIPAL_CACHE_SIZE: int = 10000
+    AUTH_STATELESS: bool = False  # Trust signed token claims instead of loading the user
     
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./sql_app.db"
+    DATABASE_READ_URL: Optional[str] = None  # Read replica for tagged read-only queries
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a pooled connection
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a connection is replaced (-1 = never)
+    DB_POOL_PRE_PING: bool = True
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
 
+    # Cache
+    CACHE_BACKEND: str = "memory"  # "memory" (per worker) or "redis" (shared)
+    CACHE_KEY_PREFIX: str = "gzh2xhs"
+    CACHE_TTL_SECONDS: int = 3600  # 0 = no expiry
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # Memory backend size bound
+    CACHE_MAX_ENTRIES: int = 10000  # Memory backend entry bound (0 = unbounded)
+
     # AI Providers
     DEEPSEEK_API_KEY: str = ""
     DEEPSEEK_API_URL: str = "https://api.deepseek.com/chat/completions"
     
     APICORE_AI_KEY: Optional[str] = None
     NANOBANANA_API_URL: str = "https://kg-api.cloud/v1/chat/completions"
+
+    # Outbound HTTP (shared provider clients)
+    HTTP2_ENABLED: bool = True
+    HTTP_TIMEOUT: float = 60.0
+    HTTP_CONNECT_TIMEOUT: float = 10.0
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0  # Seconds an idle connection is kept open
     
     # Image Generation
-    IMG_MAX_CONCURRENCY: int = 2
+    IMG_BROWSER_COUNT: int = 1  # Browser processes to shard renders over (0 = one per CPU core)
+    IMG_MAX_CONCURRENCY: int = 2  # Pooled pages (concurrent renders) per browser
+    IMG_PAGE_MAX_RENDERS: int = 200  # Recycle a pooled page after N renders (0 = never)
     PLAYWRIGHT_TIMEOUT: int = 30000
+    IMG_RENDER_CACHE_ENABLED: bool = True
+    IMG_RENDER_CACHE_MEMORY_BYTES: int = 128 * 1024 * 1024
+    IMG_RENDER_CACHE_DIR: str = ""  # On-disk PNG tier shared by workers ("" = disabled)
+    IMG_RENDER_CACHE_DISK_BYTES: int = 2 * 1024 * 1024 * 1024  # 0 = unbounded
+
+    # Batch export
+    EXPORT_MAX_CARDS: int = 50
+    EXPORT_CONCURRENCY: int = 0  # Concurrent renders per export (0 = every pooled page)
+
+    # Logging (records are written by a background thread)
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_QUEUE_POLICY: str = "drop"  # When the queue is full: "drop" or "block"
+    LOG_BLOCK_TIMEOUT: float = 1.0  # Seconds "block" waits before dropping anyway
+    LOG_BATCH_SIZE: int = 512  # Max records per write
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -57,7 +101,7 @@ settings = Settings()
 
 
 class JSONFormatter(logging.Formatter):
-    def format(self, record: logging.LogRecord) -> str:
+    def to_dict(self, record: logging.LogRecord) -> dict[str, Any]:
         log_record = {
             "timestamp": self.formatTime(record, self.datefmt),
             "level": record.levelname,
@@ -72,8 +116,13 @@ class JSONFormatter(logging.Formatter):
             
         if record.exc_info:
             log_record["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_record["exception"] = record.exc_text
             
-        return json.dumps(log_record)
+        return log_record
+
+    def format(self, record: logging.LogRecord) -> str:
+        return orjson.dumps(self.to_dict(record), default=str).decode("utf-8")
 
 
 def setup_logging() -> None:
@@ -84,14 +133,31 @@ def setup_logging() -> None:
     # Remove existing handlers
     for handler in root.handlers[:]:
         root.removeHandler(handler)
+        handler.close()
     
-    handler = logging.StreamHandler(sys.stdout)
-    formatter = JSONFormatter()
-    handler.setFormatter(formatter)
+    handler = QueueLogHandler(
+        JSONFormatter().to_dict,
+        stream=sys.stdout,
+        max_queue=settings.LOG_QUEUE_SIZE,
+        policy=settings.LOG_QUEUE_POLICY,
+        block_timeout=settings.LOG_BLOCK_TIMEOUT,
+        batch_size=settings.LOG_BATCH_SIZE,
+    )
     root.addHandler(handler)
+    metrics.register("logging", handler.stats)
     
     # Set level for libraries
     logging.getLogger("uvicorn.access").setLevel(logging.INFO)
     logging.getLogger("httpx").setLevel(logging.WARNING)
 
+
+def shutdown_logging() -> None:
+    """Flush queued records (call on shutdown)"""
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, QueueLogHandler):
+            root.removeHandler(handler)
+            handler.close()
+    metrics.unregister("logging")
+
 logger = logging.getLogger("pyapp")
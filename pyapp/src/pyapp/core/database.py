@@ -1,26 +1,90 @@
-from typing import AsyncGenerator
+import time
+from typing import Any, AsyncGenerator, Optional
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from pyapp.core.config import settings
+from pyapp.core.metrics import TimingStat, metrics
+
+# Execution option marking a SELECT as safe to serve from the read replica
+READ_REPLICA = "read_replica"
 
 
 class Base(DeclarativeBase):
     pass
 
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True,
-    pool_pre_ping=True
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection"""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.checkout_wait = TimingStat()
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.checkout_wait.observe((time.perf_counter() - start) * 1000)
+
+
+def _engine_kwargs(url: str) -> dict[str, Any]:
+    kwargs: dict[str, Any] = {
+        "echo": settings.DEBUG,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory SQLite uses a single static connection; no pool to tune
+        return kwargs
+    kwargs.update(
+        poolclass=TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    return kwargs
+
+
+engine = create_async_engine(settings.DATABASE_URL, **_engine_kwargs(settings.DATABASE_URL))
+
+read_engine: Optional[AsyncEngine] = (
+    create_async_engine(settings.DATABASE_READ_URL, **_engine_kwargs(settings.DATABASE_READ_URL))
+    if settings.DATABASE_READ_URL
+    else None
 )
 
 
+class RoutingSession(Session):
+    """
+    Sends statements tagged with the READ_REPLICA execution option to the
+    replica engine when one is configured; everything else (writes,
+    flushes, untagged reads) stays on the primary.
+    """
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kw: Any) -> Any:
+        if (
+            read_engine is not None
+            and not self._flushing
+            and clause is not None
+            and clause.get_execution_options().get(READ_REPLICA)
+        ):
+            return read_engine.sync_engine
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+# Sessions are cheap to create: no connection is checked out of the pool
+# until the first statement executes, so endpoints that never query (or
+# are served from the principal cache) never touch the pool.
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
     expire_on_commit=False,
     autoflush=False
 )
@@ -33,3 +97,27 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             yield session
         finally:
             await session.close()
+
+
+def _pool_stats(engine: AsyncEngine) -> dict[str, Any]:
+    pool = engine.sync_engine.pool
+    stats: dict[str, Any] = {"status": pool.status()}
+    if isinstance(pool, TimedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+            checkout_wait=pool.checkout_wait.snapshot(),
+        )
+    return stats
+
+
+def database_stats() -> dict[str, Any]:
+    return {
+        "primary": _pool_stats(engine),
+        "replica": _pool_stats(read_engine) if read_engine is not None else None,
+    }
+
+
+metrics.register("database", database_stats)
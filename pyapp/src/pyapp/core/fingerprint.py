@@ -0,0 +1,49 @@
+import hashlib
+import unicodedata
+from typing import Any, Optional
+
+import orjson
+
+# Bump when the canonical form changes so old cache entries stop matching
+FINGERPRINT_VERSION = 1
+
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form of user text for hashing: NFC, LF line endings,
+    no trailing whitespace on lines or around the whole text.
+    """
+    text = unicodedata.normalize("NFC", text).replace("\r\n", "\n").replace("\r", "\n")
+    return "\n".join(line.rstrip() for line in text.split("\n")).strip()
+
+
+def stable_digest(namespace: str, payload: Any) -> str:
+    """
+    SHA-256 over a namespace and the sorted-key JSON form of payload.
+    Unlike hash(), the result is identical across processes and restarts,
+    so it can key caches shared through Redis or disk.
+    """
+    digest = hashlib.sha256(f"{namespace}:v{FINGERPRINT_VERSION}:".encode())
+    digest.update(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS))
+    return digest.hexdigest()
+
+
+def request_fingerprint(
+    text: str,
+    model: str,
+    style: Optional[str] = None,
+    size: Optional[str] = None,
+    options: Optional[dict[str, Any]] = None,
+) -> str:
+    """Digest identifying a generation request by everything that shapes its output"""
+    return stable_digest(
+        "generate",
+        {
+            "text": normalize_text(text),
+            "model": model.lower(),
+            "style": style,
+            "size": size,
+            # None-valued options are the same as absent ones
+            "options": {k: v for k, v in (options or {}).items() if v is not None},
+        },
+    )
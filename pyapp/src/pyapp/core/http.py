@@ -0,0 +1,76 @@
+from typing import Any
+
+import httpx
+
+from pyapp.core.config import settings, logger
+from pyapp.core.metrics import metrics
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:  # httpx[http2] extra not installed
+    HTTP2_AVAILABLE = False
+
+
+class HTTPClientPool:
+    """
+    Long-lived httpx.AsyncClient per upstream provider.
+    Reusing one client keeps TCP/TLS connections alive between Stage A and
+    Stage B calls instead of paying a fresh handshake per request.
+    Clients are opened in the app lifespan and closed on shutdown; get()
+    also creates them lazily so scripts and tests work without lifespan.
+    """
+
+    def __init__(self) -> None:
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    def open(self, *names: str) -> None:
+        for name in names:
+            self.get(name)
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._create()
+            self._clients[name] = client
+        return client
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        for name, client in clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Failed to close HTTP client {name}: {e}")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "http2": self._http2_enabled(),
+            "max_connections": settings.HTTP_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            "keepalive_expiry": settings.HTTP_KEEPALIVE_EXPIRY,
+            "clients": sorted(self._clients),
+        }
+
+    def _http2_enabled(self) -> bool:
+        return settings.HTTP2_ENABLED and HTTP2_AVAILABLE
+
+    def _create(self) -> httpx.AsyncClient:
+        if settings.HTTP2_ENABLED and not HTTP2_AVAILABLE:
+            logger.warning("HTTP2_ENABLED is set but 'h2' is not installed; using HTTP/1.1")
+        return httpx.AsyncClient(
+            http2=self._http2_enabled(),
+            timeout=httpx.Timeout(
+                settings.HTTP_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+
+http_clients = HTTPClientPool()
+
+metrics.register("http_clients", http_clients.stats)
@@ -0,0 +1,168 @@
+import logging
+import queue
+import sys
+import threading
+from typing import Any, Callable, IO, Optional
+
+import orjson
+
+_STOP = object()
+
+
+class QueueLogHandler(logging.Handler):
+    """
+    Non-blocking log handler.
+    Callers only render the message and enqueue the record; a background
+    writer drains the queue in batches, encodes each record with orjson and
+    writes the whole batch with a single write + flush.
+
+    The queue is bounded. When it is full, policy "drop" discards the record
+    and policy "block" waits up to block_timeout before discarding it. Either
+    way the record is counted in `dropped`, and the writer reports the loss
+    as a log line of its own.
+    """
+
+    def __init__(
+        self,
+        to_dict: Callable[[logging.LogRecord], dict[str, Any]],
+        stream: Optional[IO[Any]] = None,
+        max_queue: int = 10000,
+        policy: str = "drop",
+        block_timeout: float = 1.0,
+        batch_size: int = 512,
+    ):
+        super().__init__()
+        if policy not in ("drop", "block"):
+            raise ValueError(f"Unknown log queue policy: {policy!r}")
+        self.to_dict = to_dict
+        self.stream = stream if stream is not None else sys.stdout
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.batch_size = batch_size
+        self.queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.write_errors = 0
+        self._reported_dropped = 0
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        # Handler.handle serializes emit() under a lock; the queue is
+        # already thread-safe, so producers skip it
+        rv = self.filter(record)
+        if isinstance(rv, logging.LogRecord):
+            record = rv
+        if rv:
+            self.emit(record)
+        return bool(rv)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self._closing:
+            # The writer may already be gone; count it rather than queue it
+            self.dropped += 1
+            return
+        try:
+            self.prepare(record)
+            if self.policy == "block":
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+    def prepare(self, record: logging.LogRecord) -> None:
+        """Freeze the record so it no longer references caller state"""
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+
+    def _run(self) -> None:
+        q = self.queue
+        stop = False
+        while not stop:
+            batch = []
+            item = q.get()
+            while True:
+                if item is _STOP:
+                    stop = True
+                else:
+                    batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = q.get_nowait()
+                except queue.Empty:
+                    break
+            # Records that raced in behind the sentinel are still written
+            if stop:
+                while True:
+                    try:
+                        item = q.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not _STOP:
+                        batch.append(item)
+            self._write(batch)
+
+    def _write(self, batch: list[logging.LogRecord]) -> None:
+        lines = []
+        for record in batch:
+            try:
+                lines.append(orjson.dumps(self.to_dict(record), default=str))
+            except Exception:
+                self.write_errors += 1
+        dropped = self.dropped
+        if dropped != self._reported_dropped:
+            lines.append(orjson.dumps({
+                "level": "WARNING",
+                "message": f"Log queue full, dropped {dropped - self._reported_dropped} records",
+                "logger": "pyapp.logging",
+            }))
+            self._reported_dropped = dropped
+        if not lines:
+            return
+        data = b"\n".join(lines) + b"\n"
+        try:
+            buffer = getattr(self.stream, "buffer", None)
+            if buffer is not None:
+                self.stream.flush()
+                buffer.write(data)
+                buffer.flush()
+            else:
+                self.stream.write(data.decode("utf-8"))
+                self.stream.flush()
+        except Exception:
+            self.write_errors += 1
+            return
+        self.written += len(batch)
+        self.batches += 1
+
+    def close(self) -> None:
+        """Write everything still queued, then stop the writer"""
+        self._closing = True
+        if self._thread.is_alive():
+            self.queue.put(_STOP)
+            self._thread.join()
+        super().close()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "policy": self.policy,
+            "queued": self.queue.qsize(),
+            "max_queue": self.queue.maxsize,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "write_errors": self.write_errors,
+        }
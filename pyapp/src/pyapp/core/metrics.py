@@ -0,0 +1,61 @@
+import threading
+from typing import Any, Callable
+
+
+class TimingStat:
+    """Running count/total/max accumulator for a latency measured in ms"""
+
+    __slots__ = ("count", "total_ms", "max_ms", "last_ms")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.count += 1
+        self.total_ms += value_ms
+        self.last_ms = value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    @property
+    def avg_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def snapshot(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.avg_ms, 3),
+            "max_ms": round(self.max_ms, 3),
+            "last_ms": round(self.last_ms, 3),
+        }
+
+
+class MetricsRegistry:
+    """
+    Registry of named stats providers.
+    Subsystems register a zero-arg callable returning a dict; the
+    /health/metrics endpoint collects them on demand.
+    """
+
+    def __init__(self) -> None:
+        self._providers: dict[str, Callable[[], dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, provider: Callable[[], dict[str, Any]]) -> None:
+        with self._lock:
+            self._providers[name] = provider
+
+    def unregister(self, name: str) -> None:
+        with self._lock:
+            self._providers.pop(name, None)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            providers = list(self._providers.items())
+        return {name: provider() for name, provider in providers}
+
+
+metrics = MetricsRegistry()
@@ -3,10 +3,13 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from pyapp.core.config import settings, logger, setup_logging
+from pyapp.core.config import settings, logger, setup_logging, shutdown_logging
 from pyapp.core.exceptions import AppError, app_exception_handler
 from pyapp.core.database import engine, Base
+from pyapp.core.http import http_clients
 from pyapp.modules.generate.lib.renderer import renderer
+from pyapp.modules.auth.security import shutdown_hash_executor
+from pyapp.modules.generate.service import generate_service
 
 # Import Routers
 from pyapp.modules.auth.controller import router as auth_router
@@ -29,13 +32,20 @@ async def lifespan(app: FastAPI):
         # In production, use Alembic!
         await conn.run_sync(Base.metadata.create_all)
 
+    # Initialize shared provider HTTP clients (keep-alive / HTTP/2)
+    http_clients.open("deepseek", "nanobanana")
+
     # Initialize Renderer
-    await renderer.get_browser()
+    await renderer.start()
 
     yield
 
     logger.info("Shutting down application...")
     await renderer.close()
+    await http_clients.aclose()
+    await generate_service.cache.close()
+    shutdown_hash_executor()
+    shutdown_logging()
 
 
 def create_app() -> FastAPI:
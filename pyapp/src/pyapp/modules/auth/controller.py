@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from pyapp.core.config import settings
 from pyapp.core.database import get_db
 from pyapp.modules.auth import deps, models, schemas, security, service
+from pyapp.modules.auth.principal import user_claims
 
 router = APIRouter()
 
@@ -36,7 +37,7 @@ async def login_access_token(
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
-        user.id, expires_delta=access_token_expires
+        user.id, expires_delta=access_token_expires, claims=user_claims(user)
     )
     return {
         "access_token": access_token,
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from pyapp.core.config import settings
 from pyapp.core.database import get_db
 from pyapp.modules.auth import models, schemas, service
+from pyapp.modules.auth.principal import principal_cache, user_from_claims
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_PREFIX}/auth/login"
@@ -23,20 +24,37 @@ async def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-        )
-        user_id: str = payload.get("sub")
-        if user_id is None:
+    cached = principal_cache.get_token(token)
+    if cached is not None:
+        user_id, payload = cached
+    else:
+        try:
+            payload = jwt.decode(
+                token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
+            )
+            user_id: str = payload.get("sub")
+            if user_id is None:
+                raise credentials_exception
+            token_data = schemas.TokenPayload(sub=user_id)
+        except JWTError:
             raise credentials_exception
-        token_data = schemas.TokenPayload(sub=user_id)
-    except JWTError:
-        raise credentials_exception
-    
-    user = await service.get_user(db, user_id=token_data.sub)
+        user_id = token_data.sub
+        principal_cache.put_token(token, user_id, payload)
+
+    if settings.AUTH_STATELESS:
+        # Trust the signed claims; tokens issued without them fall through
+        user = user_from_claims(user_id, payload)
+        if user is not None:
+            return user
+
+    user = principal_cache.get_user(user_id)
+    if user is not None:
+        return user
+
+    user = await service.get_user(db, user_id=user_id)
     if user is None:
         raise credentials_exception
+    principal_cache.put_user(user)
     return user
 
 
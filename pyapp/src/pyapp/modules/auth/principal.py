@@ -0,0 +1,132 @@
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from sqlalchemy import event, inspect
+
+from pyapp.core.config import settings
+from pyapp.core.metrics import metrics
+from pyapp.modules.auth import models
+
+# Claims embedded in access tokens so AUTH_STATELESS can skip the DB
+PRINCIPAL_CLAIMS = ("email", "full_name", "is_active", "is_superuser")
+
+
+def user_claims(user: models.User) -> dict[str, Any]:
+    return {name: getattr(user, name) for name in PRINCIPAL_CLAIMS}
+
+
+def user_from_claims(user_id: int, claims: dict[str, Any]) -> Optional[models.User]:
+    """Transient User built from signed token claims (None if claims missing)"""
+    if any(name not in claims for name in PRINCIPAL_CLAIMS):
+        return None
+    return models.User(id=user_id, **{name: claims[name] for name in PRINCIPAL_CLAIMS})
+
+
+class PrincipalCache:
+    """
+    Short-TTL cache of resolved principals.
+
+    Decoded tokens map to user ids and user ids map to column snapshots;
+    a hit returns a fresh transient User so request handlers never share
+    ORM state. Entries are dropped when a User row is updated or deleted
+    in this process; other workers rely on the TTL.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._tokens: OrderedDict[str, tuple[int, dict[str, Any], float]] = OrderedDict()
+        self._users: OrderedDict[int, tuple[dict[str, Any], float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get_token(self, token: str) -> Optional[tuple[int, dict[str, Any]]]:
+        """(user_id, claims) of an already-verified token"""
+        entry = self._tokens.get(token)
+        if entry is None:
+            return None
+        user_id, claims, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._tokens[token]
+            return None
+        self._tokens.move_to_end(token)
+        return user_id, claims
+
+    def put_token(self, token: str, user_id: int, claims: dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        expires_at = time.monotonic() + self.ttl
+        if "exp" in claims:
+            # Never outlive the token itself
+            expires_at = min(expires_at, time.monotonic() + claims["exp"] - time.time())
+        self._tokens[token] = (user_id, claims, expires_at)
+        self._tokens.move_to_end(token)
+        self._trim(self._tokens)
+
+    def get_user(self, user_id: int) -> Optional[models.User]:
+        entry = self._users.get(user_id)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                del self._users[user_id]
+            self.misses += 1
+            return None
+        self._users.move_to_end(user_id)
+        self.hits += 1
+        return models.User(**entry[0])
+
+    def put_user(self, user: models.User) -> None:
+        if not self.enabled:
+            return
+        snapshot = {
+            attr.key: getattr(user, attr.key)
+            for attr in inspect(models.User).column_attrs
+        }
+        self._users[user.id] = (snapshot, time.monotonic() + self.ttl)
+        self._users.move_to_end(user.id)
+        self._trim(self._users)
+
+    def invalidate(self, user_id: int) -> None:
+        if self._users.pop(user_id, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._tokens.clear()
+        self._users.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "stateless": settings.AUTH_STATELESS,
+            "ttl": self.ttl,
+            "tokens": len(self._tokens),
+            "users": len(self._users),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+    def _trim(self, entries: OrderedDict) -> None:
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+
+principal_cache = PrincipalCache(
+    ttl=settings.AUTH_PRINCIPAL_CACHE_TTL,
+    max_entries=settings.AUTH_PRINCIPAL_CACHE_SIZE,
+)
+
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_principal(mapper: Any, connection: Any, target: models.User) -> None:
+    principal_cache.invalidate(target.id)
+
+
+metrics.register("auth_principals", principal_cache.stats)
@@ -3,21 +3,30 @@ from typing import Optional
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from pyapp.core.database import READ_REPLICA
 from pyapp.modules.auth import models, schemas, security
 
 
 async def get_user(db: AsyncSession, user_id: int) -> Optional[models.User]:
-    result = await db.execute(select(models.User).filter(models.User.id == user_id))
+    result = await db.execute(
+        select(models.User)
+        .filter(models.User.id == user_id)
+        .execution_options(**{READ_REPLICA: True})
+    )
     return result.scalars().first()
 
 
 async def get_user_by_email(db: AsyncSession, email: str) -> Optional[models.User]:
-    result = await db.execute(select(models.User).filter(models.User.email == email))
+    result = await db.execute(
+        select(models.User)
+        .filter(models.User.email == email)
+        .execution_options(**{READ_REPLICA: True})
+    )
     return result.scalars().first()
 
 
 async def create_user(db: AsyncSession, user: schemas.UserCreate) -> models.User:
-    hashed_password = security.get_password_hash(user.password)
+    hashed_password = await security.get_password_hash_async(user.password)
     db_user = models.User(
         email=user.email,
         hashed_password=hashed_password,
@@ -36,6 +45,6 @@ async def authenticate_user(
     user = await get_user_by_email(db, email)
     if not user:
         return None
-    if not security.verify_password(password, user.hashed_password):
+    if not await security.verify_password_async(password, user.hashed_password):
         return None
     return user
@@ -1,13 +1,40 @@
-from fastapi import APIRouter, Depends
+import time
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from pyapp.core.config import settings
 from pyapp.modules.auth.deps import get_current_active_user
 from pyapp.modules.auth.models import User
+from pyapp.modules.export import schemas
+from pyapp.modules.export.service import export_service
 
 router = APIRouter()
 
 
 @router.post("/")
-async def export_data(
-    data: dict,
+async def export_cards(
+    request: schemas.ExportRequest,
     current_user: User = Depends(get_current_active_user)
 ):
-    return {"status": "exported", "url": "https://example.com/export.zip"}
+    """
+    Render a batch of SVG cards and stream them back as a ZIP archive.
+
+    Cards are written in completion order as each render finishes. Cards
+    that fail to render are skipped; the archive's final entry,
+    manifest.json, reports success/failure counts and per-card errors.
+    """
+    if len(request.cards) > settings.EXPORT_MAX_CARDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.EXPORT_MAX_CARDS} cards per export",
+        )
+    filename = f"cards-{int(time.time())}.zip"
+    return StreamingResponse(
+        export_service.stream_zip(request.cards),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Export-Total": str(len(request.cards)),
+        },
+    )
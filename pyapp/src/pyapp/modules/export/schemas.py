@@ -0,0 +1,11 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class ExportCard(BaseModel):
+    svg: str = Field(..., min_length=1)
+    name: Optional[str] = None
+
+
+class ExportRequest(BaseModel):
+    cards: list[ExportCard] = Field(..., min_length=1)
@@ -0,0 +1,173 @@
+import asyncio
+import io
+import json
+import re
+import time
+import zipfile
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional
+
+from pyapp.core.config import settings, logger
+from pyapp.core.metrics import metrics
+from pyapp.modules.export import schemas
+from pyapp.modules.generate.lib.renderer import renderer
+from pyapp.services.image.fleet import resolve_browser_count
+
+MANIFEST_NAME = "manifest.json"
+
+_UNSAFE_NAME = re.compile(r"[^\w.-]+")
+
+
+@dataclass
+class ExportReport:
+    """Per-export outcome; complete once the ZIP stream is exhausted"""
+    total: int = 0
+    succeeded: list[dict[str, Any]] = field(default_factory=list)
+    failed: list[dict[str, Any]] = field(default_factory=list)
+    bytes_written: int = 0
+
+    def manifest(self) -> dict[str, Any]:
+        return {
+            "total": self.total,
+            "success_count": len(self.succeeded),
+            "failed_count": len(self.failed),
+            "files": self.succeeded,
+            "failures": self.failed,
+        }
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable ZipFile target that hands out bytes as they are written"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arcname(name: str, used: set[str]) -> str:
+    stem = _UNSAFE_NAME.sub("_", name).strip("._") or "card"
+    arcname, suffix = f"{stem}.png", 1
+    while arcname in used:
+        suffix += 1
+        arcname = f"{stem}_{suffix}.png"
+    used.add(arcname)
+    return arcname
+
+
+class ExportService:
+    """
+    Batch export: renders cards concurrently and streams them into a ZIP.
+
+    A fixed set of workers pulls cards from a shared iterator and hands
+    finished PNGs to a single writer through a bounded queue, so at most
+    ~2x concurrency PNGs are held at once however large the batch is.
+    Each PNG is written to the archive (stored, PNG is already compressed)
+    and flushed to the client as soon as it finishes; failed cards are
+    listed in manifest.json, the last entry of the archive.
+    """
+
+    def __init__(
+        self,
+        render: Callable[[str], Awaitable[bytes]],
+        concurrency: int = 0,
+    ):
+        self.render = render
+        self.concurrency = concurrency
+        self.exports = 0
+        self.cards_exported = 0
+        self.cards_failed = 0
+
+    @property
+    def workers(self) -> int:
+        if self.concurrency > 0:
+            return self.concurrency
+        return resolve_browser_count(settings.IMG_BROWSER_COUNT) * settings.IMG_MAX_CONCURRENCY
+
+    async def stream_zip(
+        self,
+        cards: Iterable[schemas.ExportCard],
+        report: Optional[ExportReport] = None,
+    ) -> AsyncIterator[bytes]:
+        report = report if report is not None else ExportReport()
+        pending = iter(enumerate(cards, start=1))
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.workers)
+
+        async def worker() -> None:
+            # The iterator is shared: a worker takes the next card only
+            # after handing its previous result to the writer
+            for index, card in pending:
+                report.total += 1
+                try:
+                    outcome: Any = await self.render(card.svg)
+                except Exception as e:
+                    outcome = e
+                await results.put((index, card, outcome))
+
+        async def finish() -> None:
+            await asyncio.gather(*workers, return_exceptions=True)
+            await results.put(None)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.workers)]
+        closer = asyncio.create_task(finish())
+
+        start = time.perf_counter()
+        sink = _ChunkSink()
+        archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED)
+        used: set[str] = set()
+        try:
+            while (entry := await results.get()) is not None:
+                index, card, outcome = entry
+                name = card.name or f"card_{index:02d}"
+                if isinstance(outcome, bytes):
+                    arcname = _arcname(name, used)
+                    archive.writestr(arcname, outcome)
+                    report.succeeded.append({"index": index, "name": arcname, "size_bytes": len(outcome)})
+                else:
+                    logger.warning(f"Export of card {index} failed: {outcome}")
+                    report.failed.append({"index": index, "name": name, "error": str(outcome)})
+                if chunk := sink.drain():
+                    report.bytes_written += len(chunk)
+                    yield chunk
+
+            archive.writestr(MANIFEST_NAME, json.dumps(report.manifest(), ensure_ascii=False, indent=2))
+            archive.close()
+            chunk = sink.drain()
+            report.bytes_written += len(chunk)
+            yield chunk
+        finally:
+            # Stop rendering if the client went away mid-export
+            for task in (*workers, closer):
+                task.cancel()
+            await asyncio.gather(*workers, closer, return_exceptions=True)
+            self.exports += 1
+            self.cards_exported += len(report.succeeded)
+            self.cards_failed += len(report.failed)
+            logger.info(
+                f"Export finished: {len(report.succeeded)}/{report.total} cards, "
+                f"{report.bytes_written} bytes in {(time.perf_counter() - start) * 1000:.0f}ms"
+            )
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "exports": self.exports,
+            "cards_exported": self.cards_exported,
+            "cards_failed": self.cards_failed,
+        }
+
+
+export_service = ExportService(renderer.render_svg_to_png, settings.EXPORT_CONCURRENCY)
+
+metrics.register("export", export_service.stats)
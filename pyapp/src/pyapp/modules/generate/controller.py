@@ -1,4 +1,11 @@
+import json
+from typing import Any, AsyncIterator
+
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from pyapp.core.config import logger
 
 from pyapp.modules.auth.deps import get_current_active_user
 from pyapp.modules.auth.models import User
@@ -20,3 +27,37 @@ async def generate_card(
         return await generate_service.generate_card(request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def _sse(event: str, data: Any) -> str:
+    if isinstance(data, BaseModel):
+        data = data.model_dump()
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _event_stream(request: schemas.GenerateRequest) -> AsyncIterator[str]:
+    # Flush something immediately so proxies and clients see the first byte
+    yield _sse("start", {"model": request.model})
+    try:
+        async for event, data in generate_service.generate_card_stream(request):
+            yield _sse(event, data)
+    except Exception as e:
+        logger.error(f"Streaming generation failed: {e}")
+        yield _sse("error", {"detail": str(e)})
+
+
+@router.post("/stream")
+async def generate_card_stream(
+    request: schemas.GenerateRequest,
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Generate a card, streaming progress as server-sent events:
+    `start`, `design` (Stage A JSON), `svg` (Stage B chunks),
+    `done` (PNG rendered, full response) or `error`.
+    """
+    return StreamingResponse(
+        _event_stream(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
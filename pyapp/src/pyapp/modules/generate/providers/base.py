@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator
 
 from pyapp.core.exceptions import AIServiceError
 from pyapp.modules.generate.schemas import DesignJSON, GenerationOptions
@@ -24,6 +25,22 @@ class AIService(ABC):
         """
         pass
 
+    async def process_stream(
+        self, text: str, options: GenerationOptions
+    ) -> AsyncIterator[tuple[str, Any]]:
+        """
+        Streaming variant of process().
+
+        Yields ("design", DesignJSON) once Stage A is parsed, then
+        ("svg", chunk) for each piece of Stage B output, then
+        ("svg_complete", svg_content). Providers without a streaming API
+        fall back to a single non-streamed chunk.
+        """
+        svg_content, design_json = await self.process(text, options)
+        yield "design", design_json
+        yield "svg", svg_content
+        yield "svg_complete", svg_content
+
     def clean_json_response(self, content: str) -> str:
         """Clean markdown code blocks from JSON response"""
         content = content.strip()
@@ -58,3 +75,60 @@ class AIService(ABC):
             return content[start : end + 6]
             
         return content
+
+
+def _partial_suffix(text: str, token: str) -> int:
+    """Length of the longest suffix of text that is a proper prefix of token"""
+    for size in range(min(len(text), len(token) - 1), 0, -1):
+        if token.startswith(text[-size:]):
+            return size
+    return 0
+
+
+class SVGStreamExtractor:
+    """
+    Incremental counterpart of extract_svg_content for streamed deltas.
+    Text before "<svg" (e.g. an opening ```svg fence) is dropped and text
+    after the last "</svg>" (the closing fence) is held back, so the
+    emitted chunks concatenate to the extracted SVG.
+    """
+
+    OPEN = "<svg"
+    CLOSE = "</svg>"
+
+    def __init__(self) -> None:
+        self._pending = ""
+        self._started = False
+        self._closed = False
+
+    def feed(self, delta: str) -> str:
+        pending = self._pending + delta
+        if not self._started:
+            start = pending.find(self.OPEN)
+            if start == -1:
+                self._pending = pending[len(pending) - _partial_suffix(pending, self.OPEN):]
+                return ""
+            self._started = True
+            pending = pending[start:]
+
+        end = pending.rfind(self.CLOSE)
+        if end != -1:
+            # Anything after this close tag waits for a later one (nested <svg>)
+            self._closed = True
+            end += len(self.CLOSE)
+            self._pending = pending[end:]
+            return pending[:end]
+        if self._closed:
+            self._pending = pending
+            return ""
+
+        keep = _partial_suffix(pending, self.CLOSE)
+        self._pending = pending[len(pending) - keep:] if keep else ""
+        return pending[:len(pending) - keep]
+
+    def flush(self) -> str:
+        """Remaining text of an SVG whose closing tag never arrived"""
+        rest = self._pending if self._started and not self._closed else ""
+        self._pending = ""
+        return rest
+
@@ -1,10 +1,13 @@
 import json
+from typing import Any, AsyncIterator
+
 import httpx
 
 from pyapp.core.config import settings, logger
 from pyapp.core.exceptions import AIServiceError
+from pyapp.core.http import http_clients
 from pyapp.modules.generate.schemas import DesignJSON, GenerationOptions
-from pyapp.modules.generate.providers.base import AIService
+from pyapp.modules.generate.providers.base import AIService, SVGStreamExtractor
 from pyapp.modules.generate.prompts import (
     STAGE_A_SYSTEM_PROMPT,
     STAGE_B_SYSTEM_PROMPT,
@@ -21,7 +24,14 @@ class DeepSeekService(AIService):
         self.api_key = settings.DEEPSEEK_API_KEY
         self.api_url = settings.DEEPSEEK_API_URL
 
-    async def _call_api(self, messages: list[dict[str, str]]) -> str:
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """App-scoped keep-alive client (see pyapp.core.http)"""
+        return http_clients.get("deepseek")
+
+    def _build_request(
+        self, messages: list[dict[str, str]], stream: bool
+    ) -> tuple[dict[str, str], dict[str, Any]]:
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
@@ -30,23 +40,65 @@ class DeepSeekService(AIService):
             "model": "deepseek-chat",
             "messages": messages,
             "temperature": 1.3, # Creative mode
-            "stream": False
+            "stream": stream
         }
+        return headers, data
+
+    async def _call_api(self, messages: list[dict[str, str]]) -> str:
+        headers, data = self._build_request(messages, stream=False)
+
+        try:
+            response = await self.client.post(
+                self.api_url, headers=headers, json=data
+            )
+
+            if response.status_code != 200:
+                error_msg = f"DeepSeek API Error: {response.status_code} - {response.text}"
+                logger.error(error_msg)
+                raise AIServiceError(error_msg)
+
+            result = response.json()
+            return result["choices"][0]["message"]["content"]
+
+        except AIServiceError:
+            raise
+        except httpx.RequestError as e:
+            logger.error(f"DeepSeek Network Error: {e}")
+            raise AIServiceError(f"Network error connecting to DeepSeek: {e}")
+        except Exception as e:
+            logger.error(f"DeepSeek Unexpected Error: {e}")
+            raise AIServiceError(f"Unexpected error in DeepSeek service: {e}")
+
+    async def _stream_api(self, messages: list[dict[str, str]]) -> AsyncIterator[str]:
+        """Yield content deltas from an OpenAI-style `stream: true` response"""
+        headers, data = self._build_request(messages, stream=True)
 
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    self.api_url, headers=headers, json=data
-                )
-                
+            async with self.client.stream(
+                "POST", self.api_url, headers=headers, json=data
+            ) as response:
                 if response.status_code != 200:
-                    error_msg = f"DeepSeek API Error: {response.status_code} - {response.text}"
+                    body = (await response.aread()).decode(errors="replace")
+                    error_msg = f"DeepSeek API Error: {response.status_code} - {body}"
                     logger.error(error_msg)
                     raise AIServiceError(error_msg)
-                
-                result = response.json()
-                return result["choices"][0]["message"]["content"]
-                
+
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    payload = line[5:].strip()
+                    if payload == "[DONE]":
+                        break
+                    chunk = json.loads(payload)
+                    choices = chunk.get("choices") or []
+                    if not choices:
+                        continue
+                    delta = choices[0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+
+        except AIServiceError:
+            raise
         except httpx.RequestError as e:
             logger.error(f"DeepSeek Network Error: {e}")
             raise AIServiceError(f"Network error connecting to DeepSeek: {e}")
@@ -54,46 +106,89 @@ class DeepSeekService(AIService):
             logger.error(f"DeepSeek Unexpected Error: {e}")
             raise AIServiceError(f"Unexpected error in DeepSeek service: {e}")
 
-    async def process(self, text: str, options: GenerationOptions) -> tuple[str, DesignJSON]:
-        logger.info(f"Starting DeepSeek processing for text length: {len(text)}")
-        
-        # Stage A: Analysis & Design
+    def _stage_a_messages(self, text: str, options: GenerationOptions) -> list[dict[str, str]]:
         stage_a_prompt = create_stage_a_user_prompt(text, options.model_dump())
-        messages_a = [
+        return [
             {"role": "system", "content": STAGE_A_SYSTEM_PROMPT},
             {"role": "user", "content": stage_a_prompt},
         ]
-        
+
+    def _stage_b_messages(self, clean_json: str, options: GenerationOptions) -> list[dict[str, str]]:
+        stage_b_prompt = create_stage_b_user_prompt(
+            clean_json, options.styleChoice
+        )
+        return [
+            {"role": "system", "content": STAGE_B_SYSTEM_PROMPT},
+            {"role": "user", "content": stage_b_prompt},
+        ]
+
+    def _parse_design(self, raw_json: str) -> tuple[str, DesignJSON]:
         try:
-            raw_json = await self._call_api(messages_a)
             clean_json = self.clean_json_response(raw_json)
             design_data = json.loads(clean_json)
             design_json = DesignJSON(**design_data)
             logger.info(f"Stage A complete. Template: {design_json.template_type}")
+            return clean_json, design_json
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse Design JSON: {e}. Content: {raw_json}")
             raise AIServiceError("Failed to generate valid Design JSON")
         except Exception as e:
             raise AIServiceError(f"Stage A failed: {e}")
 
+    def _parse_svg(self, raw_svg: str) -> str:
+        svg_content = self.extract_svg_content(raw_svg)
+
+        if not svg_content or "<svg" not in svg_content:
+            raise AIServiceError("Stage B failed: No valid SVG content generated")
+
+        logger.info(f"Stage B complete. SVG length: {len(svg_content)}")
+        return svg_content
+
+    async def process(self, text: str, options: GenerationOptions) -> tuple[str, DesignJSON]:
+        logger.info(f"Starting DeepSeek processing for text length: {len(text)}")
+
+        # Stage A: Analysis & Design
+        try:
+            raw_json = await self._call_api(self._stage_a_messages(text, options))
+        except Exception as e:
+            raise AIServiceError(f"Stage A failed: {e}")
+        clean_json, design_json = self._parse_design(raw_json)
+
         # Stage B: SVG Rendering
-        stage_b_prompt = create_stage_b_user_prompt(
-            clean_json, options.styleChoice
-        )
-        messages_b = [
-            {"role": "system", "content": STAGE_B_SYSTEM_PROMPT},
-            {"role": "user", "content": stage_b_prompt},
-        ]
-        
         try:
-            raw_svg = await self._call_api(messages_b)
-            svg_content = self.extract_svg_content(raw_svg)
-            
-            if not svg_content or "<svg" not in svg_content:
-                raise AIServiceError("No valid SVG content generated")
-                
-            logger.info(f"Stage B complete. SVG length: {len(svg_content)}")
-            return svg_content, design_json
-            
+            raw_svg = await self._call_api(self._stage_b_messages(clean_json, options))
+        except Exception as e:
+            raise AIServiceError(f"Stage B failed: {e}")
+        return self._parse_svg(raw_svg), design_json
+
+    async def process_stream(
+        self, text: str, options: GenerationOptions
+    ) -> AsyncIterator[tuple[str, Any]]:
+        logger.info(f"Starting DeepSeek streaming for text length: {len(text)}")
+
+        # Stage A: the design JSON is only usable once complete, so buffer it
+        try:
+            parts = [
+                delta async for delta in
+                self._stream_api(self._stage_a_messages(text, options))
+            ]
+        except Exception as e:
+            raise AIServiceError(f"Stage A failed: {e}")
+        clean_json, design_json = self._parse_design("".join(parts))
+        yield "design", design_json
+
+        # Stage B: forward SVG tokens as they arrive, minus the code fence
+        parts = []
+        extractor = SVGStreamExtractor()
+        try:
+            async for delta in self._stream_api(self._stage_b_messages(clean_json, options)):
+                parts.append(delta)
+                chunk = extractor.feed(delta)
+                if chunk:
+                    yield "svg", chunk
         except Exception as e:
             raise AIServiceError(f"Stage B failed: {e}")
+        rest = extractor.flush()
+        if rest:
+            yield "svg", rest
+        yield "svg_complete", self._parse_svg("".join(parts))
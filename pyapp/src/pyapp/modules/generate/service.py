@@ -1,29 +1,41 @@
-import hashlib
 import json
 import time
-from typing import Optional
+from typing import Any, AsyncIterator, Optional
 
+import orjson
+
+from pyapp.core.cache import Cache, create_cache
 from pyapp.core.config import settings, logger
+from pyapp.core.fingerprint import request_fingerprint
+from pyapp.core.metrics import metrics
+from pyapp.core.singleflight import SingleFlight
 from pyapp.modules.generate import schemas
 from pyapp.modules.generate.providers.deepseek import DeepSeekService
 from pyapp.modules.generate.lib.renderer import renderer
 
-# Simple in-memory cache for demo if Redis fails/not setup
-_memory_cache = {}
 
 class GenerateService:
-    def __init__(self):
+    def __init__(self, cache: Optional[Cache] = None):
         self.ai_service = DeepSeekService()
         self.renderer = renderer
+        self.cache = cache or create_cache("generate")
+        self.inflight = SingleFlight()
 
     async def generate_card(self, input_dto: schemas.GenerateRequest) -> schemas.GenerateResponse:
         cache_key = self._make_cache_key(input_dto)
         
-        # Check cache (Mocking Redis get)
-        if cache_key in _memory_cache:
-            logger.info(f"Cache hit for {cache_key}")
-            return schemas.GenerateResponse(**_memory_cache[cache_key])
+        cached = await self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Identical requests arriving while this one runs share its result
+        return await self.inflight.do(
+            cache_key, lambda: self._generate(input_dto, cache_key)
+        )
 
+    async def _generate(
+        self, input_dto: schemas.GenerateRequest, cache_key: str
+    ) -> schemas.GenerateResponse:
         options = input_dto.options or schemas.GenerationOptions()
         
         # 1. AI Process
@@ -31,7 +43,56 @@ class GenerateService:
         
         # 2. Render Image
         png_bytes = await self.renderer.render_svg_to_png(svg_content)
-        
+
+        response = self._build_response(input_dto, svg_content, design_json)
+
+        await self._cache_set(cache_key, response)
+
+        return response
+
+    async def generate_card_stream(
+        self, input_dto: schemas.GenerateRequest
+    ) -> AsyncIterator[tuple[str, Any]]:
+        """
+        Streaming variant of generate_card.
+        Yields ("design", DesignJSON), ("svg", chunk)... and finally
+        ("done", GenerateResponse) once the PNG has been rendered.
+        """
+        cache_key = self._make_cache_key(input_dto)
+
+        response = await self._cache_get(cache_key)
+        if response is not None:
+            if response.designJson is not None:
+                yield "design", response.designJson
+            yield "done", response
+            return
+
+        options = input_dto.options or schemas.GenerationOptions()
+
+        # 1. AI Process (streamed)
+        svg_content, design_json = "", None
+        async for event, data in self.ai_service.process_stream(input_dto.text, options):
+            if event == "svg_complete":
+                svg_content = data
+                continue
+            if event == "design":
+                design_json = data
+            yield event, data
+
+        # 2. Render Image
+        png_bytes = await self.renderer.render_svg_to_png(svg_content)
+
+        response = self._build_response(input_dto, svg_content, design_json)
+        await self._cache_set(cache_key, response)
+
+        yield "done", response
+
+    def _build_response(
+        self,
+        input_dto: schemas.GenerateRequest,
+        svg_content: str,
+        design_json: schemas.DesignJSON,
+    ) -> schemas.GenerateResponse:
         # In a real app, upload png_bytes to S3/Cloud and get URL.
         # Here we return a data URL or placeholder.
         # For simplicity, let's assume we return a base64 data url or a temp url.
@@ -49,21 +110,31 @@ class GenerateService:
             )
         ]
         
-        response = schemas.GenerateResponse(
+        return schemas.GenerateResponse(
             cards=cards,
             copytext="Generated copytext placeholder",
             success=True,
             svgContent=svg_content,
             designJson=design_json
         )
-        
-        # Set cache
-        _memory_cache[cache_key] = response.model_dump()
-        
-        return response
+
+    async def _cache_get(self, cache_key: str) -> Optional[schemas.GenerateResponse]:
+        raw = await self.cache.get(cache_key)
+        if raw is None:
+            return None
+        logger.info(f"Cache hit for {cache_key}")
+        return schemas.GenerateResponse(**orjson.loads(raw))
+
+    async def _cache_set(self, cache_key: str, response: schemas.GenerateResponse) -> None:
+        await self.cache.set(cache_key, orjson.dumps(response.model_dump()))
 
     def _make_cache_key(self, input_dto: schemas.GenerateRequest) -> str:
-        raw = f"{input_dto.text}:{input_dto.model}:{input_dto.style}:{input_dto.size}"
-        return hashlib.sha256(raw.encode()).hexdigest()
+        options = input_dto.options.model_dump() if input_dto.options else None
+        return request_fingerprint(
+            input_dto.text, input_dto.model, input_dto.style, input_dto.size, options
+        )
 
 generate_service = GenerateService()
+
+metrics.register("generate_cache", generate_service.cache.stats)
+metrics.register("generate_inflight", generate_service.inflight.stats)
@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 from pyapp.core.config import settings
+from pyapp.core.metrics import metrics
 
 router = APIRouter()
 
@@ -12,3 +13,9 @@ async def health_check():
         "env": settings.APP_ENV,
         "version": "0.1.0"
     }
+
+
+@router.get("/metrics")
+async def runtime_metrics():
+    """Runtime stats from registered subsystems (render pool, ...)"""
+    return metrics.snapshot()
@@ -4,6 +4,7 @@ from typing import Any
 
 from pyapp.core.config import settings, logger
 from pyapp.core.exceptions import AIServiceError
+from pyapp.core.http import http_clients
 from pyapp.domain.models import DesignJSON, GenerationOptions
 from pyapp.services.ai.base import AIService
 from pyapp.services.prompts import (
@@ -22,6 +23,11 @@ class DeepSeekService(AIService):
         self.api_key = settings.DEEPSEEK_API_KEY
         self.api_url = settings.DEEPSEEK_API_URL
 
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """App-scoped keep-alive client (see pyapp.core.http)"""
+        return http_clients.get("deepseek")
+
     async def _call_api(self, messages: list[dict[str, str]]) -> str:
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -35,19 +41,20 @@ class DeepSeekService(AIService):
         }
 
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    self.api_url, headers=headers, json=data
-                )
-                
-                if response.status_code != 200:
-                    error_msg = f"DeepSeek API Error: {response.status_code} - {response.text}"
-                    logger.error(error_msg)
-                    raise AIServiceError(error_msg)
-                
-                result = response.json()
-                return result["choices"][0]["message"]["content"]
-                
+            response = await self.client.post(
+                self.api_url, headers=headers, json=data
+            )
+
+            if response.status_code != 200:
+                error_msg = f"DeepSeek API Error: {response.status_code} - {response.text}"
+                logger.error(error_msg)
+                raise AIServiceError(error_msg)
+
+            result = response.json()
+            return result["choices"][0]["message"]["content"]
+
+        except AIServiceError:
+            raise
         except httpx.RequestError as e:
             logger.error(f"DeepSeek Network Error: {e}")
             raise AIServiceError(f"Network error connecting to DeepSeek: {e}")
@@ -98,3 +105,6 @@ class DeepSeekService(AIService):
             
         except Exception as e:
             raise AIServiceError(f"Stage B failed: {e}")
+
+
+deepseek_service = DeepSeekService()
@@ -4,6 +4,7 @@ from typing import Any
 
 from pyapp.core.config import settings, logger
 from pyapp.core.exceptions import AIServiceError
+from pyapp.core.http import http_clients
 from pyapp.domain.models import DesignJSON, GenerationOptions
 from pyapp.services.ai.base import AIService
 from pyapp.services.prompts import (
@@ -22,6 +23,11 @@ class NanoBananaService(AIService):
         self.api_key = settings.APICORE_AI_KEY
         self.api_url = settings.NANOBANANA_API_URL
 
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """App-scoped keep-alive client (see pyapp.core.http)"""
+        return http_clients.get("nanobanana")
+
     async def _call_api(self, messages: list[dict[str, str]]) -> str:
         if not self.api_key:
             raise AIServiceError("NanoBanana API Key not configured")
@@ -38,19 +44,20 @@ class NanoBananaService(AIService):
         }
 
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    self.api_url, headers=headers, json=data
-                )
-                
-                if response.status_code != 200:
-                    error_msg = f"NanoBanana API Error: {response.status_code} - {response.text}"
-                    logger.error(error_msg)
-                    raise AIServiceError(error_msg)
-                
-                result = response.json()
-                return result["choices"][0]["message"]["content"]
-                
+            response = await self.client.post(
+                self.api_url, headers=headers, json=data
+            )
+
+            if response.status_code != 200:
+                error_msg = f"NanoBanana API Error: {response.status_code} - {response.text}"
+                logger.error(error_msg)
+                raise AIServiceError(error_msg)
+
+            result = response.json()
+            return result["choices"][0]["message"]["content"]
+
+        except AIServiceError:
+            raise
         except httpx.RequestError as e:
             logger.error(f"NanoBanana Network Error: {e}")
             raise AIServiceError(f"Network error connecting to NanoBanana: {e}")
@@ -101,3 +108,6 @@ class NanoBananaService(AIService):
             
         except Exception as e:
             raise AIServiceError(f"Stage B failed: {e}")
+
+
+nanobanana_service = NanoBananaService()
@@ -0,0 +1,171 @@
+import asyncio
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+from pyapp.core.cache import MemoryLRUCache
+from pyapp.core.config import settings, logger
+from pyapp.core.fingerprint import stable_digest
+from pyapp.core.metrics import metrics
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_svg(svg_content: str) -> str:
+    """
+    Canonical form used for hashing.
+    Runs of whitespace render identically under the default xml:space
+    handling, so they are collapsed unless the document opts out.
+    """
+    svg = svg_content.strip()
+    if "xml:space" in svg:
+        return svg.replace("\r\n", "\n")
+    return _WHITESPACE.sub(" ", svg)
+
+
+def render_key(svg_content: str, width: int, height: int) -> str:
+    return stable_digest(
+        "render", {"svg": normalize_svg(svg_content), "width": width, "height": height}
+    )
+
+
+class DiskTier:
+    """
+    PNG files under <root>/<key[:2]>/<key>.png.
+    Writes go through a temp file + os.replace so readers never see a
+    partial PNG; when over max_bytes the oldest files are pruned.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 0):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.pruned = 0
+        self._bytes: Optional[int] = None
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.png"
+
+    def read(self, key: str) -> Optional[bytes]:
+        try:
+            data = self.path_for(key).read_bytes()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def write(self, key: str, data: bytes) -> None:
+        path = self.path_for(key)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self.writes += 1
+        if self.max_bytes:
+            if self._bytes is None:
+                self._bytes = sum(size for _, size, _ in self._scan())
+            else:
+                self._bytes += len(data)
+            if self._bytes > self.max_bytes:
+                self._prune()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "dir": str(self.root),
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "pruned": self.pruned,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _scan(self) -> list[tuple[float, int, Path]]:
+        files = []
+        for path in self.root.glob("*/*.png"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+        return files
+
+    def _prune(self) -> None:
+        files = sorted(self._scan())
+        total = sum(size for _, size, _ in files)
+        # Drop to 90% so we do not rescan on every subsequent write
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in files:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.pruned += 1
+        self._bytes = total
+
+
+class RenderCache:
+    """
+    Content-addressed PNG cache keyed by normalized SVG digest + viewport.
+    Memory tier in front of an optional on-disk tier shared by workers.
+    """
+
+    def __init__(
+        self,
+        memory_bytes: int,
+        disk_dir: str = "",
+        disk_max_bytes: int = 0,
+    ):
+        self.memory = MemoryLRUCache(max_bytes=memory_bytes)
+        self.disk = DiskTier(disk_dir, disk_max_bytes) if disk_dir else None
+
+    async def get(self, svg_content: str, width: int, height: int) -> Optional[bytes]:
+        key = render_key(svg_content, width, height)
+        png = await self.memory.get(key)
+        if png is not None or self.disk is None:
+            return png
+        png = await asyncio.to_thread(self.disk.read, key)
+        if png is not None:
+            await self.memory.set(key, png)
+        return png
+
+    async def put(self, svg_content: str, width: int, height: int, png: bytes) -> None:
+        key = render_key(svg_content, width, height)
+        await self.memory.set(key, png)
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.write, key, png)
+            except OSError as e:
+                logger.warning(f"Render cache disk write failed: {e}")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "memory": self.memory.stats(),
+            "disk": self.disk.stats() if self.disk is not None else None,
+        }
+
+
+render_cache: Optional[RenderCache] = (
+    RenderCache(
+        memory_bytes=settings.IMG_RENDER_CACHE_MEMORY_BYTES,
+        disk_dir=settings.IMG_RENDER_CACHE_DIR,
+        disk_max_bytes=settings.IMG_RENDER_CACHE_DISK_BYTES,
+    )
+    if settings.IMG_RENDER_CACHE_ENABLED
+    else None
+)
+
+if render_cache is not None:
+    metrics.register("render_cache", render_cache.stats)
@@ -0,0 +1,146 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable
+
+from playwright.async_api import Browser, Playwright
+
+from pyapp.core.config import logger
+from pyapp.core.exceptions import ImageGenerationError
+from pyapp.services.image.pool import PooledPage, RenderPool
+
+BROWSER_ARGS = ["--no-sandbox", "--disable-setuid-sandbox"]
+
+
+def resolve_browser_count(configured: int) -> int:
+    """0 (or less) means one browser per CPU core"""
+    if configured > 0:
+        return configured
+    return max(1, os.cpu_count() or 1)
+
+
+class BrowserWorker:
+    """One Chromium process with its own page pool"""
+
+    def __init__(
+        self,
+        index: int,
+        playwright: Playwright,
+        pool_factory: Callable[[], RenderPool],
+    ):
+        self.index = index
+        self._playwright = playwright
+        self._pool_factory = pool_factory
+        self._lock = asyncio.Lock()
+        self.browser: Browser | None = None
+        self.pool: RenderPool | None = None
+        self.restarts = 0
+        self._closing = False
+        self._restart_task: asyncio.Task | None = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.browser is not None and self.browser.is_connected()
+
+    @property
+    def load(self) -> int:
+        return self.pool.load if self.pool is not None else 0
+
+    async def start(self) -> None:
+        async with self._lock:
+            self._closing = False
+            await self._launch()
+
+    async def ensure_running(self) -> None:
+        """Relaunch the browser if it crashed or was closed underneath us"""
+        if self.healthy:
+            return
+        async with self._lock:
+            if self.healthy:
+                return
+            logger.warning(f"Render browser #{self.index} is down, restarting")
+            await self._shutdown()
+            await self._launch()
+            self.restarts += 1
+
+    async def close(self) -> None:
+        self._closing = True
+        async with self._lock:
+            await self._shutdown()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "index": self.index,
+            "healthy": self.healthy,
+            "restarts": self.restarts,
+            **(self.pool.stats() if self.pool is not None else {}),
+        }
+
+    async def _launch(self) -> None:
+        logger.info(f"Launching Playwright Browser #{self.index}...")
+        self.browser = await self._playwright.chromium.launch(args=BROWSER_ARGS)
+        self.browser.on("disconnected", self._on_disconnected)
+        self.pool = self._pool_factory()
+        await self.pool.start(self.browser)
+
+    def _on_disconnected(self, _browser: Browser) -> None:
+        # Restart eagerly so the next render does not pay the launch cost
+        if self._closing or (self._restart_task and not self._restart_task.done()):
+            return
+        self._restart_task = asyncio.get_running_loop().create_task(
+            self.ensure_running()
+        )
+
+    async def _shutdown(self) -> None:
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+        if self.browser is not None:
+            try:
+                await self.browser.close()
+            except Exception as e:
+                logger.warning(f"Failed to close browser #{self.index}: {e}")
+            self.browser = None
+
+
+class RenderFleet:
+    """
+    Shards renders across several browser processes.
+    Each render goes to the healthy worker with the fewest running plus
+    queued renders; a crashed browser is relaunched on next dispatch.
+    """
+
+    def __init__(self, workers: list[BrowserWorker]):
+        if not workers:
+            raise ValueError("RenderFleet needs at least one worker")
+        self.workers = workers
+
+    async def start(self) -> None:
+        await asyncio.gather(*(worker.start() for worker in self.workers))
+
+    async def close(self) -> None:
+        await asyncio.gather(*(worker.close() for worker in self.workers))
+
+    def pick(self) -> BrowserWorker:
+        healthy = [w for w in self.workers if w.healthy]
+        candidates = healthy or self.workers
+        return min(candidates, key=lambda w: w.load)
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[PooledPage]:
+        worker = self.pick()
+        await worker.ensure_running()
+        if worker.pool is None:
+            raise ImageGenerationError(f"Render browser #{worker.index} unavailable")
+        async with worker.pool.page() as pooled:
+            yield pooled
+
+    def stats(self) -> dict[str, Any]:
+        workers = [worker.stats() for worker in self.workers]
+        return {
+            "browsers": len(self.workers),
+            "in_use": sum(w.get("in_use", 0) for w in workers),
+            "waiting": sum(w.get("waiting", 0) for w in workers),
+            "restarts": sum(w["restarts"] for w in workers),
+            "workers": workers,
+        }
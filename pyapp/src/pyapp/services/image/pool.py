@@ -0,0 +1,180 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from playwright.async_api import Browser, Page
+
+from pyapp.core.config import logger
+from pyapp.core.exceptions import ImageGenerationError
+from pyapp.core.metrics import TimingStat
+
+
+class PooledPage:
+    """A warm Playwright page plus the bookkeeping the pool needs"""
+
+    __slots__ = ("page", "renders", "viewport")
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.renders = 0
+        self.viewport: tuple[int, int] | None = None
+
+    async def ensure_viewport(self, width: int, height: int) -> None:
+        """Resize only when the requested canvas differs from the last one"""
+        if self.viewport != (width, height):
+            await self.page.set_viewport_size({"width": width, "height": height})
+            self.viewport = (width, height)
+
+
+class RenderPool:
+    """
+    Bounded pool of reusable Playwright pages on a single browser.
+
+    At most `size` pages exist, so at most `size` renders run at once;
+    further callers wait for a slot (up to `acquire_timeout` seconds).
+    Pages are health-checked on checkout, discarded after a failed render
+    and recycled after `max_renders_per_page` renders to cap page memory.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        max_renders_per_page: int = 0,
+        acquire_timeout: float = 30.0,
+        page_timeout_ms: float | None = None,
+    ):
+        self.size = max(1, size)
+        self.max_renders_per_page = max_renders_per_page
+        self.acquire_timeout = acquire_timeout
+        self.page_timeout_ms = page_timeout_ms
+
+        self._browser: Browser | None = None
+        self._idle: deque[PooledPage] = deque()
+        self._slots = asyncio.Semaphore(self.size)
+        self._in_use = 0
+        self._waiting = 0
+
+        self.queue_wait = TimingStat()
+        self.render_time = TimingStat()
+        self.pages_created = 0
+        self.pages_recycled = 0
+        self.pages_discarded = 0
+        self.failures = 0
+        self.timeouts = 0
+
+    @property
+    def load(self) -> int:
+        """Renders running plus renders queued for a slot"""
+        return self._in_use + self._waiting
+
+    async def start(self, browser: Browser, warm: bool = True) -> None:
+        self._browser = browser
+        if warm:
+            while len(self._idle) < self.size:
+                self._idle.append(await self._new_page())
+        logger.info(f"Render pool started with {len(self._idle)} warm pages")
+
+    async def close(self) -> None:
+        while self._idle:
+            await self._close_page(self._idle.popleft())
+        self._browser = None
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[PooledPage]:
+        """Check out a page for a single render"""
+        if self._browser is None:
+            raise ImageGenerationError("Render pool is not started")
+
+        wait_start = time.perf_counter()
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise ImageGenerationError(
+                f"Timed out after {self.acquire_timeout}s waiting for a render slot"
+            )
+        finally:
+            self._waiting -= 1
+        self.queue_wait.observe((time.perf_counter() - wait_start) * 1000)
+
+        self._in_use += 1
+        pooled: PooledPage | None = None
+        healthy = False
+        try:
+            pooled = await self._checkout()
+            render_start = time.perf_counter()
+            yield pooled
+            self.render_time.observe((time.perf_counter() - render_start) * 1000)
+            healthy = True
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self._in_use -= 1
+            if pooled is not None:
+                await self._checkin(pooled, healthy)
+            self._slots.release()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "size": self.size,
+            "in_use": self._in_use,
+            "idle": len(self._idle),
+            "waiting": self._waiting,
+            "pages_created": self.pages_created,
+            "pages_recycled": self.pages_recycled,
+            "pages_discarded": self.pages_discarded,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "queue_wait": self.queue_wait.snapshot(),
+            "render_time": self.render_time.snapshot(),
+        }
+
+    def _is_healthy(self, pooled: PooledPage) -> bool:
+        return (
+            self._browser is not None
+            and self._browser.is_connected()
+            and not pooled.page.is_closed()
+        )
+
+    async def _checkout(self) -> PooledPage:
+        while self._idle:
+            pooled = self._idle.popleft()
+            if self._is_healthy(pooled):
+                return pooled
+            self.pages_discarded += 1
+            await self._close_page(pooled)
+        return await self._new_page()
+
+    async def _checkin(self, pooled: PooledPage, healthy: bool) -> None:
+        pooled.renders += 1
+        if not healthy or not self._is_healthy(pooled):
+            self.pages_discarded += 1
+            await self._close_page(pooled)
+        elif (
+            self.max_renders_per_page > 0
+            and pooled.renders >= self.max_renders_per_page
+        ):
+            self.pages_recycled += 1
+            await self._close_page(pooled)
+        else:
+            self._idle.append(pooled)
+
+    async def _new_page(self) -> PooledPage:
+        if self._browser is None:
+            raise ImageGenerationError("Render pool is not started")
+        page = await self._browser.new_page()
+        if self.page_timeout_ms is not None:
+            page.set_default_timeout(self.page_timeout_ms)
+        self.pages_created += 1
+        return PooledPage(page)
+
+    async def _close_page(self, pooled: PooledPage) -> None:
+        try:
+            if not pooled.page.is_closed():
+                await pooled.page.close()
+        except Exception as e:
+            logger.warning(f"Failed to close pooled page: {e}")
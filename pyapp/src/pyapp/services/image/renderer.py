@@ -1,41 +1,93 @@
 import asyncio
-from contextlib import asynccontextmanager
+from typing import Any
 
-from playwright.async_api import async_playwright, Browser, Page
+from playwright.async_api import async_playwright, Browser
 from pyapp.core.config import settings, logger
 from pyapp.core.exceptions import ImageGenerationError
+from pyapp.core.metrics import metrics
+from pyapp.core.singleflight import SingleFlight
+from pyapp.services.image.cache import RenderCache, render_cache, render_key
+from pyapp.services.image.fleet import BrowserWorker, RenderFleet, resolve_browser_count
+from pyapp.services.image.pool import RenderPool
 from pyapp.services.prompts import CANVAS_WIDTH, CANVAS_HEIGHT
 
 
 class PlaywrightRenderer:
     """
-    Image Renderer using Playwright for perfect Emoji support
+    Image Renderer using Playwright for perfect Emoji support.
+    Renders are sharded across IMG_BROWSER_COUNT browser processes, each
+    with a pool of warm pages bounded by IMG_MAX_CONCURRENCY.
+    Identical SVGs at the same size are served from the render cache.
     """
-    _browser: Browser | None = None
     _playwright = None
+    _fleet: RenderFleet | None = None
     _lock = asyncio.Lock()
+    _inflight = SingleFlight()
+
+    def __init__(
+        self,
+        width: int = CANVAS_WIDTH,
+        height: int = CANVAS_HEIGHT,
+        cache: RenderCache | None = render_cache,
+    ):
+        self.width = width
+        self.height = height
+        self.cache = cache
 
     @classmethod
-    async def get_browser(cls) -> Browser:
+    def _new_pool(cls) -> RenderPool:
+        return RenderPool(
+            size=settings.IMG_MAX_CONCURRENCY,
+            max_renders_per_page=settings.IMG_PAGE_MAX_RENDERS,
+            acquire_timeout=settings.PLAYWRIGHT_TIMEOUT / 1000,
+            page_timeout_ms=settings.PLAYWRIGHT_TIMEOUT,
+        )
+
+    @classmethod
+    async def start(cls) -> RenderFleet:
+        """Launch the browser fleet (IMG_BROWSER_COUNT browsers) once"""
         async with cls._lock:
-            if cls._browser is None:
-                logger.info("Launching Playwright Browser...")
+            if cls._fleet is None:
                 cls._playwright = await async_playwright().start()
-                cls._browser = await cls._playwright.chromium.launch(
-                    args=["--no-sandbox", "--disable-setuid-sandbox"]
-                )
-        return cls._browser
+                count = resolve_browser_count(settings.IMG_BROWSER_COUNT)
+                fleet = RenderFleet([
+                    BrowserWorker(i, cls._playwright, cls._new_pool)
+                    for i in range(count)
+                ])
+                await fleet.start()
+                cls._fleet = fleet
+        return cls._fleet
+
+    @classmethod
+    async def get_browser(cls) -> Browser:
+        """Browser of the least-loaded worker"""
+        fleet = await cls.start()
+        worker = fleet.pick()
+        await worker.ensure_running()
+        assert worker.browser is not None
+        return worker.browser
 
     @classmethod
     async def close(cls):
         async with cls._lock:
-            if cls._browser:
-                await cls._browser.close()
-                cls._browser = None
+            if cls._fleet:
+                await cls._fleet.close()
+                cls._fleet = None
             if cls._playwright:
                 await cls._playwright.stop()
                 cls._playwright = None
 
+    @classmethod
+    def stats(cls) -> dict[str, Any]:
+        """Render fleet metrics (queue wait, render time, page churn)"""
+        if cls._fleet is None:
+            return {"started": False}
+        return {
+            "started": True,
+            "inflight": cls._inflight.stats(),
+            **cls._fleet.stats(),
+        }
+
     async def render_svg_to_png(self, svg_content: str) -> bytes:
         """
         Render SVG string to PNG bytes using Playwright
@@ -43,43 +95,60 @@ class PlaywrightRenderer:
         if not svg_content.strip():
             raise ImageGenerationError("Empty SVG content")
 
-        browser = await self.get_browser()
-        page = await browser.new_page()
-        
+        if self.cache is not None:
+            cached = await self.cache.get(svg_content, self.width, self.height)
+            if cached is not None:
+                return cached
+
+        # Concurrent renders of the same SVG at the same size share one page
+        return await self._inflight.do(
+            render_key(svg_content, self.width, self.height),
+            lambda: self._render(svg_content),
+        )
+
+    async def _render(self, svg_content: str) -> bytes:
+        fleet = await self.start()
+
         try:
-            await page.set_viewport_size({"width": CANVAS_WIDTH, "height": CANVAS_HEIGHT})
-            
-            # Wrap SVG in HTML to ensure proper rendering
-            html_content = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <style>
-                    body {{ margin: 0; padding: 0; background: transparent; }}
-                    svg {{ width: {CANVAS_WIDTH}px; height: {CANVAS_HEIGHT}px; display: block; }}
-                </style>
-            </head>
-            <body>
-                {svg_content}
-            </body>
-            </html>
-            """
-            
-            await page.set_content(html_content, wait_until="domcontentloaded")
-            
-            # Screenshot
-            png_bytes = await page.screenshot(
-                type="png",
-                clip={"x": 0, "y": 0, "width": CANVAS_WIDTH, "height": CANVAS_HEIGHT}
-            )
-            
+            async with fleet.page() as pooled:
+                await pooled.ensure_viewport(self.width, self.height)
+
+                # Wrap SVG in HTML to ensure proper rendering
+                html_content = f"""
+                <!DOCTYPE html>
+                <html>
+                <head>
+                    <style>
+                        body {{ margin: 0; padding: 0; background: transparent; }}
+                        svg {{ width: {self.width}px; height: {self.height}px; display: block; }}
+                    </style>
+                </head>
+                <body>
+                    {svg_content}
+                </body>
+                </html>
+                """
+
+                await pooled.page.set_content(html_content, wait_until="domcontentloaded")
+
+                # Screenshot
+                png_bytes = await pooled.page.screenshot(
+                    type="png",
+                    clip={"x": 0, "y": 0, "width": self.width, "height": self.height}
+                )
+
             logger.info(f"Rendered PNG size: {len(png_bytes)} bytes")
-            return png_bytes
-            
+
+        except ImageGenerationError:
+            raise
         except Exception as e:
             logger.error(f"Playwright Rendering Error: {e}")
             raise ImageGenerationError(f"Failed to render SVG: {e}")
-        finally:
-            await page.close()
+
+        if self.cache is not None:
+            await self.cache.put(svg_content, self.width, self.height, png_bytes)
+        return png_bytes
 
 renderer = PlaywrightRenderer()
+
+metrics.register("renderer", PlaywrightRenderer.stats)
@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, Asyn
 from pyapp.main import app
 from pyapp.core.database import Base, get_db
 from pyapp.core.config import settings
+from pyapp.modules.auth.principal import principal_cache
 
 # Use in-memory SQLite for testing
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -46,6 +47,8 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
             pass
 
     app.dependency_overrides[get_db] = override_get_db
+    # Each test recreates the database, so cached principals are stale
+    principal_cache.clear()
     async with AsyncClient(app=app, base_url="http://test") as c:
         yield c
     app.dependency_overrides.clear()
@@ -0,0 +1,56 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from pyapp.core.config import settings
+from pyapp.modules.auth import service
+from pyapp.modules.auth.principal import principal_cache
+
+
+async def login(client: AsyncClient) -> dict[str, str]:
+    await client.post(
+        f"{settings.API_PREFIX}/auth/register",
+        json={"email": "cache@example.com", "password": "pw", "full_name": "Old"},
+    )
+    response = await client.post(
+        f"{settings.API_PREFIX}/auth/login",
+        data={"username": "cache@example.com", "password": "pw"},
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_principal_is_cached_and_invalidated_on_update(
+    client: AsyncClient, db_session: AsyncSession
+):
+    headers = await login(client)
+
+    first = await client.get(f"{settings.API_PREFIX}/auth/me", headers=headers)
+    hits = principal_cache.hits
+    second = await client.get(f"{settings.API_PREFIX}/auth/me", headers=headers)
+    assert first.json() == second.json()
+    assert principal_cache.hits == hits + 1
+
+    user = await service.get_user_by_email(db_session, "cache@example.com")
+    user.full_name = "New"
+    await db_session.commit()
+
+    response = await client.get(f"{settings.API_PREFIX}/auth/me", headers=headers)
+    assert response.json()["full_name"] == "New"
+    assert principal_cache.invalidations >= 1
+
+
+@pytest.mark.asyncio
+async def test_stateless_mode_trusts_token_claims(
+    client: AsyncClient, monkeypatch
+):
+    headers = await login(client)
+    monkeypatch.setattr(settings, "AUTH_STATELESS", True)
+
+    async def no_db(*args, **kwargs):
+        raise AssertionError("stateless auth should not query the database")
+
+    monkeypatch.setattr(service, "get_user", no_db)
+    response = await client.get(f"{settings.API_PREFIX}/auth/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == "cache@example.com"
@@ -0,0 +1,87 @@
+from pyapp.core.cache import MemoryLRUCache, RedisCache
+
+
+async def test_lru_evicts_least_recently_used_by_bytes():
+    cache = MemoryLRUCache(max_bytes=10)
+    await cache.set("a", b"aaaa")
+    await cache.set("b", b"bbbb")
+    assert await cache.get("a") == b"aaaa"  # a is now most recent
+
+    await cache.set("c", b"cccc")
+    assert await cache.get("b") is None
+    assert await cache.get("a") == b"aaaa"
+    assert cache.bytes == 8
+    assert cache.evictions == 1
+
+
+async def test_entry_limit_and_oversized_values():
+    cache = MemoryLRUCache(max_bytes=100, max_entries=2)
+    for key in "abc":
+        await cache.set(key, b"x")
+    assert len(cache) == 2
+    assert await cache.get("a") is None
+
+    await cache.set("big", b"x" * 101)
+    assert await cache.get("big") is None
+    assert len(cache) == 2
+
+
+async def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("pyapp.core.cache.time.monotonic", lambda: now[0])
+    cache = MemoryLRUCache(max_bytes=100, default_ttl=10)
+    await cache.set("a", b"1")
+    await cache.set("b", b"2", ttl=0)
+    now[0] += 11
+    assert await cache.get("a") is None
+    assert await cache.get("b") == b"2"
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["bytes"] == 1
+
+
+class FakeRedis:
+    def __init__(self, fail=False):
+        self.data = {}
+        self.fail = fail
+
+    async def get(self, key):
+        if self.fail:
+            raise ConnectionError("down")
+        return self.data.get(key)
+
+    async def set(self, key, value, px=None):
+        if self.fail:
+            raise ConnectionError("down")
+        self.data[key] = value
+        self.px = px
+
+
+async def test_redis_cache_namespaces_keys_and_applies_ttl():
+    client = FakeRedis()
+    cache = RedisCache("redis://unused", namespace="app:generate", default_ttl=60, client=client)
+    await cache.set("k", b"v")
+    assert client.data == {"app:generate:k": b"v"}
+    assert client.px == 60_000
+    assert await cache.get("k") == b"v"
+    assert await cache.get("missing") is None
+    assert cache.stats()["hit_ratio"] == 0.5
+
+
+async def test_redis_sub_second_ttl_still_expires():
+    client = FakeRedis()
+    cache = RedisCache("redis://unused", namespace="ns", client=client)
+    await cache.set("k", b"v", ttl=0.25)
+    assert client.px == 250
+    await cache.set("k", b"v", ttl=0.0001)
+    assert client.px == 1
+    await cache.set("k", b"v", ttl=0)
+    assert client.px is None
+
+
+async def test_redis_errors_degrade_to_misses():
+    cache = RedisCache("redis://unused", namespace="ns", client=FakeRedis(fail=True))
+    await cache.set("k", b"v")
+    assert await cache.get("k") is None
+    assert cache.stats()["errors"] == 2
@@ -0,0 +1,58 @@
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from pyapp.core import database
+from pyapp.core.database import READ_REPLICA, RoutingSession, TimedQueuePool
+
+
+def file_engine(path):
+    return create_async_engine(
+        f"sqlite+aiosqlite:///{path}", **database._engine_kwargs(f"sqlite+aiosqlite:///{path}")
+    )
+
+
+async def seed(engine, name):
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE t (name TEXT)"))
+        await conn.execute(text("INSERT INTO t VALUES (:n)"), {"n": name})
+
+
+async def test_pool_records_checkout_wait(tmp_path):
+    engine = file_engine(tmp_path / "a.db")
+    pool = engine.sync_engine.pool
+    assert isinstance(pool, TimedQueuePool)
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    assert pool.checkout_wait.count == 1
+    assert database._pool_stats(engine)["checkout_wait"]["count"] == 1
+    await engine.dispose()
+
+
+async def test_session_checks_out_nothing_until_first_query(tmp_path):
+    engine = file_engine(tmp_path / "a.db")
+    Session = async_sessionmaker(bind=engine, class_=AsyncSession)
+    async with Session():
+        pass
+    assert engine.sync_engine.pool.checkout_wait.count == 0
+    await engine.dispose()
+
+
+async def test_tagged_reads_go_to_replica(tmp_path, monkeypatch):
+    primary = file_engine(tmp_path / "primary.db")
+    replica = file_engine(tmp_path / "replica.db")
+    await seed(primary, "primary")
+    await seed(replica, "replica")
+    monkeypatch.setattr(database, "read_engine", replica)
+
+    Session = async_sessionmaker(
+        bind=primary, class_=AsyncSession, sync_session_class=RoutingSession
+    )
+    query = select(text("name")).select_from(text("t"))
+    async with Session() as session:
+        assert (await session.execute(query)).scalar() == "primary"
+        tagged = query.execution_options(**{READ_REPLICA: True})
+        assert (await session.execute(tagged)).scalar() == "replica"
+
+    await primary.dispose()
+    await replica.dispose()
@@ -0,0 +1,85 @@
+import asyncio
+import io
+import json
+import zipfile
+
+from pyapp.modules.export import schemas
+from pyapp.modules.export.service import MANIFEST_NAME, ExportReport, ExportService
+
+
+def cards(count: int, failing: int = 0) -> list[schemas.ExportCard]:
+    return [
+        schemas.ExportCard(svg="fail" if i == failing else f"<svg>{i}</svg>")
+        for i in range(1, count + 1)
+    ]
+
+
+async def test_stream_zip_reports_partial_success():
+    active = peak = 0
+
+    async def render(svg: str) -> bytes:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.005)
+        active -= 1
+        if svg == "fail":
+            raise RuntimeError("render failed")
+        return svg.encode()
+
+    service = ExportService(render, concurrency=3)
+    report = ExportReport()
+    chunks = [c async for c in service.stream_zip(cards(8, failing=5), report)]
+
+    # One chunk per rendered card plus the trailing manifest/central directory
+    assert len(chunks) == 8
+    assert peak == 3
+
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert archive.testzip() is None
+    assert archive.read("card_01.png") == b"<svg>1</svg>"
+    assert "card_05.png" not in archive.namelist()
+    manifest = json.loads(archive.read(MANIFEST_NAME))
+    assert manifest["success_count"] == 7
+    assert manifest["failures"] == [{"index": 5, "name": "card_05", "error": "render failed"}]
+    assert service.stats()["cards_failed"] == 1
+
+
+async def test_slow_client_backpressures_renders():
+    rendered = 0
+
+    async def render(svg: str) -> bytes:
+        nonlocal rendered
+        rendered += 1
+        return b"x" * 1024
+
+    service = ExportService(render, concurrency=2)
+    report = ExportReport()
+    async for _ in service.stream_zip(cards(30), report):
+        # Renders never run far ahead of what has been streamed
+        assert rendered - len(report.succeeded) <= 2 * service.workers + 1
+        await asyncio.sleep(0.001)
+    assert len(report.succeeded) == 30
+
+
+async def test_export_endpoint_streams_zip(client, monkeypatch):
+    from pyapp.modules.export import controller
+
+    async def render(svg: str) -> bytes:
+        return b"png"
+
+    monkeypatch.setattr(controller, "export_service", ExportService(render, concurrency=2))
+    await client.post("/api/auth/register", json={"email": "e@example.com", "password": "secret123"})
+    login = await client.post("/api/auth/login", data={"username": "e@example.com", "password": "secret123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    response = await client.post(
+        "/api/export/",
+        json={"cards": [{"svg": "<svg/>", "name": "cover"}, {"svg": "<svg/>"}]},
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    names = zipfile.ZipFile(io.BytesIO(response.content)).namelist()
+    assert sorted(names) == ["card_02.png", "cover.png", MANIFEST_NAME]
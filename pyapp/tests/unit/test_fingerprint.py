@@ -0,0 +1,73 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pyapp
+
+from pyapp.core.cache import MemoryLRUCache
+from pyapp.core.fingerprint import request_fingerprint
+from pyapp.modules.generate import schemas
+from pyapp.modules.generate.service import GenerateService
+from pyapp.services.image.cache import render_key
+
+REQUESTS = [
+    {"text": "公众号文章 1", "model": "deepseek", "style": "rich", "size": "4:5"},
+    {"text": "Hello\r\nworld  \n", "model": "deepseek"},
+    {"text": "带选项", "model": "nanobanana", "options": {"styleChoice": "minimal"}},
+]
+
+_CHILD = """
+import json, sys
+from pyapp.core.fingerprint import request_fingerprint
+from pyapp.services.image.cache import render_key
+requests = json.loads(sys.argv[1])
+print(json.dumps({
+    "requests": [request_fingerprint(**r) for r in requests],
+    "render": render_key("<svg><rect/></svg>", 1080, 1440),
+}))
+"""
+
+
+def _keys_in_subprocess(hash_seed: str) -> dict:
+    src = str(Path(next(iter(pyapp.__path__))).resolve().parent)
+    env = {**os.environ, "PYTHONHASHSEED": hash_seed, "PYTHONPATH": src}
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD, json.dumps(REQUESTS)],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_keys_match_across_processes():
+    first = _keys_in_subprocess("1")
+    second = _keys_in_subprocess("2")
+    local = [request_fingerprint(**r) for r in REQUESTS]
+
+    assert first == second
+    # Every request hits the key computed by the other processes
+    hits = sum(a == b for a, b in zip(local, first["requests"]))
+    assert hits / len(REQUESTS) == 1.0
+    assert first["render"] == render_key("<svg><rect/></svg>", 1080, 1440)
+
+
+def test_fingerprint_normalizes_text_but_not_inputs():
+    base = request_fingerprint("Hello\nworld", "deepseek", "rich", "4:5")
+    assert request_fingerprint("  Hello  \r\nworld\n", "DeepSeek", "rich", "4:5") == base
+    assert request_fingerprint("Hello\nworld", "deepseek", "simple", "4:5") != base
+    assert request_fingerprint("Hello\nworld", "deepseek", "rich", "1:1") != base
+    assert request_fingerprint("Hello\nworld", "deepseek", "rich", "4:5", {"styleChoice": "x"}) != base
+    assert request_fingerprint("Hello\nworld", "deepseek", "rich", "4:5", {"styleChoice": None}) == base
+
+
+def test_generate_cache_key_covers_options():
+    service = GenerateService(cache=MemoryLRUCache(max_bytes=1024))
+    plain = schemas.GenerateRequest(text="card")
+    styled = schemas.GenerateRequest(
+        text="card", options=schemas.GenerationOptions(styleChoice="minimal")
+    )
+    assert service._make_cache_key(plain) != service._make_cache_key(styled)
+    assert service._make_cache_key(plain) == service._make_cache_key(
+        schemas.GenerateRequest(text="card\n")
+    )
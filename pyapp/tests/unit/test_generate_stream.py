@@ -0,0 +1,84 @@
+import json
+
+import httpx
+import pytest
+
+from pyapp.core.http import http_clients
+from pyapp.modules.generate import schemas
+from pyapp.modules.generate.providers.base import SVGStreamExtractor
+from pyapp.modules.generate.providers.deepseek import DeepSeekService
+from pyapp.modules.generate.service import GenerateService
+
+
+def sse_body(*deltas: str) -> bytes:
+    lines = [
+        "data: " + json.dumps({"choices": [{"delta": {"content": d}}]})
+        for d in deltas
+    ]
+    return ("\n\n".join(lines + ["data: [DONE]"]) + "\n\n").encode()
+
+
+@pytest.fixture
+def mock_deepseek(monkeypatch):
+    responses = [
+        sse_body('```json\n{"template_type": ', '"bold"}\n```'),
+        sse_body("```svg\n<svg>", "<rect/>", "</svg>\n```"),
+    ]
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, content=responses[len(requests) - 1])
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setitem(http_clients._clients, "deepseek", client)
+    yield requests
+
+
+async def test_process_stream_emits_design_then_svg_chunks(mock_deepseek):
+    service = DeepSeekService()
+    events = [
+        e async for e in service.process_stream("text", schemas.GenerationOptions())
+    ]
+
+    assert events[0][0] == "design"
+    assert events[0][1].template_type == "bold"
+    # The ```svg fence is not forwarded
+    assert [d for e, d in events if e == "svg"] == ["<svg>", "<rect/>", "</svg>"]
+    assert events[-1] == ("svg_complete", "<svg><rect/></svg>")
+    assert all(r["stream"] is True for r in mock_deepseek)
+
+
+def test_svg_extractor_strips_fence_split_across_deltas():
+    deltas = ["Here you go:\n``", "`svg\n<s", 'vg width="1">', "<svg><rect/></s",
+              "vg></s", "vg>\n``", "`\nDone."]
+    extractor = SVGStreamExtractor()
+    chunks = [extractor.feed(d) for d in deltas] + [extractor.flush()]
+
+    svg = '<svg width="1"><svg><rect/></svg></svg>'
+    assert "".join(chunks) == svg
+    assert DeepSeekService().extract_svg_content("".join(deltas)) == svg
+    # Content is forwarded before the stream ends
+    assert chunks[2] == '<svg width="1">'
+
+
+def test_svg_extractor_flushes_unterminated_svg():
+    extractor = SVGStreamExtractor()
+    assert extractor.feed("```svg\n<svg><rect/></") == "<svg><rect/>"
+    assert extractor.flush() == "</"
+
+
+async def test_generate_card_stream_ends_with_rendered_response(mock_deepseek):
+    class FakeRenderer:
+        async def render_svg_to_png(self, svg):
+            return b"png"
+
+    service = GenerateService()
+    service.renderer = FakeRenderer()
+    request = schemas.GenerateRequest(text="stream me")
+
+    events = [e async for e in service.generate_card_stream(request)]
+    assert [e for e, _ in events] == ["design", "svg", "svg", "svg", "done"]
+    done = events[-1][1]
+    assert done.svgContent == "<svg><rect/></svg>"
+    assert done.cards[0].template == "bold"
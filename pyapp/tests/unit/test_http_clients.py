@@ -0,0 +1,31 @@
+from pyapp.api.dependencies import get_ai_service
+from pyapp.core.http import HTTPClientPool
+from pyapp.services.ai.deepseek import deepseek_service
+
+
+async def test_client_is_reused_per_provider():
+    pool = HTTPClientPool()
+    client = pool.get("deepseek")
+    assert pool.get("deepseek") is client
+    assert pool.get("nanobanana") is not client
+    await pool.aclose()
+
+
+async def test_closed_pool_reopens_lazily():
+    pool = HTTPClientPool()
+    pool.open("deepseek")
+    first = pool.get("deepseek")
+    await pool.aclose()
+    assert first.is_closed
+    assert pool.stats()["clients"] == []
+
+    second = pool.get("deepseek")
+    assert second is not first and not second.is_closed
+    await pool.aclose()
+
+
+async def test_ai_service_dependency_returns_singletons():
+    assert await get_ai_service("deepseek") is deepseek_service
+    assert await get_ai_service("deepseek") is await get_ai_service(None)
+    nanobanana = await get_ai_service("nanobanana")
+    assert await get_ai_service("nanobanana") is nanobanana
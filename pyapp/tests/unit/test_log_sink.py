@@ -0,0 +1,139 @@
+import io
+import logging
+import threading
+
+import orjson
+import pytest
+
+from pyapp.core.config import JSONFormatter
+from pyapp.core.log_sink import _STOP, QueueLogHandler
+
+
+class GatedStream(io.StringIO):
+    """Text stream whose writes wait until the test opens the gate"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.gate = threading.Event()
+        self.writes = 0
+
+    def write(self, s: str) -> int:
+        self.gate.wait(5)
+        self.writes += 1
+        return super().write(s)
+
+
+def make_logger(handler: logging.Handler) -> logging.Logger:
+    log = logging.getLogger(f"test_log_sink.{id(handler)}")
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    log.addHandler(handler)
+    return log
+
+
+def lines(stream: io.StringIO) -> list[dict]:
+    return [orjson.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_records_are_written_as_json_lines_in_batches():
+    stream = GatedStream()
+    handler = QueueLogHandler(JSONFormatter().to_dict, stream=stream)
+    log = make_logger(handler)
+
+    for i in range(100):
+        log.info("card %s rendered", i, extra={"request_id": "r-1"})
+    stream.gate.set()
+    handler.close()
+
+    records = lines(stream)
+    assert [r["message"] for r in records] == [f"card {i} rendered" for i in range(100)]
+    assert records[0]["request_id"] == "r-1"
+    assert records[0]["level"] == "INFO"
+    # Writer was stuck on the first batch while the rest queued up
+    assert stream.writes < 100
+    assert handler.stats()["written"] == 100
+    assert handler.stats()["dropped"] == 0
+
+
+def test_drop_policy_never_blocks_and_counts_losses():
+    stream = GatedStream()
+    handler = QueueLogHandler(JSONFormatter().to_dict, stream=stream, max_queue=5)
+    log = make_logger(handler)
+
+    for i in range(50):
+        log.info("event %s", i)
+    stats = handler.stats()
+    assert stats["dropped"] > 0
+    assert stats["enqueued"] + stats["dropped"] == 50
+
+    stream.gate.set()
+    handler.close()
+    records = lines(stream)
+    assert records[-1]["level"] == "WARNING"
+    assert f"dropped {stats['dropped']} records" in records[-1]["message"]
+
+
+def test_block_policy_waits_for_the_writer():
+    stream = GatedStream()
+    handler = QueueLogHandler(
+        JSONFormatter().to_dict, stream=stream, max_queue=2, policy="block", block_timeout=5
+    )
+    log = make_logger(handler)
+
+    threading.Timer(0.05, stream.gate.set).start()
+    for i in range(20):
+        log.info("event %s", i)
+    handler.close()
+
+    assert handler.stats()["dropped"] == 0
+    assert len(lines(stream)) == 20
+
+
+def test_exceptions_are_rendered_before_enqueue():
+    stream = io.StringIO()
+    handler = QueueLogHandler(JSONFormatter().to_dict, stream=stream)
+    log = make_logger(handler)
+
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        log.exception("render failed")
+    handler.close()
+
+    (record,) = lines(stream)
+    assert "ValueError: boom" in record["exception"]
+
+
+def test_writer_stops_when_sentinel_lands_mid_batch():
+    stream = GatedStream()
+    handler = QueueLogHandler(JSONFormatter().to_dict, stream=stream)
+    log = make_logger(handler)
+
+    log.info("first")
+    # Writer is now blocked writing "first"; a record races in behind the sentinel
+    late = logging.LogRecord("test", logging.INFO, __file__, 1, "late", None, None)
+    handler.queue.put(_STOP)
+    handler.queue.put(late)
+    stream.gate.set()
+    handler._thread.join(2)
+
+    assert not handler._thread.is_alive()
+    assert [r["message"] for r in lines(stream)] == ["first", "late"]
+    assert handler.stats()["write_errors"] == 0
+
+
+def test_records_after_close_are_counted_as_dropped():
+    stream = io.StringIO()
+    handler = QueueLogHandler(JSONFormatter().to_dict, stream=stream)
+    log = make_logger(handler)
+    handler.close()
+
+    log.info("too late")
+
+    assert handler.stats()["dropped"] == 1
+    assert handler.queue.empty()
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        QueueLogHandler(JSONFormatter().to_dict, policy="spill")
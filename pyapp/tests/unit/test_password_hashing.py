@@ -0,0 +1,20 @@
+import threading
+
+from pyapp.modules.auth import security
+
+
+async def test_hashing_runs_off_the_event_loop(monkeypatch):
+    threads = []
+    original = security.pwd_context.hash
+
+    def record_hash(password):
+        threads.append(threading.current_thread().name)
+        return original(password)
+
+    monkeypatch.setattr(security.pwd_context, "hash", record_hash)
+
+    hashed = await security.get_password_hash_async("s3cret")
+    assert await security.verify_password_async("s3cret", hashed)
+    assert not await security.verify_password_async("wrong", hashed)
+    assert threads and threads[0].startswith("pwd-hash")
+    assert threads[0] != threading.current_thread().name
@@ -0,0 +1,46 @@
+from pyapp.services.image.cache import RenderCache, render_key
+from pyapp.services.image.renderer import PlaywrightRenderer
+
+
+def test_key_ignores_formatting_but_not_viewport():
+    a = '<svg width="10">\n  <rect x="1"/>\n</svg>'
+    b = '  <svg width="10"> <rect x="1"/> </svg>\n'
+    assert render_key(a, 100, 100) == render_key(b, 100, 100)
+    assert render_key(a, 100, 100) != render_key(a, 100, 200)
+    assert render_key(a, 100, 100) != render_key(a.replace("1", "2"), 100, 100)
+
+
+async def test_disk_tier_survives_new_process_cache(tmp_path):
+    svg = "<svg><rect/></svg>"
+    first = RenderCache(memory_bytes=1024, disk_dir=str(tmp_path))
+    await first.put(svg, 10, 10, b"png")
+    assert list(tmp_path.glob("*/*.png"))
+    assert not list(tmp_path.glob("*/*.tmp"))
+
+    second = RenderCache(memory_bytes=1024, disk_dir=str(tmp_path))
+    assert await second.get(svg, 10, 10) == b"png"
+    assert second.disk.hits == 1
+    # Promoted into memory, disk not touched again
+    assert await second.get(svg, 10, 10) == b"png"
+    assert second.disk.hits == 1
+
+
+async def test_disk_tier_prunes_oldest(tmp_path):
+    cache = RenderCache(memory_bytes=1024, disk_dir=str(tmp_path), disk_max_bytes=10)
+    for i in range(4):
+        await cache.put(f"<svg>{i}</svg>", 10, 10, b"xxxx")
+    assert cache.disk.pruned > 0
+    assert cache.disk.stats()["bytes"] <= 10
+
+
+async def test_renderer_skips_browser_on_cache_hit(monkeypatch):
+    cache = RenderCache(memory_bytes=1024)
+    svg = "<svg><circle/></svg>"
+    await cache.put(svg, 1080, 1080, b"cached-png")
+
+    async def no_browser(cls):
+        raise AssertionError("browser should not be used")
+
+    monkeypatch.setattr(PlaywrightRenderer, "start", classmethod(no_browser))
+    renderer = PlaywrightRenderer(1080, 1080, cache=cache)
+    assert await renderer.render_svg_to_png(svg) == b"cached-png"
@@ -0,0 +1,193 @@
+import asyncio
+
+import pytest
+
+from pyapp.core.exceptions import ImageGenerationError
+from pyapp.services.image.fleet import BrowserWorker, RenderFleet
+from pyapp.services.image.pool import RenderPool
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+        self.viewports = []
+
+    def is_closed(self):
+        return self.closed
+
+    def set_default_timeout(self, timeout):
+        self.timeout = timeout
+
+    async def set_viewport_size(self, size):
+        self.viewports.append(size)
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.pages = []
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    def on(self, event, handler):
+        self.handlers = {event: handler}
+
+    async def close(self):
+        self.connected = False
+
+    async def new_page(self):
+        page = FakePage()
+        self.pages.append(page)
+        return page
+
+
+async def test_pages_are_warm_and_reused():
+    browser = FakeBrowser()
+    pool = RenderPool(size=2)
+    await pool.start(browser)
+    assert len(browser.pages) == 2
+
+    for _ in range(5):
+        async with pool.page() as pooled:
+            await pooled.ensure_viewport(100, 100)
+
+    assert len(browser.pages) == 2
+    stats = pool.stats()
+    assert stats["render_time"]["count"] == 5
+    assert stats["queue_wait"]["count"] == 5
+    assert stats["idle"] == 2
+
+
+async def test_concurrency_is_bounded_by_pool_size():
+    pool = RenderPool(size=2)
+    await pool.start(FakeBrowser())
+    running = 0
+    peak = 0
+
+    async def render():
+        nonlocal running, peak
+        async with pool.page():
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(render() for _ in range(6)))
+    assert peak == 2
+
+
+async def test_page_recycled_after_max_renders():
+    browser = FakeBrowser()
+    pool = RenderPool(size=1, max_renders_per_page=2)
+    await pool.start(browser)
+
+    for _ in range(4):
+        async with pool.page():
+            pass
+
+    assert pool.pages_recycled == 2
+    assert browser.pages[0].closed
+
+
+async def test_failed_render_discards_page():
+    browser = FakeBrowser()
+    pool = RenderPool(size=1)
+    await pool.start(browser)
+
+    with pytest.raises(RuntimeError):
+        async with pool.page():
+            raise RuntimeError("boom")
+
+    assert pool.failures == 1
+    assert pool.pages_discarded == 1
+    async with pool.page() as pooled:
+        assert pooled.page is browser.pages[1]
+
+
+async def test_closed_idle_page_is_replaced_on_checkout():
+    browser = FakeBrowser()
+    pool = RenderPool(size=1)
+    await pool.start(browser)
+    browser.pages[0].closed = True
+
+    async with pool.page() as pooled:
+        assert not pooled.page.is_closed()
+    assert pool.pages_discarded == 1
+
+
+async def test_acquire_timeout():
+    pool = RenderPool(size=1, acquire_timeout=0.01)
+    await pool.start(FakeBrowser())
+
+    async with pool.page():
+        with pytest.raises(ImageGenerationError):
+            async with pool.page():
+                pass
+    assert pool.timeouts == 1
+
+
+class FakeChromium:
+    def __init__(self):
+        self.launched = []
+
+    async def launch(self, args=None):
+        browser = FakeBrowser()
+        self.launched.append(browser)
+        return browser
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = FakeChromium()
+
+
+def make_fleet(count, size=1):
+    playwright = FakePlaywright()
+    workers = [
+        BrowserWorker(i, playwright, lambda: RenderPool(size=size))
+        for i in range(count)
+    ]
+    return RenderFleet(workers), playwright
+
+
+async def test_fleet_dispatches_to_least_loaded_browser():
+    fleet, playwright = make_fleet(3)
+    await fleet.start()
+    assert len(playwright.chromium.launched) == 3
+
+    used = []
+    release = asyncio.Event()
+
+    async def render():
+        async with fleet.page() as pooled:
+            used.append(pooled.page)
+            await release.wait()
+
+    tasks = [asyncio.create_task(render()) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    browsers_used = {
+        id(b) for b in playwright.chromium.launched for p in used if p in b.pages
+    }
+    assert len(browsers_used) == 3
+    assert fleet.stats()["in_use"] == 3
+
+    release.set()
+    await asyncio.gather(*tasks)
+    await fleet.close()
+
+
+async def test_fleet_restarts_crashed_browser():
+    fleet, playwright = make_fleet(1)
+    await fleet.start()
+    playwright.chromium.launched[0].connected = False
+
+    async with fleet.page():
+        pass
+
+    assert len(playwright.chromium.launched) == 2
+    assert fleet.stats()["restarts"] == 1
+    await fleet.close()
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from pyapp.core.cache import MemoryLRUCache
+from pyapp.core.singleflight import SingleFlight
+from pyapp.modules.generate import schemas
+from pyapp.modules.generate.service import GenerateService
+
+
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+    assert results == [1] * 5
+    assert calls == 1
+    assert flight.stats() == {"in_flight": 0, "executed": 1, "coalesced": 4}
+
+    # Key is released once done, so a later call runs again
+    assert await flight.do("k", work) == 2
+
+
+async def test_errors_reach_every_waiter():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        flight.do("k", fail), flight.do("k", fail), return_exceptions=True
+    )
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flight.in_flight == 0
+
+
+async def test_cancelled_waiter_does_not_cancel_shared_work():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flight.do("k", work))
+    second = asyncio.create_task(flight.do("k", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+async def test_generate_service_coalesces_identical_requests():
+    class SlowAI:
+        calls = 0
+
+        async def process(self, text, options):
+            SlowAI.calls += 1
+            await asyncio.sleep(0.01)
+            return "<svg></svg>", schemas.DesignJSON()
+
+    class FakeRenderer:
+        async def render_svg_to_png(self, svg):
+            return b"png"
+
+    service = GenerateService(cache=MemoryLRUCache(max_bytes=1 << 20))
+    service.ai_service = SlowAI()
+    service.renderer = FakeRenderer()
+    request = schemas.GenerateRequest(text="viral post")
+
+    responses = await asyncio.gather(*(service.generate_card(request) for _ in range(4)))
+    assert SlowAI.calls == 1
+    assert len({r.svgContent for r in responses}) == 1
+    assert service.inflight.coalesced == 3
@@ -0,0 +1,326 @@
+"""
+性能基准测试
+
+用法:
+    python scripts/benchmark.py            # 运行全部基准
+    python scripts/benchmark.py render     # 只运行指定基准
+    python scripts/benchmark.py native     # Pillow 原生光栅化 (无浏览器)
+    python scripts/benchmark.py pipeline   # 分阶段流水线吞吐 (模拟 LLM/渲染延迟)
+    python scripts/benchmark.py metrics    # 指标记录单次调用开销 (单线程/多线程)
+    python scripts/benchmark.py logging    # 业务日志事件脱敏开销
+"""
+
+import asyncio
+import copy
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+
+import structlog
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from gzh2xhs_refactor.domain.entities import Template, TemplateLibrary  # noqa: E402
+from gzh2xhs_refactor.domain.pipeline import GenerationPipeline  # noqa: E402
+from gzh2xhs_refactor.domain.services import CardGenerationService  # noqa: E402
+from gzh2xhs_refactor.infrastructure.services.image_renderer import (  # noqa: E402
+    PillowRenderer,
+    PlaywrightRenderer,
+    RenderOptions,
+)
+from gzh2xhs_refactor.infrastructure.services.task_runner import TaskRunner  # noqa: E402
+from gzh2xhs_refactor.infrastructure.services.task_store import SQLiteTaskStore  # noqa: E402
+from gzh2xhs_refactor.shared.logging import BusinessLogger, SensitiveDataFilter  # noqa: E402
+from gzh2xhs_refactor.shared.performance import MetricsCollector  # noqa: E402
+from gzh2xhs_refactor.shared.types import AIModel, CardStyle, GenerationRequest  # noqa: E402
+
+
+SAMPLE_SVG = """
+<svg xmlns="http://www.w3.org/2000/svg" width="1080" height="1440" viewBox="0 0 1080 1440">
+  <rect width="1080" height="1440" fill="#fff7f0"/>
+  <rect x="60" y="60" width="960" height="1320" rx="32" fill="#ffffff" stroke="#ff6b6b" stroke-width="4"/>
+  <text x="540" y="260" font-size="72" text-anchor="middle" fill="#333">小红书爆款标题 ✨</text>
+  <text x="120" y="420" font-size="40" fill="#555">
+    <tspan x="120" dy="0">1. 第一条要点 🔥</tspan>
+    <tspan x="120" dy="64">2. 第二条要点 💡</tspan>
+    <tspan x="120" dy="64">3. 第三条要点 ✅</tspan>
+  </text>
+  <path d="M120 1200 L960 1200" stroke="#ff6b6b" stroke-width="6"/>
+</svg>
+"""
+
+
+def _summary(samples: List[float]) -> str:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (
+        f"n={len(samples)} mean={statistics.mean(samples):.1f}ms "
+        f"p50={statistics.median(samples):.1f}ms p95={p95:.1f}ms "
+        f"max={ordered[-1]:.1f}ms"
+    )
+
+
+async def bench_render(iterations: int = 20, concurrency: int = 2) -> None:
+    """Playwright 单次渲染延迟 (旧实现固定等待 2s, 下限 >2000ms)"""
+    options = RenderOptions(width=1080, height=1440)
+
+    async with PlaywrightRenderer(page_pool_size=concurrency) as renderer:
+        # 预热: 首次渲染包含页面创建与字体加载
+        await renderer.render_svg_to_image(SAMPLE_SVG, options)
+
+        sequential = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            result = await renderer.render_svg_to_image(SAMPLE_SVG, options)
+            sequential.append((time.perf_counter() - start) * 1000)
+            if not result.success:
+                raise RuntimeError(result.error_message)
+        print(f"render sequential: {_summary(sequential)}")
+
+        async def timed() -> float:
+            start = time.perf_counter()
+            await renderer.render_svg_to_image(SAMPLE_SVG, options)
+            return (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        concurrent = await asyncio.gather(*(timed() for _ in range(iterations)))
+        elapsed = time.perf_counter() - start
+        print(
+            f"render concurrent({concurrency}): {_summary(list(concurrent))} "
+            f"throughput={iterations / elapsed:.1f}/s"
+        )
+
+
+async def bench_native(iterations: int = 20, concurrency: int = 4) -> None:
+    """Pillow 原生光栅化延迟与吞吐 (缺少 CJK/Emoji 字体时会回退到浏览器)"""
+    options = RenderOptions(width=1080, height=1440)
+
+    async with PillowRenderer(max_workers=concurrency) as renderer:
+        await renderer.render_svg_to_image(SAMPLE_SVG, options)
+
+        sequential = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            result = await renderer.render_svg_to_image(SAMPLE_SVG, options)
+            sequential.append((time.perf_counter() - start) * 1000)
+            if not result.success:
+                raise RuntimeError(result.error_message)
+        print(f"native sequential: {_summary(sequential)}")
+
+        async def timed() -> float:
+            start = time.perf_counter()
+            await renderer.render_svg_to_image(SAMPLE_SVG, options)
+            return (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        concurrent = await asyncio.gather(*(timed() for _ in range(iterations)))
+        elapsed = time.perf_counter() - start
+        print(
+            f"native concurrent({concurrency}): {_summary(list(concurrent))} "
+            f"throughput={iterations / elapsed:.1f}/s "
+            f"native={renderer.native_renders} fallback={renderer.fallback_renders}"
+        )
+
+
+class _SimulatedAI:
+    """模拟 LLM 延迟: Stage A 0.2s, Stage B 0.3s"""
+
+    async def generate_design_spec(self, request: Any, template: Any) -> None:
+        await asyncio.sleep(0.2)
+
+    async def generate_svg_content(self, design_spec: Any, style: Any) -> str:
+        await asyncio.sleep(0.3)
+        return SAMPLE_SVG
+
+
+class _SimulatedRenderer:
+    """模拟渲染 0.15s, 并记录浏览器同时渲染数"""
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.peak = 0
+
+    async def render_card(self, svg_content: str, size: str) -> bytes:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.15)
+        self.active -= 1
+        return b"png"
+
+
+class _NullEventBus:
+    async def publish(self, event_type: str, data: Any) -> None:
+        pass
+
+
+async def _run_pipeline(cards: int, runner_concurrency: int, pipeline: GenerationPipeline) -> None:
+    renderer = _SimulatedRenderer()
+    templates = TemplateLibrary([
+        Template(id="standard", name="标准", description="", style=CardStyle.STANDARD, config={})
+    ])
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = TaskRunner(SQLiteTaskStore(f"{tmp}/tasks.db"), max_concurrency=runner_concurrency)
+        service = CardGenerationService(
+            _SimulatedAI(), renderer, templates, _NullEventBus(), None,
+            task_runner=runner, pipeline=pipeline,
+        )
+        await runner.start()
+        start = time.perf_counter()
+        tasks = [
+            await service.generate_card(
+                GenerationRequest(text=f"卡片 {i}", model=AIModel.DEEPSEEK), "bench"
+            )
+            for i in range(cards)
+        ]
+        while runner.stats()["completed"] + runner.stats()["failed"] < cards:
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        await runner.drain()
+
+    print(
+        f"  runner={runner_concurrency:<3} {cards / elapsed * 60:7.1f} cards/min "
+        f"elapsed={elapsed:.2f}s peak_renders={renderer.peak} "
+        f"failed={runner.stats()['failed']} tasks={len(tasks)}"
+    )
+
+
+async def bench_pipeline(cards: int = 40, render_concurrency: int = 2) -> None:
+    """分阶段流水线: 只按渲染容量限并发 vs 各阶段独立限流"""
+    print("pipeline sequential stages (concurrency = browser capacity):")
+    await _run_pipeline(cards, render_concurrency, GenerationPipeline(render_concurrency=render_concurrency))
+
+    pipeline = GenerationPipeline(
+        design_concurrency=8, svg_concurrency=8, render_concurrency=render_concurrency
+    )
+    print("pipeline staged (LLM stages 8 wide, render 2):")
+    await _run_pipeline(cards, pipeline.capacity, pipeline)
+
+
+def _record_ns(record: Callable[[int], None], calls: int, threads: int) -> float:
+    """threads 个线程各调用 calls 次, 返回每次调用的平均墙钟耗时 (ns)"""
+    barrier = threading.Barrier(threads + 1)
+
+    def worker() -> None:
+        barrier.wait()
+        for i in range(calls):
+            record(i)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for worker_thread in workers:
+        worker_thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker_thread in workers:
+        worker_thread.join()
+    return (time.perf_counter() - start) / (calls * threads) * 1e9
+
+
+async def bench_metrics(calls: int = 200_000) -> None:
+    """指标记录开销: keep_history (加锁 + PerformanceMetrics 对象) vs 线程分片"""
+    tags = {"method": "GET", "endpoint": "/api/v1/cards", "status_code": "200"}
+    cases = {
+        "record_timing": lambda c: lambda i: c.record_timing("request_duration_ms", float(i % 500), tags),
+        "increment_counter": lambda c: lambda i: c.increment_counter("request_success_total", tags=tags),
+    }
+    for threads in (1, 4):
+        for name, make in cases.items():
+            for keep_history in (True, False):
+                collector = MetricsCollector(keep_history=keep_history)
+                ns = _record_ns(make(collector), calls // threads, threads)
+                mode = "locked+history" if keep_history else "sharded"
+                print(f"  {name:<18} {mode:<15} threads={threads} {ns:8.0f} ns/call")
+
+
+
+def _business_events() -> List[Dict[str, Any]]:
+    """BusinessLogger 的典型事件, 附带 structlog 处理链在脱敏前加入的字段"""
+    with structlog.testing.capture_logs() as events:
+        business = BusinessLogger(structlog.get_logger("gzh2xhs_refactor"))
+        business.log_card_generation_started("card-1", "user-1", "deepseek", "minimal", "tpl-1")
+        business.log_card_generation_completed("card-1", "user-1", 1834.2, 48213)
+        business.log_quota_check("user-1", "generate", 12, 100, True)
+        business.log_api_request("POST", "/api/v1/cards", 200, 42.1, "user-1", "req-1")
+        business.log_error("AIServiceError", "上游超时", {"ai_model": "deepseek", "attempt": 2})
+    for event in events:
+        event.update(
+            logger="gzh2xhs_refactor",
+            request_id="req-1",
+            user_id="user-1",
+            session_id="sess-1",
+            timestamp="2024-01-01T00:00:00",
+        )
+    return events
+
+
+def _legacy_filter(event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """改造前的实现: 每次重建字典, 每个键扫描全部敏感词"""
+    keys = SensitiveDataFilter.SENSITIVE_KEYS
+
+    def mask(key: str, value: Any) -> Any:
+        if any(k in key.lower() for k in keys):
+            if isinstance(value, str):
+                return "*" * len(value) if len(value) <= 4 else value[:2] + "*" * (len(value) - 4) + value[-2:]
+            return "***"
+        return value
+
+    def walk(obj: Dict[str, Any]) -> Dict[str, Any]:
+        filtered = {}
+        for key, value in obj.items():
+            if isinstance(value, dict):
+                filtered[key] = walk(value)
+            elif isinstance(value, list):
+                filtered[key] = [walk(i) if isinstance(i, dict) else mask(key, i) for i in value]
+            else:
+                filtered[key] = mask(key, value)
+        return filtered
+
+    return walk(event_dict)
+
+
+async def bench_logging(rounds: int = 20_000) -> None:
+    """SensitiveDataFilter 单个事件的处理开销 (BusinessLogger 事件)"""
+    events = _business_events()
+    with_secret = copy.deepcopy(events[0])
+    with_secret["access_token"] = "sk-0123456789abcdef"
+    data_filter = SensitiveDataFilter()
+    cases = {
+        "legacy": lambda event: _legacy_filter(event),
+        "compiled": lambda event: data_filter(None, "info", event),
+    }
+    for name, run in cases.items():
+        for label, sample in (("business", events), ("with_secret", [with_secret])):
+            start = time.perf_counter()
+            for _ in range(rounds):
+                for event in sample:
+                    run(event)
+            ns = (time.perf_counter() - start) / (rounds * len(sample)) * 1e9
+            print(f"  {name:<9} {label:<12} {ns:8.0f} ns/event")
+    assert [data_filter(None, "info", e) for e in events] == [_legacy_filter(e) for e in events]
+
+BENCHMARKS: Dict[str, Callable[[], Awaitable[None]]] = {
+    "render": bench_render,
+    "native": bench_native,
+    "pipeline": bench_pipeline,
+    "metrics": bench_metrics,
+    "logging": bench_logging,
+}
+
+
+def main() -> None:
+    names = sys.argv[1:] or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise SystemExit(f"未知基准: {', '.join(unknown)}; 可选: {', '.join(BENCHMARKS)}")
+
+    for name in names:
+        print(f"== {name}")
+        asyncio.run(BENCHMARKS[name]())
+    print("BENCH DONE")
+
+
+if __name__ == "__main__":
+    main()
@@ -27,11 +27,16 @@ from gzh2xhs_refactor.domain.services import (
     ImageRenderService,
     CacheService,
 )
-from gzh2xhs_refactor.infrastructure.providers import (
+from gzh2xhs_refactor.infrastructure.providers.ai_providers import (
     DeepSeekProvider,
     NanoBananaProvider,
+)
+from gzh2xhs_refactor.infrastructure.services.image_renderer import (
     PlaywrightRenderer,
 )
+from gzh2xhs_refactor.infrastructure.services.batch_exporter import (
+    BatchExporter,
+)
 
 __all__ = [
     "GenerateCardUseCase",
@@ -42,4 +47,5 @@ __all__ = [
     "DeepSeekProvider",
     "NanoBananaProvider",
     "PlaywrightRenderer",
+    "BatchExporter",
 ]
\ No newline at end of file
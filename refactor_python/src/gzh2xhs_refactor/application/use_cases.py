@@ -9,10 +9,13 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 import asyncio
+import os
+import tempfile
+import uuid
 
 from ..domain.services import (
     CardGenerationService,
@@ -27,7 +30,6 @@ from ..domain.entities import (
 )
 from ..shared.types import (
     GenerationRequest,
-    ExportRequest,
     ExportResult,
     GeneratedCard,
     GenerateResponse,
@@ -38,6 +40,7 @@ from ..shared.events import DomainEventPublisher
 from ..shared.logging import business_logger, set_request_context
 from ..shared.errors import (
     BaseAppError,
+    ConfigurationError,
     NotFoundError,
     ValidationError,
     QuotaExceededError,
@@ -50,9 +53,9 @@ class GenerateCardInput:
     """生成卡片输入"""
     text: str
     model: str
+    user_id: str
     style: str = "standard"
     size: str = "4:5"
-    user_id: str
     template_id: Optional[str] = None
     options: Optional[Dict[str, Any]] = None
 
@@ -102,12 +105,16 @@ class GenerateCardUseCase:
             # 1. 验证输入
             self._validate_input(input_data)
             
-            # 2. 检查业务规则和配额
+            # 2. 检查业务规则并预扣配额
             await self._check_business_rules(input_data)
             
-            # 3. 检查缓存
+            # 3. 检查缓存 (命中不计配额)
             cache_result = await self._check_cache(input_data)
             if cache_result:
+                await self._business_rule_service.release_quota(
+                    input_data.user_id,
+                    "generation",
+                )
                 business_logger.logger.info("缓存命中", operation="generate_card")
                 return GenerateCardOutput(
                     success=True,
@@ -125,17 +132,18 @@ class GenerateCardUseCase:
                 session_id=None,
             )
             
-            # 5. 执行生成
-            task = await self._card_service.generate_card(
-                request=request,
-                user_id=input_data.user_id,
-            )
-            
-            # 6. 消耗配额
-            await self._business_rule_service.consume_user_quota(
-                input_data.user_id,
-                "generation",
-            )
+            # 5. 执行生成, 提交失败时退回预扣的配额
+            try:
+                task = await self._card_service.generate_card(
+                    request=request,
+                    user_id=input_data.user_id,
+                )
+            except Exception:
+                await self._business_rule_service.release_quota(
+                    input_data.user_id,
+                    "generation",
+                )
+                raise
             
             business_logger.logger.info(
                 "生成卡片用例执行成功",
@@ -196,11 +204,11 @@ class GenerateCardUseCase:
             ) from e
     
     async def _check_business_rules(self, input_data: GenerateCardInput) -> None:
-        """检查业务规则"""
-        # 检查操作是否允许
-        allowed = await self._business_rule_service.is_operation_allowed(
+        """检查业务规则并预扣一次生成配额"""
+        allowed = await self._business_rule_service.reserve_quota(
             input_data.user_id,
             "generation",
+            1,
         )
         
         if not allowed:
@@ -220,6 +228,7 @@ class GenerateCardUseCase:
             model=input_data.model,
             style=input_data.style,
             size=input_data.size,
+            options=input_data.options,
         )
         
         try:
@@ -233,9 +242,9 @@ class GenerateCardUseCase:
 class ExportCardInput:
     """导出卡片输入"""
     card_ids: List[str]
+    user_id: str
     format: str = "png"
     quality: str = "high"
-    user_id: str
     batch_mode: bool = False
 
 
@@ -248,20 +257,33 @@ class ExportCardOutput:
     success_count: int
     failed_count: int
     error_message: Optional[str] = None
+    archive_path: Optional[str] = None
+    failures: List[Dict[str, Any]] = field(default_factory=list)
 
 
 class ExportCardUseCase:
-    """导出卡片用例"""
+    """导出卡片用例
+
+    通过批量导出器并发渲染卡片并流式写入 ZIP; 单张失败不影响其余卡片,
+    配额只按成功导出的数量扣减。batch_mode 为 True 时以批量优先级渲染,
+    否则按普通请求优先级渲染。
+    """
     
     def __init__(
         self,
         cache_service: CacheService,
         business_rule_service: BusinessRuleService,
         validation_service: ValidationService,
+        card_repository: Any = None,
+        batch_exporter: Any = None,
+        output_dir: Optional[str] = None,
     ) -> None:
         self._cache_service = cache_service
         self._business_rule_service = business_rule_service
         self._validation_service = validation_service
+        self._card_repo = card_repository
+        self._batch_exporter = batch_exporter
+        self._output_dir = output_dir or tempfile.gettempdir()
     
     async def execute(self, input_data: ExportCardInput) -> ExportCardOutput:
         """执行导出卡片用例"""
@@ -277,41 +299,57 @@ class ExportCardUseCase:
             # 1. 验证输入
             self._validate_input(input_data)
             
-            # 2. 检查配额
+            # 2. 一次性预扣全部卡片的配额
             await self._check_quota(input_data)
             
-            # 3. 执行导出
-            export_request = ExportRequest(
-                card_ids=input_data.card_ids,
-                format=input_data.format,
-                quality=input_data.quality,
-                batch_mode=input_data.batch_mode,
+            archive_path = os.path.join(
+                self._output_dir,
+                f"export_{input_data.user_id}_{uuid.uuid4().hex[:12]}.zip",
             )
-            
-            # 这里应该调用具体的导出服务
-            # 简化处理，返回模拟结果
-            files = []
-            success_count = 0
-            failed_count = 0
-            
-            for card_id in input_data.card_ids:
+            try:
+                # 3. 加载卡片 SVG, 缺失的卡片记为失败
+                items, missing = await self._load_items(input_data)
+                
+                # 4. 并发渲染并写入 ZIP
+                report = await self._batch_exporter.export_cards(
+                    items,
+                    archive_path,
+                    format=input_data.format,
+                    quality=input_data.quality,
+                    batch_mode=input_data.batch_mode,
+                )
+            except Exception:
+                # 不留下写了一半的压缩包
                 try:
-                    # 模拟导出成功
-                    files.append({
-                        "card_id": card_id,
-                        "url": f"https://cdn.example.com/cards/{card_id}.{input_data.format}",
-                        "format": input_data.format,
-                    })
-                    success_count += 1
-                except Exception:
-                    failed_count += 1
-            
-            # 4. 消耗配额
-            await self._business_rule_service.consume_user_quota(
-                input_data.user_id,
-                "export",
-                len(input_data.card_ids),
-            )
+                    os.remove(archive_path)
+                except FileNotFoundError:
+                    pass
+                await self._business_rule_service.release_quota(
+                    input_data.user_id,
+                    "export",
+                    len(input_data.card_ids),
+                )
+                raise
+            
+            files = [
+                {
+                    "card_id": entry["key"],
+                    "name": entry["name"],
+                    "archive": archive_path,
+                    "format": input_data.format,
+                }
+                for entry in report.succeeded
+            ]
+            success_count = report.success_count
+            failed_count = report.failed_count + len(missing)
+            
+            # 5. 配额只按成功数量计, 退回失败部分
+            if success_count < len(input_data.card_ids):
+                await self._business_rule_service.release_quota(
+                    input_data.user_id,
+                    "export",
+                    len(input_data.card_ids) - success_count,
+                )
             
             business_logger.logger.info(
                 "导出卡片用例执行成功",
@@ -320,14 +358,19 @@ class ExportCardUseCase:
                 total_count=len(input_data.card_ids),
                 success_count=success_count,
                 failed_count=failed_count,
+                archive=archive_path,
+                elapsed_ms=report.elapsed_ms,
             )
             
             return ExportCardOutput(
-                success=True,
+                success=success_count > 0,
                 files=files,
                 total_count=len(input_data.card_ids),
                 success_count=success_count,
                 failed_count=failed_count,
+                error_message=None if success_count else "所有卡片导出失败",
+                archive_path=archive_path,
+                failures=report.failed + missing,
             )
             
         except BaseAppError as e:
@@ -366,6 +409,33 @@ class ExportCardUseCase:
                 error_message="导出卡片时发生未知错误",
             )
     
+    async def _load_items(
+        self,
+        input_data: ExportCardInput,
+    ) -> Tuple[List[Tuple[str, str]], List[Dict[str, Any]]]:
+        """并发加载卡片, 返回 ([(card_id, svg)], 缺失/未完成的卡片)"""
+        if self._card_repo is None or self._batch_exporter is None:
+            raise ConfigurationError(
+                message="导出服务未配置卡片仓库或批量导出器",
+                error_code="EXPORT_NOT_CONFIGURED",
+            )
+        
+        cards = await asyncio.gather(
+            *(self._card_repo.get_by_id(card_id) for card_id in input_data.card_ids),
+            return_exceptions=True,
+        )
+        
+        items: List[Tuple[str, str]] = []
+        missing: List[Dict[str, Any]] = []
+        for card_id, card in zip(input_data.card_ids, cards):
+            if isinstance(card, Exception) or card is None:
+                missing.append({"key": card_id, "name": card_id, "error": "卡片不存在"})
+            elif card.render_result is None or not card.render_result.svg_content:
+                missing.append({"key": card_id, "name": card_id, "error": "卡片尚未生成完成"})
+            else:
+                items.append((card_id, card.render_result.svg_content))
+        return items, missing
+    
     def _validate_input(self, input_data: ExportCardInput) -> None:
         """验证输入"""
         try:
@@ -377,10 +447,11 @@ class ExportCardUseCase:
             ) from e
     
     async def _check_quota(self, input_data: ExportCardInput) -> None:
-        """检查配额"""
-        allowed = await self._business_rule_service.is_operation_allowed(
+        """检查并预扣导出配额 (N 张卡片一次扣减)"""
+        allowed = await self._business_rule_service.reserve_quota(
             input_data.user_id,
             "export",
+            len(input_data.card_ids),
         )
         
         if not allowed:
@@ -505,7 +576,11 @@ class GetTaskStatusOutput:
 
 
 class GetTaskStatusUseCase:
-    """获取任务状态用例"""
+    """获取任务状态用例
+
+    task_repository 通常为持久化任务库 (或包装它的 TaskRunner),
+    因此进程重启后已完成任务仍可查询。
+    """
     
     def __init__(self, task_repository: Any) -> None:
         self._task_repo = task_repository
@@ -539,7 +614,10 @@ class GetTaskStatusUseCase:
             
             # 如果任务完成，添加结果URL
             if task.is_completed and task.result:
-                output.result_url = f"https://cdn.example.com/cards/{task.card_id}.png"
+                output.result_url = (
+                    task.result.image_url
+                    or f"https://cdn.example.com/cards/{task.card_id}.png"
+                )
             elif task.is_failed:
                 output.error_message = task.error_message
             
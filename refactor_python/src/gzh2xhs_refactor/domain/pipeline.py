@@ -0,0 +1,116 @@
+"""
+生成流水线
+
+把卡片生成拆成按资源类型限流的阶段：
+- design: Stage A 设计规格 (LLM, 可以很宽)
+- svg: Stage B SVG 生成 (LLM, 可以很宽)
+- render: 图像渲染 (受浏览器页面数约束)
+
+每个任务只在当前阶段占用该阶段的名额, 离开即释放, 因此一张卡片
+渲染时, 其他卡片的 LLM 阶段可以同时进行; 渲染阶段的上限保证不会
+超额占用 Chromium。
+"""
+
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional
+import asyncio
+import time
+
+
+STAGE_DESIGN = "design"
+STAGE_SVG = "svg"
+STAGE_RENDER = "render"
+
+
+@dataclass
+class _StageStats:
+    """阶段统计"""
+    entered: int = 0
+    completed: int = 0
+    failed: int = 0
+    active: int = 0
+    waiting: int = 0
+    wait_ms_total: float = 0.0
+    busy_ms_total: float = 0.0
+
+
+class PipelineStage:
+    """有并发上限的流水线阶段"""
+
+    def __init__(self, name: str, concurrency: int) -> None:
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._stats = _StageStats()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """占用阶段名额执行一段代码"""
+        if self._semaphore is None:
+            # 延迟创建, 绑定到实际运行的事件循环
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        stats = self._stats
+        queued_at = time.perf_counter()
+        stats.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            stats.waiting -= 1
+        started_at = time.perf_counter()
+        stats.wait_ms_total += (started_at - queued_at) * 1000
+        stats.entered += 1
+        stats.active += 1
+        try:
+            yield
+        except BaseException:
+            stats.failed += 1
+            raise
+        else:
+            stats.completed += 1
+        finally:
+            stats.active -= 1
+            stats.busy_ms_total += (time.perf_counter() - started_at) * 1000
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        s = self._stats
+        return {
+            "concurrency": self.concurrency,
+            "active": s.active,
+            "waiting": s.waiting,
+            "entered": s.entered,
+            "completed": s.completed,
+            "failed": s.failed,
+            "avg_wait_ms": round(s.wait_ms_total / s.entered, 2) if s.entered else 0.0,
+            "avg_busy_ms": round(s.busy_ms_total / s.entered, 2) if s.entered else 0.0,
+        }
+
+
+class GenerationPipeline:
+    """卡片生成流水线: 各阶段独立限流"""
+
+    def __init__(
+        self,
+        design_concurrency: int = 8,
+        svg_concurrency: int = 8,
+        render_concurrency: int = 2,
+    ) -> None:
+        self.stages: Dict[str, PipelineStage] = {
+            STAGE_DESIGN: PipelineStage(STAGE_DESIGN, design_concurrency),
+            STAGE_SVG: PipelineStage(STAGE_SVG, svg_concurrency),
+            STAGE_RENDER: PipelineStage(STAGE_RENDER, render_concurrency),
+        }
+
+    def stage(self, name: str) -> PipelineStage:
+        return self.stages[name]
+
+    @property
+    def capacity(self) -> int:
+        """流水线可同时容纳的任务数; 任务执行器并发应不小于此值才能填满各阶段"""
+        return sum(stage.concurrency for stage in self.stages.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: stage.stats() for name, stage in self.stages.items()}
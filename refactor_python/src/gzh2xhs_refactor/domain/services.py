@@ -9,14 +9,18 @@
 
 from __future__ import annotations
 
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Set
 from datetime import datetime
+from uuid import UUID
 import asyncio
 import logging
 
-from ..shared.types import DesignSpec, GenerationRequest, CardStyle
+from ..shared.types import AIModel, CardSize, DesignSpec, GenerationRequest, CardStyle, RenderResult
 from .entities import (
     Card,
+    CardId,
+    ContentText,
+    UserId,
     Template,
     GenerationTask,
     TemplateLibrary,
@@ -25,11 +29,16 @@ from .entities import (
     TemplateNotFoundError,
     CardNotFoundError,
 )
+from .pipeline import STAGE_DESIGN, STAGE_RENDER, STAGE_SVG, GenerationPipeline
 from ..shared.events import DomainEvent, EventBus
+from ..shared.fingerprint import generation_fingerprint
 
 
 logger = logging.getLogger(__name__)
 
+# 卡片生成在任务执行器中的任务类型
+GENERATION_TASK_KIND = "card_generation"
+
 
 class AIService:
     """AI分析服务"""
@@ -159,12 +168,21 @@ class CardGenerationService:
         template_library: TemplateLibrary,
         event_bus: EventBus,
         cache_service: Any,
+        task_runner: Any = None,
+        pipeline: Optional[GenerationPipeline] = None,
     ) -> None:
         self._ai_service = ai_service
         self._render_service = render_service
         self._template_library = template_library
         self._event_bus = event_bus
         self._cache_service = cache_service
+        # 分阶段限流: LLM 阶段宽, 渲染阶段按浏览器容量
+        self._pipeline = pipeline or GenerationPipeline()
+        # 持久化任务执行器; 未配置时在进程内执行 (仍持有任务引用防止被回收)
+        self._task_runner = task_runner
+        self._background_tasks: Set[asyncio.Task] = set()
+        if task_runner is not None:
+            task_runner.register(GENERATION_TASK_KIND, self.run_generation_task)
 
     async def generate_card(
         self,
@@ -193,7 +211,14 @@ class CardGenerationService:
             )
             
             # 异步执行生成任务
-            asyncio.create_task(self._execute_generation(task, card))
+            if self._task_runner is not None:
+                await self._task_runner.submit(
+                    task, GENERATION_TASK_KIND, self._task_payload(card)
+                )
+            else:
+                background = asyncio.create_task(self._execute_generation(task, card))
+                self._background_tasks.add(background)
+                background.add_done_callback(self._background_tasks.discard)
             
             logger.info(f"卡片生成任务已创建: task_id={task.id}")
             return task
@@ -202,6 +227,56 @@ class CardGenerationService:
             logger.error(f"创建生成任务失败: {e}")
             raise DomainError(f"生成卡片失败: {e}") from e
 
+    @property
+    def pipeline(self) -> GenerationPipeline:
+        """生成流水线 (用于监控各阶段排队与占用情况)"""
+        return self._pipeline
+
+    async def run_generation_task(
+        self,
+        task: GenerationTask,
+        payload: Dict[str, Any],
+    ) -> None:
+        """任务执行器入口: 由持久化的载荷重建卡片后执行 (含重启后恢复)"""
+        card = Card(
+            id=CardId(UUID(payload["card_id"])),
+            user_id=UserId(payload["user_id"]),
+            template_id=payload["template_id"],
+            content=ContentText(payload["text"]),
+            style=CardStyle(payload["style"]),
+            size=CardSize(payload["size"]),
+            ai_model=AIModel(payload["model"]),
+            design_spec=DesignSpec(
+                template_type="default",
+                color_scheme={},
+                layout_config={},
+                font_config={},
+                element_positions={},
+                style_metadata={},
+            ),
+        )
+        card.start_generation()
+        await self._execute_generation(task, card)
+
+    @staticmethod
+    def _task_payload(card: Card) -> Dict[str, Any]:
+        """重新执行生成任务所需的全部输入"""
+        return {
+            "card_id": str(card.id),
+            "user_id": str(card.user_id),
+            "template_id": card.template_id,
+            "text": card.content.value,
+            "style": card.style.value,
+            "size": card.size.value,
+            "model": card.ai_model.value,
+        }
+
+    async def _checkpoint(self, task: GenerationTask, progress: float) -> None:
+        """更新进度并写回任务库"""
+        task.update_progress(progress)
+        if self._task_runner is not None:
+            await self._task_runner.checkpoint(task)
+
     async def _execute_generation(
         self,
         task: GenerationTask,
@@ -214,31 +289,35 @@ class CardGenerationService:
             # 获取模板
             template = self._template_library.get_template(card.template_id)
             
+            # 各阶段只占用本阶段的名额: 本卡片渲染时, 其他卡片的 LLM 阶段可并行
             # 生成设计规格 (20%)
-            task.update_progress(20.0)
-            design_spec = await self._ai_service.generate_design_spec(
-                GenerationRequest(
-                    text=card.content.value,
-                    model=card.ai_model,
-                    style=card.style,
-                    size=card.size,
-                ),
-                template,
-            )
+            async with self._pipeline.stage(STAGE_DESIGN).slot():
+                await self._checkpoint(task, 20.0)
+                design_spec = await self._ai_service.generate_design_spec(
+                    GenerationRequest(
+                        text=card.content.value,
+                        model=card.ai_model,
+                        style=card.style,
+                        size=card.size,
+                    ),
+                    template,
+                )
             
             # 生成SVG内容 (50%)
-            task.update_progress(50.0)
-            svg_content = await self._ai_service.generate_svg_content(
-                design_spec,
-                card.style,
-            )
+            async with self._pipeline.stage(STAGE_SVG).slot():
+                await self._checkpoint(task, 50.0)
+                svg_content = await self._ai_service.generate_svg_content(
+                    design_spec,
+                    card.style,
+                )
             
             # 渲染图像 (80%)
-            task.update_progress(80.0)
-            png_data = await self._render_service.render_card(
-                svg_content,
-                card.size.value,
-            )
+            async with self._pipeline.stage(STAGE_RENDER).slot():
+                await self._checkpoint(task, 80.0)
+                png_data = await self._render_service.render_card(
+                    svg_content,
+                    card.size.value,
+                )
             
             # 完成生成 (100%)
             render_result = RenderResult(
@@ -303,8 +382,6 @@ class CardGenerationService:
         template = templates[0]
         
         # 创建卡片
-        from ..shared.types import CardId, UserId, ContentText
-        
         card = Card(
             id=CardId.generate(),
             user_id=UserId(user_id),
@@ -371,9 +448,8 @@ class CacheService:
             logger.warning(f"设置缓存失败: {e}")
 
     def _generate_cache_key(self, request: GenerationRequest) -> str:
-        """生成缓存键"""
-        content_hash = hash(request.text)
-        return f"generation:{request.model}:{request.style}:{content_hash}"
+        """生成缓存键 (跨进程稳定, 多 worker 可共享缓存)"""
+        return f"generation:{generation_fingerprint(request)}"
 
 
 class ValidationService:
@@ -408,10 +484,15 @@ class ValidationService:
 
 
 class BusinessRuleService:
-    """业务规则服务"""
+    """业务规则服务
+
+    配置了 quota_store 时, 已用额度由存储原子维护 (try_consume/refund),
+    用户实体只提供是否启用和额度上限; 否则沿用实体上的 quota 计数。
+    """
     
-    def __init__(self, user_repository: Any) -> None:
+    def __init__(self, user_repository: Any, quota_store: Any = None) -> None:
         self._user_repo = user_repository
+        self._quota_store = quota_store
 
     async def check_user_quota(
         self,
@@ -421,7 +502,7 @@ class BusinessRuleService:
         """检查用户配额"""
         try:
             user = await self._user_repo.get_by_id(user_id)
-            return user.check_quota(operation) if user else False
+            return await self._has_quota(user, operation) if user else False
         except Exception as e:
             logger.error(f"检查用户配额失败: {e}")
             return False
@@ -435,13 +516,67 @@ class BusinessRuleService:
         """消耗用户配额"""
         try:
             user = await self._user_repo.get_by_id(user_id)
-            if user:
+            if not user:
+                return
+            if self._quota_store is None:
                 user.consume_quota(operation, count)
                 await self._user_repo.save(user)
+            elif not await self._quota_store.try_consume(
+                user_id, operation, count, self._quota_limit(user, operation)
+            ):
+                raise DomainError(f"配额不足: {operation}")
         except Exception as e:
             logger.error(f"消耗用户配额失败: {e}")
             raise DomainError(f"消耗用户配额失败: {e}")
 
+    async def reserve_quota(
+        self,
+        user_id: str,
+        operation: str,
+        count: int = 1,
+    ) -> bool:
+        """检查并预扣配额: 一次读用户 + 一次原子扣减
+
+        返回 False 表示用户不可用或额度不足 (此时没有扣减);
+        预扣后操作没有完成的部分应通过 release_quota 退回。
+        """
+        try:
+            user = await self._user_repo.get_by_id(user_id)
+            if not user or not user.is_active:
+                return False
+            if self._quota_store is None:
+                if not user.check_quota(operation, count):
+                    return False
+                user.consume_quota(operation, count)
+                await self._user_repo.save(user)
+                return True
+            return await self._quota_store.try_consume(
+                user_id, operation, count, self._quota_limit(user, operation)
+            )
+        except Exception as e:
+            logger.error(f"预扣用户配额失败: {e}")
+            return False
+
+    async def release_quota(
+        self,
+        user_id: str,
+        operation: str,
+        count: int = 1,
+    ) -> None:
+        """退回预扣但未使用的配额"""
+        if count <= 0:
+            return
+        try:
+            if self._quota_store is not None:
+                await self._quota_store.refund(user_id, operation, count)
+                return
+            user = await self._user_repo.get_by_id(user_id)
+            if user:
+                user.quota[operation] = max(0, user.quota.get(operation, 0) - count)
+                await self._user_repo.save(user)
+        except Exception as e:
+            logger.error(f"退回用户配额失败: {e}")
+
     async def is_operation_allowed(
         self,
         user_id: str,
@@ -453,7 +588,17 @@ class BusinessRuleService:
             if not user or not user.is_active:
                 return False
             
-            return await self.check_user_quota(user_id, operation)
+            return await self._has_quota(user, operation)
         except Exception as e:
             logger.error(f"检查操作权限失败: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    async def _has_quota(self, user: Any, operation: str, count: int = 1) -> bool:
+        if self._quota_store is None:
+            return user.check_quota(operation, count)
+        used = await self._quota_store.get_used(str(user.id), operation)
+        return used + count <= self._quota_limit(user, operation)
+
+    @staticmethod
+    def _quota_limit(user: Any, operation: str) -> int:
+        return user.preferences.get(f"{operation}_quota", 100)
@@ -17,9 +17,9 @@ import asyncio
 import httpx
 import logging
 
-from ..shared.types import DesignSpec, GenerationOptions
-from ..shared.errors import AIServiceError, InfrastructureError
-from ..shared.logging import business_logger
+from ...shared.types import DesignSpec
+from ...shared.errors import AIServiceError, InfrastructureError
+from ...shared.logging import business_logger
 
 
 logger = logging.getLogger(__name__)
@@ -0,0 +1,262 @@
+"""
+基础设施层 - 批量导出
+
+把多张卡片并发渲染并以流式 ZIP 输出：
+- 固定数量的渲染协程共享一个卡片迭代器, 结果经有界队列交给唯一的写入方
+- 每张卡片完成即写入 ZIP 并产出字节块, 内存中最多同时持有 2×concurrency 张图片
+- 单张失败不影响其余卡片, 成功/失败明细写入报告与压缩包内的 manifest.json
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+import asyncio
+import io
+import json
+import re
+import time
+import zipfile
+
+from ...shared.errors import RenderServiceError
+from ...shared.logging import business_logger
+from .image_renderer import BaseImageRenderer, RenderOptions, RenderPriority, RenderQueue
+
+
+MANIFEST_NAME = "manifest.json"
+
+_UNSAFE_NAME = re.compile(r"[^\w.-]+")
+
+
+@dataclass
+class ExportItem:
+    """待导出的卡片"""
+    name: str
+    svg_content: str
+    key: Optional[str] = None
+
+
+@dataclass
+class BatchExportReport:
+    """批量导出报告 (支持部分成功)"""
+    total: int = 0
+    succeeded: List[Dict[str, Any]] = field(default_factory=list)
+    failed: List[Dict[str, Any]] = field(default_factory=list)
+    bytes_written: int = 0
+    elapsed_ms: float = 0.0
+
+    @property
+    def success_count(self) -> int:
+        return len(self.succeeded)
+
+    @property
+    def failed_count(self) -> int:
+        return len(self.failed)
+
+    def to_manifest(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "success_count": self.success_count,
+            "failed_count": self.failed_count,
+            "files": self.succeeded,
+            "failures": self.failed,
+        }
+
+
+class _ChunkSink(io.RawIOBase):
+    """ZipFile 的不可寻址输出: 缓存写入的字节直到被取走"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class BatchExporter:
+    """批量导出器: 并发渲染 + 流式 ZIP"""
+
+    def __init__(
+        self,
+        renderer: BaseImageRenderer,
+        concurrency: int = 4,
+        render_queue: Optional[RenderQueue] = None,
+        priority: RenderPriority = RenderPriority.BATCH,
+    ) -> None:
+        self.renderer = renderer
+        self.concurrency = max(1, concurrency)
+        self.render_queue = render_queue
+        self.priority = priority
+
+    async def iter_zip(
+        self,
+        items: Iterable[ExportItem],
+        options: RenderOptions,
+        report: Optional[BatchExportReport] = None,
+        priority: Optional[RenderPriority] = None,
+    ) -> AsyncIterator[bytes]:
+        """按完成顺序渲染卡片并产出 ZIP 字节块
+
+        report 在迭代过程中被填充, 迭代结束后即为最终结果;
+        priority 缺省时使用 self.priority。
+        """
+        priority = self.priority if priority is None else priority
+        report = report if report is not None else BatchExportReport()
+        start_time = time.perf_counter()
+        pending = iter(items)
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency)
+
+        async def worker() -> None:
+            # 迭代器在协程间共享: 每个协程完成一张才会再取下一张
+            for item in pending:
+                report.total += 1
+                outcome = await self._render(item, options, priority)
+                await results.put((item, outcome))
+
+        async def finish() -> None:
+            await asyncio.gather(*workers, return_exceptions=True)
+            await results.put(None)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        closer = asyncio.create_task(finish())
+
+        sink = _ChunkSink()
+        archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED)
+        used_names: Set[str] = set()
+        try:
+            while True:
+                entry = await results.get()
+                if entry is None:
+                    break
+                item, outcome = entry
+                if isinstance(outcome, bytes):
+                    arcname = self._arcname(item.name, options.format, used_names)
+                    archive.writestr(arcname, outcome)
+                    report.succeeded.append({
+                        "key": item.key,
+                        "name": arcname,
+                        "size_bytes": len(outcome),
+                    })
+                else:
+                    report.failed.append({
+                        "key": item.key,
+                        "name": item.name,
+                        "error": getattr(outcome, "message", None) or str(outcome),
+                    })
+                chunk = sink.drain()
+                if chunk:
+                    report.bytes_written += len(chunk)
+                    yield chunk
+
+            report.elapsed_ms = (time.perf_counter() - start_time) * 1000
+            archive.writestr(
+                MANIFEST_NAME,
+                json.dumps(report.to_manifest(), ensure_ascii=False, indent=2),
+            )
+            archive.close()
+            chunk = sink.drain()
+            report.bytes_written += len(chunk)
+            yield chunk
+
+            business_logger.logger.info(
+                "批量导出完成",
+                operation="batch_export",
+                total_count=report.total,
+                success_count=report.success_count,
+                failed_count=report.failed_count,
+                bytes_written=report.bytes_written,
+                elapsed_ms=report.elapsed_ms,
+            )
+        finally:
+            # 调用方中途放弃迭代时停止剩余渲染
+            for task in workers + [closer]:
+                task.cancel()
+            await asyncio.gather(*workers, closer, return_exceptions=True)
+
+    async def export_to_file(
+        self,
+        items: Iterable[ExportItem],
+        options: RenderOptions,
+        path: str,
+        priority: Optional[RenderPriority] = None,
+    ) -> BatchExportReport:
+        """导出到 ZIP 文件, 返回导出报告"""
+        report = BatchExportReport()
+        with open(path, "wb") as output:
+            async for chunk in self.iter_zip(items, options, report, priority):
+                await asyncio.to_thread(output.write, chunk)
+        return report
+
+    async def export_cards(
+        self,
+        cards: Sequence[Tuple[str, str]],
+        path: str,
+        format: str = "png",
+        quality: str = "high",
+        batch_mode: bool = True,
+    ) -> BatchExportReport:
+        """导出 [(card_id, svg)] 到 ZIP 文件 (供应用层调用)
+
+        batch_mode 为 False 时用户在等待结果, 优先级提升到普通请求。
+        """
+        items = (ExportItem(name=card_id, svg_content=svg, key=card_id) for card_id, svg in cards)
+        priority = self.priority if batch_mode else min(self.priority, RenderPriority.STANDARD)
+        return await self.export_to_file(
+            items, RenderOptions(format=format, quality=quality), path, priority
+        )
+
+    async def _render(
+        self,
+        item: ExportItem,
+        options: RenderOptions,
+        priority: RenderPriority,
+    ) -> Union[bytes, Exception]:
+        """渲染单张卡片; 失败时返回异常而不是抛出"""
+        try:
+            if options.format == "svg":
+                return item.svg_content.encode("utf-8")
+
+            if self.render_queue is not None:
+                future = await self.render_queue.add_render_task(
+                    task_id=f"export:{item.key or item.name}:{id(item)}",
+                    svg_content=item.svg_content,
+                    options=options,
+                    renderer=self.renderer,
+                    priority=priority,
+                )
+                result = await future
+            else:
+                result = await self.renderer.render_svg_to_image(item.svg_content, options)
+
+            if not result.success or not result.image_data:
+                raise RenderServiceError(
+                    message=result.error_message or "渲染结果为空",
+                    error_code="EXPORT_RENDER_FAILED",
+                )
+            return result.image_data
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return e
+
+    @staticmethod
+    def _arcname(name: str, fmt: str, used_names: Set[str]) -> str:
+        """压缩包内的安全且唯一的文件名"""
+        stem = _UNSAFE_NAME.sub("_", name).strip("._") or "card"
+        arcname = f"{stem}.{fmt}"
+        suffix = 1
+        while arcname in used_names:
+            suffix += 1
+            arcname = f"{stem}_{suffix}.{fmt}"
+        used_names.add(arcname)
+        return arcname
@@ -4,24 +4,30 @@
 实现图像渲染的技术适配器：
 - BaseImageRenderer: 图像渲染器基类
 - PlaywrightRenderer: Playwright浏览器渲染器实现
-- PillowRenderer: Pillow图像处理渲染器实现
+- PillowRenderer: Pillow原生SVG渲染器实现 (不支持的特性回退到浏览器)
+- RenderQueue: 带背压的优先级渲染队列
 """
 
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from enum import IntEnum
+from concurrent.futures import ProcessPoolExecutor
 from typing import Any, Dict, Optional, Tuple, List
 import asyncio
+import functools
 import io
+import itertools
+import time
 import base64
 import tempfile
 import logging
-from pathlib import Path
 
-from ..shared.types import CardSize
-from ..shared.errors import RenderServiceError, InfrastructureError
-from ..shared.logging import business_logger
+from ...shared.types import CardSize
+from ...shared.errors import RenderServiceError, InfrastructureError, RateLimitError
+from ...shared.logging import business_logger
+from .svg_rasterizer import FontConfig, UnsupportedSVGFeatureError, rasterize_svg
 
 
 logger = logging.getLogger(__name__)
@@ -104,14 +110,39 @@ class BaseImageRenderer(ABC):
         await self.cleanup()
 
 
+# 页面就绪信号: 等待字体加载完成, 再等待两帧确保已完成绘制
+PAINT_READY_SCRIPT = """
+async () => {
+    await document.fonts.ready;
+    await new Promise(resolve =>
+        requestAnimationFrame(() => requestAnimationFrame(resolve))
+    );
+}
+"""
+
+
 class PlaywrightRenderer(BaseImageRenderer):
-    """Playwright浏览器渲染器"""
+    """Playwright浏览器渲染器
+
+    通过 set_content 直接注入HTML (无临时文件、无 networkidle),
+    以 document.fonts.ready + 双 requestAnimationFrame 作为确定性的
+    绘制完成信号, 并复用页面池中的页面, 避免每次渲染新建页面。
+    """
     
-    def __init__(self, browser_type: str = "chromium") -> None:
+    def __init__(
+        self,
+        browser_type: str = "chromium",
+        page_pool_size: int = 2,
+        render_timeout_ms: int = 30000,
+    ) -> None:
         super().__init__("Playwright")
         self.browser_type = browser_type
+        self.page_pool_size = page_pool_size
+        self.render_timeout_ms = render_timeout_ms
         self.browser = None
         self.context = None
+        self._idle_pages: List[Any] = []
+        self._page_slots: Optional[asyncio.Semaphore] = None
     
     async def initialize(self) -> None:
         """初始化Playwright"""
@@ -133,12 +164,15 @@ class PlaywrightRenderer(BaseImageRenderer):
                 viewport={"width": 1920, "height": 1080},
                 device_scale_factor=2,
             )
+            self._page_slots = asyncio.Semaphore(self.page_pool_size)
+            self._initialized = True
             
             business_logger.logger.info(
                 "Playwright渲染器初始化成功",
                 operation="initialize_renderer",
                 renderer=self.name,
                 browser_type=self.browser_type,
+                page_pool_size=self.page_pool_size,
             )
             
         except ImportError:
@@ -154,6 +188,26 @@ class PlaywrightRenderer(BaseImageRenderer):
                 cause=e,
             ) from e
     
+    async def _acquire_page(self) -> Any:
+        """从页面池取出页面, 池中无可用页面时新建"""
+        while self._idle_pages:
+            page = self._idle_pages.pop()
+            if not page.is_closed():
+                return page
+        page = await self.context.new_page()
+        page.set_default_timeout(self.render_timeout_ms)
+        return page
+    
+    async def _release_page(self, page: Any, healthy: bool) -> None:
+        """归还页面; 渲染失败的页面直接关闭, 不再复用"""
+        if healthy and not page.is_closed():
+            self._idle_pages.append(page)
+            return
+        try:
+            await page.close()
+        except Exception as e:
+            logger.warning(f"关闭页面失败: {e}")
+    
     async def render_svg_to_image(
         self,
         svg_content: str,
@@ -169,64 +223,57 @@ class PlaywrightRenderer(BaseImageRenderer):
         start_time = asyncio.get_event_loop().time()
         
         try:
-            # 创建临时HTML文件
             html_content = self._create_html_template(svg_content, options)
             
-            with tempfile.NamedTemporaryFile(mode="w", suffix=".html", delete=False) as f:
-                f.write(html_content)
-                temp_html_path = f.name
+            async with self._page_slots:
+                page = await self._acquire_page()
+                healthy = False
+                try:
+                    # 设置视口大小
+                    await page.set_viewport_size(
+                        {"width": options.width, "height": options.height}
+                    )
+                    
+                    # 直接注入HTML, 内联SVG无需等待网络
+                    await page.set_content(
+                        html_content, wait_until="domcontentloaded"
+                    )
+                    
+                    # 等待字体就绪并完成绘制
+                    await page.evaluate(PAINT_READY_SCRIPT)
+                    
+                    # 截图
+                    screenshot_bytes = await page.screenshot(
+                        type=options.format,
+                        full_page=True,
+                    )
+                    healthy = True
+                finally:
+                    await self._release_page(page, healthy)
             
-            try:
-                # 创建新页面
-                page = await self.context.new_page()
-                
-                # 设置视口大小
-                await page.set_viewport_size(
-                    {"width": options.width, "height": options.height}
-                )
-                
-                # 加载HTML文件
-                file_url = f"file://{temp_html_path}"
-                await page.goto(file_url, wait_until="networkidle")
-                
-                # 等待渲染完成
-                await page.wait_for_timeout(2000)  # 等待2秒确保完全渲染
-                
-                # 截图
-                screenshot_bytes = await page.screenshot(
-                    type=options.format,
-                    full_page=True,
-                )
-                
-                await page.close()
-                
-                render_time = (asyncio.get_event_loop().time() - start_time) * 1000
-                
-                business_logger.logger.info(
-                    "Playwright渲染成功",
-                    operation="render_svg",
-                    renderer=self.name,
-                    format=options.format,
-                    size=f"{options.width}x{options.height}",
-                    render_time_ms=render_time,
-                )
-                
-                return RenderResult(
-                    success=True,
-                    image_data=screenshot_bytes,
-                    size_bytes=len(screenshot_bytes),
-                    render_time_ms=render_time,
-                    metadata={
-                        "width": options.width,
-                        "height": options.height,
-                        "format": options.format,
-                        "renderer": self.name,
-                    },
-                )
+            render_time = (asyncio.get_event_loop().time() - start_time) * 1000
             
-            finally:
-                # 清理临时文件
-                Path(temp_html_path).unlink(missing_ok=True)
+            business_logger.logger.info(
+                "Playwright渲染成功",
+                operation="render_svg",
+                renderer=self.name,
+                format=options.format,
+                size=f"{options.width}x{options.height}",
+                render_time_ms=render_time,
+            )
+            
+            return RenderResult(
+                success=True,
+                image_data=screenshot_bytes,
+                size_bytes=len(screenshot_bytes),
+                render_time_ms=render_time,
+                metadata={
+                    "width": options.width,
+                    "height": options.height,
+                    "format": options.format,
+                    "renderer": self.name,
+                },
+            )
         
         except Exception as e:
             render_time = (asyncio.get_event_loop().time() - start_time) * 1000
@@ -265,6 +312,9 @@ class PlaywrightRenderer(BaseImageRenderer):
     async def cleanup(self) -> None:
         """清理Playwright资源"""
         try:
+            for page in self._idle_pages:
+                await page.close()
+            self._idle_pages.clear()
             if self.context:
                 await self.context.close()
             if self.browser:
@@ -325,11 +375,30 @@ class PlaywrightRenderer(BaseImageRenderer):
 
 
 class PillowRenderer(BaseImageRenderer):
-    """Pillow图像处理渲染器"""
+    """Pillow原生渲染器
+
+    在进程池中用 svg_rasterizer 直接光栅化 SVG, 不依赖浏览器;
+    遇到不支持的特性 (渐变、滤镜等) 时回退到 fallback_renderer_type 指定的渲染器。
+    """
     
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        fallback_renderer_type: Optional[str] = "playwright",
+        use_process_pool: bool = True,
+        font_config: Optional[FontConfig] = None,
+    ) -> None:
         super().__init__("Pillow")
         self.temp_dir = None
+        self.max_workers = max_workers
+        self.fallback_renderer_type = fallback_renderer_type
+        self.use_process_pool = use_process_pool
+        self.font_config = font_config
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._fallback: Optional[BaseImageRenderer] = None
+        self._fallback_lock = asyncio.Lock()
+        self.native_renders = 0
+        self.fallback_renders = 0
     
     async def initialize(self) -> None:
         """初始化Pillow"""
@@ -342,11 +411,16 @@ class PillowRenderer(BaseImageRenderer):
             
             # 创建临时目录
             self.temp_dir = tempfile.mkdtemp()
+
+            if self.use_process_pool and self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
             
             business_logger.logger.info(
                 "Pillow渲染器初始化成功",
                 operation="initialize_renderer",
                 renderer=self.name,
+                max_workers=self.max_workers,
+                fallback=self.fallback_renderer_type,
             )
             
         except ImportError:
@@ -367,32 +441,23 @@ class PillowRenderer(BaseImageRenderer):
         svg_content: str,
         options: RenderOptions,
     ) -> RenderResult:
-        """将SVG渲染为图像 (简化实现)"""
+        """将SVG渲染为图像; 不支持的特性回退到浏览器渲染"""
         start_time = asyncio.get_event_loop().time()
         
         try:
-            # 这里是一个简化的实现
-            # 实际项目中可以使用 cairosvg 或其他 SVG 库
-            
-            # 创建画布
-            image = self.Image.new(
-                "RGB",
-                (options.width, options.height),
-                options.background_color,
-            )
-            draw = self.ImageDraw.Draw(image)
-            
-            # 绘制简单的占位内容
-            # 实际实现中应该解析SVG并绘制
-            
-            # 保存图像
-            output = io.BytesIO()
-            image.save(
-                output,
-                format=options.format.upper(),
-                quality=95 if options.quality == "high" else 75,
+            image_data = await asyncio.get_running_loop().run_in_executor(
+                self._executor,
+                functools.partial(
+                    rasterize_svg,
+                    svg_content,
+                    options.width,
+                    options.height,
+                    background=options.background_color,
+                    image_format=options.format,
+                    fonts=self.font_config,
+                ),
             )
-            image_data = output.getvalue()
+            self.native_renders += 1
             
             render_time = (asyncio.get_event_loop().time() - start_time) * 1000
             
@@ -417,6 +482,38 @@ class PillowRenderer(BaseImageRenderer):
                     "renderer": self.name,
                 },
             )
+        
+        except UnsupportedSVGFeatureError as e:
+            if not self.fallback_renderer_type:
+                render_time = (asyncio.get_event_loop().time() - start_time) * 1000
+                return RenderResult(
+                    success=False,
+                    error_message=e.message,
+                    render_time_ms=render_time,
+                )
+            
+            business_logger.logger.info(
+                "SVG包含原生渲染不支持的特性, 回退渲染",
+                operation="render_svg_fallback",
+                renderer=self.name,
+                fallback=self.fallback_renderer_type,
+                reason=e.message,
+            )
+            try:
+                fallback = await self._get_fallback()
+                result = await fallback.render_svg_to_image(svg_content, options)
+            except Exception as fallback_error:
+                render_time = (asyncio.get_event_loop().time() - start_time) * 1000
+                logger.error(f"回退渲染失败: {fallback_error}")
+                return RenderResult(
+                    success=False,
+                    error_message=f"{e.message}; 回退渲染失败: {fallback_error}",
+                    render_time_ms=render_time,
+                    metadata={"fallback_reason": e.message},
+                )
+            self.fallback_renders += 1
+            result.metadata["fallback_reason"] = e.message
+            return result
             
         except Exception as e:
             render_time = (asyncio.get_event_loop().time() - start_time) * 1000
@@ -428,6 +525,15 @@ class PillowRenderer(BaseImageRenderer):
                 render_time_ms=render_time,
             )
     
+    async def _get_fallback(self) -> BaseImageRenderer:
+        """按需创建并初始化回退渲染器"""
+        async with self._fallback_lock:
+            if self._fallback is None:
+                self._fallback = await ImageRendererFactory.create_renderer_with_init(
+                    self.fallback_renderer_type
+                )
+            return self._fallback
+    
     async def optimize_image(
         self,
         image_data: bytes,
@@ -467,6 +573,14 @@ class PillowRenderer(BaseImageRenderer):
     async def cleanup(self) -> None:
         """清理Pillow资源"""
         try:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+            
+            if self._fallback is not None:
+                await self._fallback.cleanup()
+                self._fallback = None
+            
             if self.temp_dir:
                 import shutil
                 shutil.rmtree(self.temp_dir, ignore_errors=True)
@@ -508,11 +622,54 @@ class ImageRendererFactory:
         """创建并初始化的图像渲染器"""
         renderer = ImageRendererFactory.create_renderer(renderer_type, **kwargs)
         await renderer.initialize()
+        renderer._initialized = True
         return renderer
 
 
+class RenderPriority(IntEnum):
+    """渲染优先级 (数值越小越先执行)"""
+    INTERACTIVE = 0  # 交互式预览
+    PREMIUM = 1      # 付费用户
+    STANDARD = 2     # 普通请求
+    BATCH = 3        # 批量导出
+
+
+@dataclass
+class _RenderJob:
+    """队列中的渲染任务"""
+    task_id: str
+    svg_content: str
+    options: RenderOptions
+    renderer: BaseImageRenderer
+    priority: RenderPriority
+    future: asyncio.Future
+    enqueued_at: float
+
+
+@dataclass
+class _PriorityStats:
+    """单个优先级的统计"""
+    submitted: int = 0
+    started: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    wait_ms_total: float = 0.0
+    wait_ms_max: float = 0.0
+
+    def record_wait(self, wait_ms: float) -> None:
+        self.started += 1
+        self.wait_ms_total += wait_ms
+        self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+
+
 class RenderQueue:
-    """渲染队列管理器"""
+    """渲染队列管理器
+
+    固定数量的工作协程从有界优先级队列中取任务执行, 交互式预览与付费
+    用户优先于批量导出; 同一优先级内按提交顺序执行。队列满时提交方
+    等待空位 (背压), 等待超时或不等待时抛出 RateLimitError (HTTP 429)。
+    """
     
     def __init__(
         self,
@@ -521,9 +678,36 @@ class RenderQueue:
     ) -> None:
         self.max_concurrent = max_concurrent
         self.queue_size = queue_size
-        self.active_renders: Dict[str, asyncio.Task] = {}
-        self.render_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
-        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.active_renders: Dict[str, asyncio.Future] = {}
+        self.render_queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._running = 0
+        self._sequence = itertools.count()
+        self._started_at: Optional[float] = None
+        self._stats: Dict[RenderPriority, _PriorityStats] = {
+            priority: _PriorityStats() for priority in RenderPriority
+        }
+    
+    async def start(self) -> None:
+        """启动工作协程"""
+        if self._workers:
+            return
+        self.render_queue = asyncio.PriorityQueue(maxsize=self.queue_size)
+        self._started_at = time.monotonic()
+        self._workers = [
+            asyncio.create_task(self._worker(i))
+            for i in range(self.max_concurrent)
+        ]
+    
+    async def stop(self) -> None:
+        """停止工作协程, 取消尚未执行的任务"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for future in self.active_renders.values():
+            future.cancel()
+        self.active_renders.clear()
     
     async def add_render_task(
         self,
@@ -531,25 +715,80 @@ class RenderQueue:
         svg_content: str,
         options: RenderOptions,
         renderer: BaseImageRenderer,
-    ) -> asyncio.Task:
-        """添加渲染任务"""
-        if len(self.active_renders) >= self.max_concurrent:
-            raise RenderServiceError(
+        priority: RenderPriority = RenderPriority.STANDARD,
+        wait: bool = True,
+        timeout: Optional[float] = None,
+    ) -> asyncio.Future:
+        """添加渲染任务
+
+        返回在任务完成时得到 RenderResult 的 Future。队列已满时:
+        wait=True 等待空位 (最多 timeout 秒), 否则立即拒绝。
+        """
+        await self.start()
+        assert self.render_queue is not None
+        
+        loop = asyncio.get_running_loop()
+        job = _RenderJob(
+            task_id=task_id,
+            svg_content=svg_content,
+            options=options,
+            renderer=renderer,
+            priority=RenderPriority(priority),
+            future=loop.create_future(),
+            enqueued_at=time.monotonic(),
+        )
+        entry = (job.priority, next(self._sequence), job)
+        stats = self._stats[job.priority]
+        
+        try:
+            if wait:
+                await asyncio.wait_for(self.render_queue.put(entry), timeout)
+            else:
+                self.render_queue.put_nowait(entry)
+        except (asyncio.QueueFull, asyncio.TimeoutError):
+            stats.rejected += 1
+            raise RateLimitError(
                 message="渲染队列已满",
                 error_code="RENDER_QUEUE_FULL",
+                details={
+                    "status_code": 429,
+                    "queue_depth": self.render_queue.qsize(),
+                    "retry_after_seconds": self._retry_after(),
+                },
             )
         
-        task = asyncio.create_task(
-            self._execute_render(task_id, svg_content, options, renderer)
-        )
-        self.active_renders[task_id] = task
-        
-        # 设置任务完成回调
-        task.add_done_callback(
-            lambda t: self.active_renders.pop(task_id, None)
+        stats.submitted += 1
+        self.active_renders[task_id] = job.future
+        job.future.add_done_callback(
+            lambda f: self._forget(task_id, f)
         )
-        
-        return task
+        return job.future
+    
+    async def _worker(self, index: int) -> None:
+        """工作协程: 按优先级取出并执行任务"""
+        assert self.render_queue is not None
+        while True:
+            _, _, job = await self.render_queue.get()
+            try:
+                if job.future.done():
+                    continue  # 排队期间已被取消
+                stats = self._stats[job.priority]
+                stats.record_wait((time.monotonic() - job.enqueued_at) * 1000)
+                self._running += 1
+                try:
+                    result = await self._execute_render(
+                        job.task_id, job.svg_content, job.options, job.renderer
+                    )
+                finally:
+                    self._running -= 1
+                if result.success:
+                    stats.completed += 1
+                else:
+                    stats.failed += 1
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                self.render_queue.task_done()
     
     async def _execute_render(
         self,
@@ -559,15 +798,27 @@ class RenderQueue:
         renderer: BaseImageRenderer,
     ) -> RenderResult:
         """执行渲染任务"""
-        async with self.semaphore:
-            try:
-                return await renderer.render_svg_to_image(svg_content, options)
-            except Exception as e:
-                logger.error(f"渲染任务失败: {task_id}, {e}")
-                return RenderResult(
-                    success=False,
-                    error_message=str(e),
-                )
+        try:
+            return await renderer.render_svg_to_image(svg_content, options)
+        except Exception as e:
+            logger.error(f"渲染任务失败: {task_id}, {e}")
+            return RenderResult(
+                success=False,
+                error_message=str(e),
+            )
+    
+    def _forget(self, task_id: str, future: asyncio.Future) -> None:
+        if self.active_renders.get(task_id) is future:
+            del self.active_renders[task_id]
+    
+    def _retry_after(self) -> float:
+        """根据平均耗时粗略估计排空队列所需秒数"""
+        completed = sum(s.completed + s.failed for s in self._stats.values())
+        if not completed or self._started_at is None:
+            return 1.0
+        elapsed = time.monotonic() - self._started_at
+        depth = self.render_queue.qsize() if self.render_queue else 0
+        return round(max(1.0, depth * elapsed / completed), 1)
     
     async def get_render_status(self, task_id: str) -> Optional[RenderResult]:
         """获取渲染状态"""
@@ -591,9 +842,33 @@ class RenderQueue:
     
     def get_queue_stats(self) -> Dict[str, Any]:
         """获取队列统计"""
+        elapsed = (
+            time.monotonic() - self._started_at if self._started_at else 0.0
+        )
+        by_priority: Dict[str, Dict[str, Any]] = {}
+        for priority, stats in self._stats.items():
+            finished = stats.completed + stats.failed
+            by_priority[priority.name.lower()] = {
+                "submitted": stats.submitted,
+                "completed": stats.completed,
+                "failed": stats.failed,
+                "rejected": stats.rejected,
+                "avg_wait_ms": (
+                    round(stats.wait_ms_total / stats.started, 3)
+                    if stats.started else 0.0
+                ),
+                "max_wait_ms": round(stats.wait_ms_max, 3),
+                "throughput_per_sec": (
+                    round(finished / elapsed, 3) if elapsed else 0.0
+                ),
+            }
         return {
             "active_renders": len(self.active_renders),
+            "running": self._running,
+            "queue_depth": self.render_queue.qsize() if self.render_queue else 0,
             "max_concurrent": self.max_concurrent,
             "queue_size": self.queue_size,
+            "workers": len(self._workers),
             "running_tasks": list(self.active_renders.keys()),
-        }
\ No newline at end of file
+            "by_priority": by_priority,
+        }
@@ -0,0 +1,324 @@
+"""
+基础设施层 - 配额存储
+
+SQLiteQuotaStore: 原子配额计数 (本地/单机部署, 多 worker 共享同一个库文件)
+- try_consume 是一条带条件的 UPSERT: 额度足够才累加, 检查与扣减之间没有竞争窗口
+- 不再"读用户 -> 修改 -> 整体保存", 并发请求不会互相覆盖
+
+QuotaTokenCache: 进程内令牌缓存 (包装 SQLiteQuotaStore, 接口相同)
+- 同一用户短时间内多次请求后视为热点, 之后每次向存储预扣一批令牌, 在本地发放;
+  预扣量不超过剩余额度 (limit - used)
+- 热点用户大多数请求不访问存储; 未用完的令牌在租约过期后由后台清扫退回, 或在 flush 时退回
+- 预扣的令牌在存储中已经计入, 所以多进程下总量仍不会超过上限
+- 进程崩溃时本地令牌无法退回: 每个 worker 每个用户/操作最多泄漏 lease_size 个额度,
+  持久计数不会自动修正
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+
+from ...shared.errors import DatabaseError
+from ...shared.logging import business_logger
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS quota_usage (
+    user_id TEXT NOT NULL,
+    operation TEXT NOT NULL,
+    used INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (user_id, operation)
+);
+"""
+
+# 额度足够才写入: 新行要求 count <= limit, 已有行要求 used + count <= limit
+CONSUME_SQL = """
+INSERT INTO quota_usage (user_id, operation, used, updated_at)
+SELECT ?, ?, ?, ? WHERE ? <= ?
+ON CONFLICT (user_id, operation) DO UPDATE SET
+    used = used + excluded.used,
+    updated_at = excluded.updated_at
+WHERE used + excluded.used <= ?
+"""
+
+REFUND_SQL = """
+UPDATE quota_usage SET used = MAX(0, used - ?), updated_at = ?
+WHERE user_id = ? AND operation = ?
+"""
+
+
+class SQLiteQuotaStore:
+    """SQLite 原子配额存储"""
+
+    def __init__(self, path: str = "data/quota.db") -> None:
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    async def initialize(self) -> None:
+        if self._conn is not None:
+            return
+        await asyncio.to_thread(self._connect)
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            await asyncio.to_thread(conn.close)
+
+    def _connect(self) -> None:
+        try:
+            directory = os.path.dirname(self.path)
+            if directory and self.path != ":memory:":
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # 多进程同时写时等待写锁而不是立刻失败
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(SCHEMA)
+        except sqlite3.Error as e:
+            raise DatabaseError(
+                message=f"配额库初始化失败: {e}",
+                error_code="QUOTA_STORE_INIT_FAILED",
+                details={"path": self.path},
+                cause=e,
+            ) from e
+        self._conn = conn
+
+    async def _call(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        if self._conn is None:
+            raise DatabaseError(message="配额库尚未初始化", error_code="QUOTA_STORE_NOT_INITIALIZED")
+        conn = self._conn
+
+        def execute() -> Any:
+            with self._lock:
+                return fn(conn)
+
+        try:
+            return await asyncio.to_thread(execute)
+        except sqlite3.Error as e:
+            raise DatabaseError(
+                message=f"配额库操作失败: {e}",
+                error_code="QUOTA_STORE_QUERY_FAILED",
+                cause=e,
+            ) from e
+
+    async def try_consume(self, user_id: str, operation: str, count: int, limit: int) -> bool:
+        """额度足够时扣减 count 并返回 True, 否则不做修改并返回 False"""
+        now = datetime.utcnow().isoformat()
+        params = (str(user_id), operation, count, now, count, limit, limit)
+        return await self._call(lambda conn: conn.execute(CONSUME_SQL, params).rowcount == 1)
+
+    async def try_lease(
+        self, user_id: str, operation: str, count: int, extra: int, limit: int
+    ) -> Optional[int]:
+        """扣减 count, 并在剩余额度内额外预扣至多 extra 个
+
+        返回实际额外预扣的数量; 连 count 都不够时不做修改并返回 None。
+        BEGIN IMMEDIATE 持有写锁, 读取与写入之间其他进程不能修改。
+        """
+        now = datetime.utcnow().isoformat()
+        user_id = str(user_id)
+
+        def lease(conn: sqlite3.Connection) -> Optional[int]:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT used FROM quota_usage WHERE user_id = ? AND operation = ?",
+                    (user_id, operation),
+                ).fetchone()
+                used = row[0] if row else 0
+                if used + count > limit:
+                    conn.execute("ROLLBACK")
+                    return None
+                granted = max(0, min(extra, limit - used - count))
+                amount = count + granted
+                conn.execute(CONSUME_SQL, (user_id, operation, amount, now, amount, limit, limit))
+                conn.execute("COMMIT")
+                return granted
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        return await self._call(lease)
+
+    async def refund(self, user_id: str, operation: str, count: int) -> None:
+        """退回额度 (不会低于 0)"""
+        if count <= 0:
+            return
+        now = datetime.utcnow().isoformat()
+        params = (count, now, str(user_id), operation)
+        await self._call(lambda conn: conn.execute(REFUND_SQL, params))
+
+    async def get_used(self, user_id: str, operation: str) -> int:
+        def query(conn: sqlite3.Connection) -> int:
+            row = conn.execute(
+                "SELECT used FROM quota_usage WHERE user_id = ? AND operation = ?",
+                (str(user_id), operation),
+            ).fetchone()
+            return row[0] if row else 0
+
+        return await self._call(query)
+
+
+@dataclass
+class _Lease:
+    """某个用户/操作在本进程持有的令牌"""
+    tokens: int = 0
+    requests: int = 0
+    expires_at: float = 0.0
+
+
+class QuotaTokenCache:
+    """进程内配额令牌缓存
+
+    持有令牌期间会运行一个清扫任务, 每 ttl 秒把过期租约的令牌退回存储;
+    没有租约时清扫任务自行结束。
+    """
+
+    def __init__(
+        self,
+        store: Any,
+        lease_size: int = 10,
+        ttl: float = 30.0,
+        hot_after: int = 3,
+        max_entries: int = 10000,
+    ) -> None:
+        self.store = store
+        self.lease_size = max(0, lease_size)
+        self.ttl = ttl
+        self.hot_after = hot_after
+        self.max_entries = max_entries
+        self._leases: Dict[Tuple[str, str], _Lease] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+        self._stats = {"local_hits": 0, "store_calls": 0, "leased": 0, "returned": 0, "denied": 0}
+
+    async def try_consume(self, user_id: str, operation: str, count: int, limit: int) -> bool:
+        key = (str(user_id), operation)
+        async with self._lock(key):
+            now = time.monotonic()
+            lease = self._leases.get(key)
+            if lease is None or now >= lease.expires_at:
+                if lease is not None:
+                    await self._return(key, lease)
+                elif len(self._leases) >= self.max_entries:
+                    self._prune(now)
+                lease = self._leases[key] = _Lease(expires_at=now + self.ttl)
+                self._ensure_sweeper()
+            lease.requests += 1
+
+            if lease.tokens >= count:
+                lease.tokens -= count
+                self._stats["local_hits"] += 1
+                return True
+
+            # 热点用户: 在剩余额度内多预扣一批令牌
+            extra = self.lease_size if lease.requests >= self.hot_after else 0
+            need = count - lease.tokens
+            self._stats["store_calls"] += 1
+            if extra:
+                granted = await self.store.try_lease(user_id, operation, need, extra, limit)
+            else:
+                granted = 0 if await self.store.try_consume(user_id, operation, need, limit) else None
+            if granted is None:
+                self._stats["denied"] += 1
+                return False
+            lease.tokens = granted
+            self._stats["leased"] += granted
+            return True
+
+    async def refund(self, user_id: str, operation: str, count: int) -> None:
+        """退回的额度优先留在本地令牌中, 过期时统一退给存储"""
+        key = (str(user_id), operation)
+        async with self._lock(key):
+            lease = self._leases.get(key)
+            if lease is not None and time.monotonic() < lease.expires_at:
+                lease.tokens += count
+                return
+        await self.store.refund(user_id, operation, count)
+
+    async def get_used(self, user_id: str, operation: str) -> int:
+        """已使用额度 (不含本地尚未发放的令牌)"""
+        lease = self._leases.get((str(user_id), operation))
+        held = lease.tokens if lease is not None else 0
+        return await self.store.get_used(user_id, operation) - held
+
+    async def flush(self) -> None:
+        """退回全部本地令牌 (关闭前调用)"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+        for key in list(self._leases):
+            async with self._lock(key):
+                lease = self._leases.pop(key, None)
+                if lease is not None:
+                    await self._return(key, lease)
+
+    async def sweep(self) -> None:
+        """退回已过期租约的令牌并丢弃这些租约"""
+        now = time.monotonic()
+        for key, lease in list(self._leases.items()):
+            if now < lease.expires_at:
+                continue
+            async with self._lock(key):
+                # 等锁期间可能已被 try_consume 换成新租约
+                if self._leases.get(key) is lease:
+                    await self._return(key, lease)
+                    del self._leases[key]
+
+    def _ensure_sweeper(self) -> None:
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def _sweep_loop(self) -> None:
+        while self._leases:
+            await asyncio.sleep(self.ttl)
+            try:
+                await self.sweep()
+            except Exception as e:
+                # 退回失败的租约留在本地, 下一轮重试
+                business_logger.logger.warning(
+                    "配额令牌退回失败",
+                    operation="quota_sweep",
+                    error=str(e),
+                )
+
+    async def _return(self, key: Tuple[str, str], lease: _Lease) -> None:
+        if lease.tokens > 0:
+            await self.store.refund(key[0], key[1], lease.tokens)
+            self._stats["returned"] += lease.tokens
+            lease.tokens = 0
+
+    def _prune(self, now: float) -> None:
+        """丢弃已过期且没有令牌的记录 (冷用户), 避免无限增长"""
+        for key, lease in list(self._leases.items()):
+            lock = self._locks.get(key)
+            if now >= lease.expires_at and lease.tokens == 0 and not (lock and lock.locked()):
+                del self._leases[key]
+                self._locks.pop(key, None)
+
+    def _lock(self, key: Tuple[str, str]) -> asyncio.Lock:
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "leases": len(self._leases),
+            "tokens_held": sum(lease.tokens for lease in self._leases.values()),
+            **self._stats,
+        }
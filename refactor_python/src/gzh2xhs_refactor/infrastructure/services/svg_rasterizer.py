@@ -0,0 +1,1134 @@
+"""
+基础设施层 - 原生SVG光栅化
+
+无浏览器的 SVG → PNG 渲染, 覆盖 Stage B 提示词实际产出的 SVG 子集:
+- 形状: rect (含圆角) / circle / ellipse / line / polyline / polygon / path
+- 文本: text / tspan (x/y/dx/dy, text-anchor, stroke + paint-order), CJK 与 Emoji 字体回退
+- 填充: 纯色、opacity、<pattern> 平铺 (点阵等); 描边支持 stroke-dasharray
+- 结构: g / defs / use / transform / 简单 <style> 规则 (标签、.class、#id)
+
+遇到不支持的特性 (渐变、滤镜、裁剪、外链图片等) 时抛出
+UnsupportedSVGFeatureError, 由调用方回退到浏览器渲染。
+rasterize_svg 为纯函数, 可直接提交到进程池执行。
+"""
+
+from __future__ import annotations
+
+import io
+import math
+import os
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from PIL import Image, ImageChops, ImageColor, ImageDraw, ImageFont
+
+from ...shared.errors import RenderServiceError
+
+
+Point = Tuple[float, float]
+Matrix = Tuple[float, float, float, float, float, float]
+
+IDENTITY: Matrix = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+# 会被继承的表现属性
+INHERITED_PROPERTIES = (
+    "fill",
+    "fill-opacity",
+    "stroke",
+    "stroke-width",
+    "stroke-opacity",
+    "stroke-dasharray",
+    "stroke-linejoin",
+    "paint-order",
+    "font-size",
+    "font-weight",
+    "font-family",
+    "text-anchor",
+    "color",
+    "visibility",
+)
+
+# 出现即回退到浏览器的元素
+UNSUPPORTED_ELEMENTS = {
+    "filter",
+    "foreignObject",
+    "image",
+    "mask",
+    "clipPath",
+    "linearGradient",
+    "radialGradient",
+    "textPath",
+    "symbol",
+    "marker",
+    "script",
+    "animate",
+    "animateTransform",
+}
+
+# 元素引用即回退的属性
+UNSUPPORTED_ATTRIBUTES = ("filter", "clip-path", "mask", "marker-start", "marker-end")
+
+IGNORED_ELEMENTS = {"title", "desc", "metadata", "defs", "style"}
+
+FONT_CANDIDATES: Dict[str, Tuple[str, ...]] = {
+    "regular": (
+        "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+        "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+        "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc",
+        "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+        "/System/Library/Fonts/PingFang.ttc",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    ),
+    "bold": (
+        "/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc",
+        "/usr/share/fonts/noto-cjk/NotoSansCJK-Bold.ttc",
+        "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Bold.ttc",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    ),
+    "emoji": (
+        "/usr/share/fonts/truetype/noto/NotoColorEmoji.ttf",
+        "/usr/share/fonts/noto/NotoColorEmoji.ttf",
+        "/System/Library/Fonts/Apple Color Emoji.ttc",
+    ),
+}
+
+# NotoColorEmoji 等位图字体只提供固定像素尺寸
+EMOJI_BITMAP_SIZE = 109
+
+_NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_PATH_TOKEN = re.compile(r"[MmLlHhVvCcSsQqTtAaZz]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_TRANSFORM = re.compile(r"(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)")
+_WHITESPACE = re.compile(r"\s+")
+_CSS_RULE = re.compile(r"([^{}]+)\{([^{}]*)\}")
+_RGB_FUNCTION = re.compile(r"rgba?\(\s*([^)]*?)\s*\)", re.IGNORECASE)
+
+
+class UnsupportedSVGFeatureError(RenderServiceError):
+    """SVG 使用了原生光栅化不支持的特性"""
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message=message, error_code="SVG_FEATURE_UNSUPPORTED")
+
+    def __reduce__(self) -> Tuple[Any, Tuple[str]]:
+        # 保证可跨进程传递
+        return (UnsupportedSVGFeatureError, (self.message,))
+
+
+@dataclass
+class FontConfig:
+    """字体配置; 默认从常见系统路径中探测"""
+    regular: Sequence[str] = FONT_CANDIDATES["regular"]
+    bold: Sequence[str] = FONT_CANDIDATES["bold"]
+    emoji: Sequence[str] = FONT_CANDIDATES["emoji"]
+
+    def resolve(self, kind: str) -> List[str]:
+        return [path for path in getattr(self, kind) if os.path.exists(path)]
+
+
+# ---------------------------------------------------------------------------
+# 几何工具
+# ---------------------------------------------------------------------------
+
+def multiply(m1: Matrix, m2: Matrix) -> Matrix:
+    """m1 · m2 (先应用 m2)"""
+    a1, b1, c1, d1, e1, f1 = m1
+    a2, b2, c2, d2, e2, f2 = m2
+    return (
+        a1 * a2 + c1 * b2,
+        b1 * a2 + d1 * b2,
+        a1 * c2 + c1 * d2,
+        b1 * c2 + d1 * d2,
+        a1 * e2 + c1 * f2 + e1,
+        b1 * e2 + d1 * f2 + f1,
+    )
+
+
+def apply(m: Matrix, point: Point) -> Point:
+    a, b, c, d, e, f = m
+    x, y = point
+    return (a * x + c * y + e, b * x + d * y + f)
+
+
+def matrix_scale(m: Matrix) -> float:
+    """变换的平均缩放系数 (用于线宽与字号)"""
+    a, b, c, d, _, _ = m
+    return math.sqrt(abs(a * d - b * c))
+
+
+def parse_transform(value: Optional[str]) -> Matrix:
+    if not value:
+        return IDENTITY
+    result = IDENTITY
+    for name, raw_args in _TRANSFORM.findall(value):
+        args = [float(n) for n in _NUMBER.findall(raw_args)]
+        if name == "matrix" and len(args) == 6:
+            m = tuple(args)
+        elif name == "translate":
+            m = (1.0, 0.0, 0.0, 1.0, args[0], args[1] if len(args) > 1 else 0.0)
+        elif name == "scale":
+            sx = args[0]
+            sy = args[1] if len(args) > 1 else sx
+            m = (sx, 0.0, 0.0, sy, 0.0, 0.0)
+        elif name == "rotate":
+            angle = math.radians(args[0])
+            cos, sin = math.cos(angle), math.sin(angle)
+            m = (cos, sin, -sin, cos, 0.0, 0.0)
+            if len(args) == 3:
+                cx, cy = args[1], args[2]
+                m = multiply(multiply((1, 0, 0, 1, cx, cy), m), (1, 0, 0, 1, -cx, -cy))
+        elif name == "skewX":
+            m = (1.0, 0.0, math.tan(math.radians(args[0])), 1.0, 0.0, 0.0)
+        elif name == "skewY":
+            m = (1.0, math.tan(math.radians(args[0])), 0.0, 1.0, 0.0, 0.0)
+        else:
+            raise UnsupportedSVGFeatureError(f"无法解析 transform: {value}")
+        result = multiply(result, m)  # type: ignore[arg-type]
+    return result
+
+
+def parse_length(value: Optional[str], default: float = 0.0) -> float:
+    if value is None or value == "":
+        return default
+    value = value.strip()
+    if value.endswith("%"):
+        raise UnsupportedSVGFeatureError(f"不支持百分比长度: {value}")
+    match = _NUMBER.match(value)
+    if not match:
+        return default
+    unit = value[match.end():].strip()
+    if unit not in ("", "px"):
+        raise UnsupportedSVGFeatureError(f"不支持的长度单位: {value}")
+    return float(match.group())
+
+
+def _bezier(points: Sequence[Point], steps: int) -> List[Point]:
+    """对二次/三次贝塞尔曲线采样 (不含起点)"""
+    result = []
+    for i in range(1, steps + 1):
+        t = i / steps
+        pts = list(points)
+        while len(pts) > 1:
+            pts = [
+                (p0[0] + (p1[0] - p0[0]) * t, p0[1] + (p1[1] - p0[1]) * t)
+                for p0, p1 in zip(pts, pts[1:])
+            ]
+        result.append(pts[0])
+    return result
+
+
+def _curve_steps(points: Sequence[Point]) -> int:
+    length = sum(math.dist(p0, p1) for p0, p1 in zip(points, points[1:]))
+    return max(4, min(64, int(length / 3)))
+
+
+def _arc(
+    start: Point,
+    rx: float,
+    ry: float,
+    rotation: float,
+    large_arc: bool,
+    sweep: bool,
+    end: Point,
+) -> List[Point]:
+    """SVG 椭圆弧 (端点参数化) → 采样点 (不含起点)"""
+    if start == end:
+        return []
+    if rx == 0 or ry == 0:
+        return [end]
+    rx, ry = abs(rx), abs(ry)
+    phi = math.radians(rotation)
+    cos_phi, sin_phi = math.cos(phi), math.sin(phi)
+    dx, dy = (start[0] - end[0]) / 2, (start[1] - end[1]) / 2
+    x1p = cos_phi * dx + sin_phi * dy
+    y1p = -sin_phi * dx + cos_phi * dy
+
+    scale = (x1p ** 2) / (rx ** 2) + (y1p ** 2) / (ry ** 2)
+    if scale > 1:
+        rx *= math.sqrt(scale)
+        ry *= math.sqrt(scale)
+
+    num = rx ** 2 * ry ** 2 - rx ** 2 * y1p ** 2 - ry ** 2 * x1p ** 2
+    den = rx ** 2 * y1p ** 2 + ry ** 2 * x1p ** 2
+    coef = math.sqrt(max(0.0, num / den)) if den else 0.0
+    if large_arc == sweep:
+        coef = -coef
+    cxp = coef * rx * y1p / ry
+    cyp = -coef * ry * x1p / rx
+    cx = cos_phi * cxp - sin_phi * cyp + (start[0] + end[0]) / 2
+    cy = sin_phi * cxp + cos_phi * cyp + (start[1] + end[1]) / 2
+
+    def angle(ux: float, uy: float, vx: float, vy: float) -> float:
+        return math.atan2(ux * vy - uy * vx, ux * vx + uy * vy)
+
+    theta1 = angle(1, 0, (x1p - cxp) / rx, (y1p - cyp) / ry)
+    delta = angle(
+        (x1p - cxp) / rx, (y1p - cyp) / ry, (-x1p - cxp) / rx, (-y1p - cyp) / ry
+    )
+    if not sweep and delta > 0:
+        delta -= 2 * math.pi
+    elif sweep and delta < 0:
+        delta += 2 * math.pi
+
+    steps = max(4, min(96, int(abs(delta) * max(rx, ry) / 3)))
+    points = []
+    for i in range(1, steps + 1):
+        t = theta1 + delta * i / steps
+        x, y = rx * math.cos(t), ry * math.sin(t)
+        points.append((cos_phi * x - sin_phi * y + cx, sin_phi * x + cos_phi * y + cy))
+    return points
+
+
+def parse_path(d: str) -> List[Tuple[List[Point], bool]]:
+    """解析 path 数据, 返回 [(点列表, 是否闭合)]"""
+    tokens = _PATH_TOKEN.findall(d)
+    subpaths: List[Tuple[List[Point], bool]] = []
+    current: List[Point] = []
+    pos: Point = (0.0, 0.0)
+    start: Point = (0.0, 0.0)
+    last_ctrl: Optional[Point] = None
+    last_cmd = ""
+    i = 0
+    cmd = ""
+
+    def numbers(count: int) -> List[float]:
+        nonlocal i
+        values = []
+        for _ in range(count):
+            if i >= len(tokens) or tokens[i].isalpha():
+                raise UnsupportedSVGFeatureError(f"路径数据不完整: {d[:40]}")
+            values.append(float(tokens[i]))
+            i += 1
+        return values
+
+    def flush(closed: bool) -> None:
+        nonlocal current
+        if len(current) > 1:
+            subpaths.append((current, closed))
+        current = []
+
+    while i < len(tokens):
+        if tokens[i].isalpha():
+            cmd = tokens[i]
+            i += 1
+        elif not cmd:
+            raise UnsupportedSVGFeatureError("路径缺少起始命令")
+        relative = cmd.islower()
+        op = cmd.upper()
+        ox, oy = pos if relative else (0.0, 0.0)
+
+        if op == "Z":
+            flush(closed=True)
+            pos = start
+            last_ctrl = None
+            last_cmd = op
+            continue
+        if op == "M":
+            x, y = numbers(2)
+            flush(closed=False)
+            pos = start = (ox + x, oy + y)
+            current = [pos]
+            # M 之后的隐式坐标按 L 处理
+            cmd = "l" if relative else "L"
+            last_ctrl = None
+            last_cmd = op
+            continue
+        if not current:
+            current = [pos]
+        if op == "L":
+            x, y = numbers(2)
+            pos = (ox + x, oy + y)
+            current.append(pos)
+            last_ctrl = None
+        elif op == "H":
+            (x,) = numbers(1)
+            pos = (ox + x, pos[1])
+            current.append(pos)
+            last_ctrl = None
+        elif op == "V":
+            (y,) = numbers(1)
+            pos = (pos[0], oy + y)
+            current.append(pos)
+            last_ctrl = None
+        elif op in ("C", "S"):
+            if op == "C":
+                x1, y1, x2, y2, x, y = numbers(6)
+                c1 = (ox + x1, oy + y1)
+            else:
+                x2, y2, x, y = numbers(4)
+                c1 = (
+                    (2 * pos[0] - last_ctrl[0], 2 * pos[1] - last_ctrl[1])
+                    if last_ctrl and last_cmd in ("C", "S")
+                    else pos
+                )
+            c2 = (ox + x2, oy + y2)
+            end = (ox + x, oy + y)
+            pts = [pos, c1, c2, end]
+            current.extend(_bezier(pts, _curve_steps(pts)))
+            last_ctrl = c2
+            pos = end
+        elif op in ("Q", "T"):
+            if op == "Q":
+                x1, y1, x, y = numbers(4)
+                c1 = (ox + x1, oy + y1)
+            else:
+                x, y = numbers(2)
+                c1 = (
+                    (2 * pos[0] - last_ctrl[0], 2 * pos[1] - last_ctrl[1])
+                    if last_ctrl and last_cmd in ("Q", "T")
+                    else pos
+                )
+            end = (ox + x, oy + y)
+            pts = [pos, c1, end]
+            current.extend(_bezier(pts, _curve_steps(pts)))
+            last_ctrl = c1
+            pos = end
+        elif op == "A":
+            rx, ry, rotation, large_arc, sweep, x, y = numbers(7)
+            end = (ox + x, oy + y)
+            current.extend(_arc(pos, rx, ry, rotation, bool(large_arc), bool(sweep), end))
+            pos = end
+            last_ctrl = None
+        last_cmd = op
+
+    flush(closed=False)
+    return subpaths
+
+
+def _ellipse_points(cx: float, cy: float, rx: float, ry: float) -> List[Point]:
+    steps = max(16, min(180, int(2 * math.pi * max(rx, ry) / 3)))
+    return [
+        (cx + rx * math.cos(2 * math.pi * i / steps), cy + ry * math.sin(2 * math.pi * i / steps))
+        for i in range(steps)
+    ]
+
+
+def _rect_points(x: float, y: float, w: float, h: float, rx: float, ry: float) -> List[Point]:
+    if rx <= 0 and ry <= 0:
+        return [(x, y), (x + w, y), (x + w, y + h), (x, y + h)]
+    rx = min(rx or ry, w / 2)
+    ry = min(ry or rx, h / 2)
+    points: List[Point] = []
+    corners = (
+        (x + w - rx, y + ry, -90),
+        (x + w - rx, y + h - ry, 0),
+        (x + rx, y + h - ry, 90),
+        (x + rx, y + ry, 180),
+    )
+    steps = max(4, min(24, int(max(rx, ry) / 2)))
+    for cx, cy, start in corners:
+        for i in range(steps + 1):
+            t = math.radians(start + 90 * i / steps)
+            points.append((cx + rx * math.cos(t), cy + ry * math.sin(t)))
+    return points
+
+
+def _dash(points: List[Point], pattern: List[float]) -> Iterator[List[Point]]:
+    """按 stroke-dasharray 切分折线"""
+    if len(pattern) % 2:
+        pattern = pattern * 2
+    index, remaining, drawing = 0, pattern[0], True
+    segment: List[Point] = [points[0]]
+    for p0, p1 in zip(points, points[1:]):
+        length = math.dist(p0, p1)
+        pos = 0.0
+        while length - pos > remaining:
+            pos += remaining
+            t = pos / length
+            cut = (p0[0] + (p1[0] - p0[0]) * t, p0[1] + (p1[1] - p0[1]) * t)
+            if drawing:
+                segment.append(cut)
+                yield segment
+            segment = [cut]
+            drawing = not drawing
+            index = (index + 1) % len(pattern)
+            remaining = pattern[index]
+        remaining -= length - pos
+        if drawing:
+            segment.append(p1)
+        else:
+            segment = [p1]
+    if drawing and len(segment) > 1:
+        yield segment
+
+
+# ---------------------------------------------------------------------------
+# 字体
+# ---------------------------------------------------------------------------
+
+def is_emoji(char: str) -> bool:
+    code = ord(char)
+    return (
+        0x1F000 <= code <= 0x1FAFF
+        or 0x2600 <= code <= 0x27BF
+        or 0x2B00 <= code <= 0x2BFF
+        or code in (0x200D, 0xFE0F, 0x20E3, 0x3030, 0x303D, 0x2122, 0x2139)
+        or 0x1F1E6 <= code <= 0x1F1FF
+    )
+
+
+@lru_cache(maxsize=64)
+def _load_font(path: str, size: int) -> ImageFont.FreeTypeFont:
+    return ImageFont.truetype(path, size)
+
+
+@lru_cache(maxsize=64)
+def _glyph_bitmap(path: str, char: str) -> bytes:
+    font = _load_font(path, 32)
+    image = Image.new("L", (64, 64), 0)
+    ImageDraw.Draw(image).text((8, 8), char, font=font, fill=255)
+    return image.tobytes()
+
+
+@lru_cache(maxsize=4096)
+def _has_glyph(path: str, char: str) -> bool:
+    """字体是否包含字符: 与 .notdef 字形比较"""
+    if char.isspace():
+        return True
+    return _glyph_bitmap(path, char) != _glyph_bitmap(path, "\U0010fffd")
+
+
+class FontSet:
+    """按字符选择字体: 常规/粗体字体链 + Emoji 字体"""
+
+    def __init__(self, config: FontConfig) -> None:
+        self.regular = config.resolve("regular")
+        self.bold = config.resolve("bold") or self.regular
+        emoji = config.resolve("emoji")
+        self.emoji = emoji[0] if emoji else None
+        if not self.regular:
+            raise UnsupportedSVGFeatureError("未找到可用字体")
+
+    def font_for(self, char: str, bold: bool) -> Optional[str]:
+        if is_emoji(char):
+            return self.emoji
+        chain = (self.bold + self.regular) if bold else self.regular
+        for path in chain:
+            if _has_glyph(path, char):
+                return path
+        return None
+
+    def runs(self, text: str, bold: bool) -> List[Tuple[Optional[str], str]]:
+        """按字体切分文本; 无可用字体时抛出不支持异常"""
+        runs: List[Tuple[Optional[str], str]] = []
+        for char in text:
+            # 变体选择符/连接符跟随前一个 Emoji
+            if runs and char in ("‍", "️") and runs[-1][0] == self.emoji:
+                runs[-1] = (runs[-1][0], runs[-1][1] + char)
+                continue
+            path = self.font_for(char, bold)
+            if path is None:
+                raise UnsupportedSVGFeatureError(f"没有字体包含字符: {char!r}")
+            if runs and runs[-1][0] == path:
+                runs[-1] = (path, runs[-1][1] + char)
+            else:
+                runs.append((path, char))
+        return runs
+
+
+# ---------------------------------------------------------------------------
+# 渲染
+# ---------------------------------------------------------------------------
+
+def _local(tag: Any) -> str:
+    if not isinstance(tag, str):
+        return ""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _parse_style(value: Optional[str]) -> Dict[str, str]:
+    result: Dict[str, str] = {}
+    for decl in (value or "").split(";"):
+        if ":" in decl:
+            key, val = decl.split(":", 1)
+            result[key.strip()] = val.strip()
+    return result
+
+
+def _parse_css(text: str) -> Dict[str, Dict[str, str]]:
+    rules: Dict[str, Dict[str, str]] = {}
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.S)
+    for selectors, body in _CSS_RULE.findall(text):
+        decls = _parse_style(body)
+        for selector in selectors.split(","):
+            selector = selector.strip()
+            if not re.fullmatch(r"[.#]?[A-Za-z_][\w-]*", selector):
+                raise UnsupportedSVGFeatureError(f"不支持的CSS选择器: {selector}")
+            rules.setdefault(selector, {}).update(decls)
+    if "@" in text:
+        raise UnsupportedSVGFeatureError("不支持 CSS @规则")
+    return rules
+
+
+@dataclass
+class _Paint:
+    color: Optional[Tuple[int, int, int, int]] = None
+    pattern: Optional[ET.Element] = None
+
+
+@dataclass
+class _TextChunk:
+    x: float
+    y: float
+    anchor: str
+    runs: List[Tuple[Dict[str, str], str]] = field(default_factory=list)
+
+
+def _parse_channel(token: str) -> int:
+    if token.endswith("%"):
+        return int(round(max(0.0, min(100.0, float(token[:-1]))) * 2.55))
+    return int(round(max(0.0, min(255.0, float(token)))))
+
+
+def _parse_color(value: str) -> Tuple[int, int, int, float]:
+    """CSS 颜色 -> (r, g, b, alpha 0~1)
+
+    rgb()/rgba() 自行解析: CSS 的 alpha 是 0~1 的小数或百分比,
+    而 ImageColor 把第 4 个分量当作 0~255 的整数。
+    """
+    match = _RGB_FUNCTION.fullmatch(value)
+    if match:
+        parts = [p for p in re.split(r"[\s,/]+", match.group(1)) if p]
+        try:
+            if len(parts) not in (3, 4):
+                raise ValueError(value)
+            r, g, b = (_parse_channel(p) for p in parts[:3])
+            alpha = 1.0
+            if len(parts) == 4:
+                token = parts[3]
+                alpha = float(token[:-1]) / 100 if token.endswith("%") else float(token)
+        except ValueError as e:
+            raise UnsupportedSVGFeatureError(f"无法解析颜色: {value}") from e
+        return r, g, b, max(0.0, min(1.0, alpha))
+    try:
+        rgba = ImageColor.getrgb(value)
+    except ValueError as e:
+        raise UnsupportedSVGFeatureError(f"无法解析颜色: {value}") from e
+    return rgba[0], rgba[1], rgba[2], (rgba[3] if len(rgba) == 4 else 255) / 255
+
+
+class SVGRasterizer:
+    """把 SVG 文档绘制到 RGBA 画布"""
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        background: str = "#ffffff",
+        fonts: Optional[FontConfig] = None,
+        supersample: int = 2,
+    ) -> None:
+        self.width = width
+        self.height = height
+        self.supersample = supersample
+        self.background = background
+        self.font_config = fonts or FontConfig()
+        self._fonts: Optional[FontSet] = None
+        self._defs: Dict[str, ET.Element] = {}
+        self._css: Dict[str, Dict[str, str]] = {}
+        self.canvas: Optional[Image.Image] = None
+
+    @property
+    def fonts(self) -> FontSet:
+        if self._fonts is None:
+            self._fonts = FontSet(self.font_config)
+        return self._fonts
+
+    def render(self, svg_content: str) -> Image.Image:
+        try:
+            root = ET.fromstring(svg_content.strip())
+        except ET.ParseError as e:
+            raise UnsupportedSVGFeatureError(f"SVG 解析失败: {e}") from e
+        if _local(root.tag) != "svg":
+            raise UnsupportedSVGFeatureError("根元素不是 <svg>")
+
+        self._collect(root)
+        ss = self.supersample
+        size = (self.width * ss, self.height * ss)
+        bg = self._color(self.background, 1.0) or (0, 0, 0, 0)
+        self.canvas = Image.new("RGBA", size, bg)
+
+        ctm = multiply((ss, 0, 0, ss, 0, 0), self._viewport(root))
+        self._render_children(root, ctm, self._style_of(root, {}), self.canvas)
+
+        image = self.canvas
+        if ss > 1:
+            # 整数倍超采样用 BOX 下采样即为像素平均, 比 LANCZOS 快得多
+            image = image.resize((self.width, self.height), Image.BOX)
+        return image
+
+    # -- 文档结构 --------------------------------------------------------
+
+    def _collect(self, root: ET.Element) -> None:
+        for element in root.iter():
+            tag = _local(element.tag)
+            if tag in UNSUPPORTED_ELEMENTS:
+                raise UnsupportedSVGFeatureError(f"不支持的元素: <{tag}>")
+            for attr in UNSUPPORTED_ATTRIBUTES:
+                if element.get(attr) or attr in _parse_style(element.get("style")):
+                    raise UnsupportedSVGFeatureError(f"不支持的属性: {attr}")
+            if element.get("id"):
+                self._defs[element.get("id")] = element
+            if tag == "style":
+                for selector, decls in _parse_css(element.text or "").items():
+                    self._css.setdefault(selector, {}).update(decls)
+
+    def _viewport(self, root: ET.Element) -> Matrix:
+        """viewBox / width / height → 画布坐标 (等比缩放并居中)"""
+        view_box = root.get("viewBox")
+        if view_box:
+            vx, vy, vw, vh = (float(n) for n in _NUMBER.findall(view_box)[:4])
+        else:
+            vx, vy = 0.0, 0.0
+            vw = self._root_length(root.get("width"), self.width)
+            vh = self._root_length(root.get("height"), self.height)
+        if vw <= 0 or vh <= 0:
+            raise UnsupportedSVGFeatureError("SVG 尺寸无效")
+        scale = min(self.width / vw, self.height / vh)
+        if not view_box:
+            scale = min(scale, 1.0)  # 与浏览器模板一致: 只缩小不放大
+        tx = (self.width - vw * scale) / 2 - vx * scale
+        ty = (self.height - vh * scale) / 2 - vy * scale
+        return (scale, 0.0, 0.0, scale, tx, ty)
+
+    @staticmethod
+    def _root_length(value: Optional[str], default: float) -> float:
+        if not value or value.strip().endswith("%"):
+            return default
+        return parse_length(value, default)
+
+    def _style_of(self, element: ET.Element, parent: Dict[str, str]) -> Dict[str, str]:
+        style = {k: v for k, v in parent.items() if k in INHERITED_PROPERTIES}
+        for key in INHERITED_PROPERTIES + ("opacity",):
+            if element.get(key) is not None:
+                style[key] = element.get(key)
+        tag = _local(element.tag)
+        for selector in [tag] + [f".{c}" for c in (element.get("class") or "").split()] + (
+            [f"#{element.get('id')}"] if element.get("id") else []
+        ):
+            style.update(self._css.get(selector, {}))
+        style.update(_parse_style(element.get("style")))
+        if "opacity" in style and "opacity" in parent:
+            # 组透明度近似为乘到子元素上
+            style["opacity"] = str(float(style["opacity"]) * float(parent["opacity"]))
+        elif "opacity" in parent:
+            style["opacity"] = parent["opacity"]
+        return style
+
+    def _render_children(
+        self,
+        element: ET.Element,
+        ctm: Matrix,
+        style: Dict[str, str],
+        target: Image.Image,
+    ) -> None:
+        for child in element:
+            self._render_element(child, ctm, style, target)
+
+    def _render_element(
+        self,
+        element: ET.Element,
+        ctm: Matrix,
+        parent_style: Dict[str, str],
+        target: Image.Image,
+    ) -> None:
+        tag = _local(element.tag)
+        if tag in IGNORED_ELEMENTS or tag == "pattern":
+            return
+        style = self._style_of(element, parent_style)
+        if style.get("display") == "none" or style.get("visibility") == "hidden":
+            return
+        ctm = multiply(ctm, parse_transform(element.get("transform")))
+
+        if tag in ("g", "a", "svg", "switch"):
+            if tag == "svg":
+                ctm = multiply(ctm, (1, 0, 0, 1, parse_length(element.get("x")), parse_length(element.get("y"))))
+            self._render_children(element, ctm, style, target)
+        elif tag == "use":
+            href = element.get("href") or element.get("{http://www.w3.org/1999/xlink}href")
+            ref = self._defs.get((href or "").lstrip("#"))
+            if ref is None:
+                raise UnsupportedSVGFeatureError(f"无法解析 <use> 引用: {href}")
+            offset = (1, 0, 0, 1, parse_length(element.get("x")), parse_length(element.get("y")))
+            self._render_element(ref, multiply(ctm, offset), style, target)
+        elif tag == "text":
+            self._draw_text(element, ctm, style, target)
+        elif tag in ("rect", "circle", "ellipse", "line", "polyline", "polygon", "path"):
+            shapes = self._geometry(tag, element)
+            if shapes:
+                self._draw_shapes(shapes, tag, ctm, style, target)
+        else:
+            raise UnsupportedSVGFeatureError(f"不支持的元素: <{tag}>")
+
+    def _geometry(self, tag: str, el: ET.Element) -> List[Tuple[List[Point], bool]]:
+        num = lambda name, default=0.0: parse_length(el.get(name), default)  # noqa: E731
+        if tag == "rect":
+            w, h = num("width"), num("height")
+            if w <= 0 or h <= 0:
+                return []
+            rx = el.get("rx")
+            ry = el.get("ry")
+            rx_val = parse_length(rx) if rx is not None else (parse_length(ry) if ry is not None else 0.0)
+            ry_val = parse_length(ry) if ry is not None else rx_val
+            return [(_rect_points(num("x"), num("y"), w, h, rx_val, ry_val), True)]
+        if tag == "circle":
+            r = num("r")
+            return [(_ellipse_points(num("cx"), num("cy"), r, r), True)] if r > 0 else []
+        if tag == "ellipse":
+            rx, ry = num("rx"), num("ry")
+            return [(_ellipse_points(num("cx"), num("cy"), rx, ry), True)] if rx > 0 and ry > 0 else []
+        if tag == "line":
+            return [([(num("x1"), num("y1")), (num("x2"), num("y2"))], False)]
+        if tag in ("polyline", "polygon"):
+            values = [float(n) for n in _NUMBER.findall(el.get("points", ""))]
+            points = list(zip(values[0::2], values[1::2]))
+            return [(points, tag == "polygon")] if len(points) > 1 else []
+        return parse_path(el.get("d", ""))
+
+    # -- 颜色与绘制 ------------------------------------------------------
+
+    def _color(self, value: Optional[str], opacity: float, current: str = "#000") -> Optional[Tuple[int, int, int, int]]:
+        if value is None:
+            return None
+        value = value.strip()
+        if value in ("none", "transparent", ""):
+            return None
+        if value == "currentColor":
+            value = current
+        r, g, b, alpha = _parse_color(value)
+        alpha *= max(0.0, min(1.0, opacity))
+        return (r, g, b, int(round(alpha * 255)))
+
+    def _paint(self, style: Dict[str, str], kind: str) -> Optional[_Paint]:
+        default = "#000" if kind == "fill" else None
+        value = style.get(kind, default)
+        if value is None:
+            return None
+        opacity = float(style.get("opacity", 1)) * float(style.get(f"{kind}-opacity", 1))
+        if value.startswith("url("):
+            ref_id = value[value.index("#") + 1:value.index(")")].strip("'\"")
+            ref = self._defs.get(ref_id)
+            if ref is None or _local(ref.tag) != "pattern":
+                raise UnsupportedSVGFeatureError(f"不支持的填充引用: {value}")
+            return _Paint(pattern=ref, color=(0, 0, 0, int(round(255 * opacity))))
+        color = self._color(value, opacity, style.get("color", "#000"))
+        return _Paint(color=color) if color and color[3] > 0 else None
+
+    def _composite(
+        self,
+        target: Image.Image,
+        mask: Image.Image,
+        origin: Tuple[int, int],
+        paint: _Paint,
+        ctm: Matrix,
+        bbox: Tuple[float, float, float, float],
+    ) -> None:
+        """按遮罩把颜色/图案合成到目标画布"""
+        if paint.pattern is not None:
+            layer = self._pattern_layer(paint.pattern, ctm, bbox, origin, mask.size)
+            alpha = ImageChops.multiply(layer.getchannel("A"), mask)
+            if paint.color and paint.color[3] < 255:
+                alpha = alpha.point(lambda v, a=paint.color[3]: v * a // 255)
+            layer.putalpha(alpha)
+        else:
+            assert paint.color is not None
+            r, g, b, a = paint.color
+            if a == 255:
+                # 不透明纯色: 直接按遮罩混合, 省去整层合成
+                target.paste(paint.color, origin + (origin[0] + mask.width, origin[1] + mask.height), mask)
+                return
+            layer = Image.new("RGBA", mask.size, (r, g, b, 0))
+            layer.putalpha(mask.point(lambda v: v * a // 255))
+        target.alpha_composite(layer, dest=origin)
+
+    def _region(
+        self, target: Image.Image, polys: List[List[Point]], pad: float
+    ) -> Optional[Tuple[int, int, int, int]]:
+        xs = [x for poly in polys for x, _ in poly]
+        ys = [y for poly in polys for _, y in poly]
+        x0 = max(0, int(math.floor(min(xs) - pad)))
+        y0 = max(0, int(math.floor(min(ys) - pad)))
+        x1 = min(target.width, int(math.ceil(max(xs) + pad)) + 1)
+        y1 = min(target.height, int(math.ceil(max(ys) + pad)) + 1)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return x0, y0, x1, y1
+
+    def _draw_shapes(
+        self,
+        shapes: List[Tuple[List[Point], bool]],
+        tag: str,
+        ctm: Matrix,
+        style: Dict[str, str],
+        target: Image.Image,
+    ) -> None:
+        device = [([apply(ctm, p) for p in pts], closed) for pts, closed in shapes]
+        user_pts = [p for pts, _ in shapes for p in pts]
+        bbox = (
+            min(x for x, _ in user_pts),
+            min(y for _, y in user_pts),
+            max(x for x, _ in user_pts),
+            max(y for _, y in user_pts),
+        )
+        stroke_width = parse_length(style.get("stroke-width"), 1.0) * matrix_scale(ctm)
+        region = self._region(target, [pts for pts, _ in device], stroke_width)
+        if region is None:
+            return
+        x0, y0, x1, y1 = region
+        local = [([(x - x0, y - y0) for x, y in pts], closed) for pts, closed in device]
+
+        fill = self._paint(style, "fill") if tag != "line" or style.get("fill") else None
+        stroke = self._paint(style, "stroke")
+
+        if fill is not None:
+            mask = Image.new("L", (x1 - x0, y1 - y0), 0)
+            fillable = [pts for pts, _ in local if len(pts) > 2]
+            if len(fillable) == 1:
+                ImageDraw.Draw(mask).polygon(fillable[0], fill=255)
+            else:
+                # 多个子路径按 even-odd 规则合并
+                for pts in fillable:
+                    sub = Image.new("1", mask.size, 0)
+                    ImageDraw.Draw(sub).polygon(pts, fill=1)
+                    mask = ImageChops.logical_xor(mask.convert("1"), sub)
+                mask = mask.convert("L")
+            self._composite(target, mask, (x0, y0), fill, ctm, bbox)
+
+        if stroke is not None and stroke_width > 0:
+            mask = Image.new("L", (x1 - x0, y1 - y0), 0)
+            draw = ImageDraw.Draw(mask)
+            dash = [
+                parse_length(v) * matrix_scale(ctm)
+                for v in re.split(r"[\s,]+", style.get("stroke-dasharray", "none").strip())
+                if v and v != "none"
+            ]
+            width = max(1, int(round(stroke_width)))
+            for pts, closed in local:
+                line = pts + [pts[0]] if closed else pts
+                segments = _dash(line, dash) if dash and sum(dash) > 0 else [line]
+                for segment in segments:
+                    draw.line(segment, fill=255, width=width, joint="curve")
+            self._composite(target, mask, (x0, y0), stroke, ctm, bbox)
+
+    def _pattern_layer(
+        self,
+        pattern: ET.Element,
+        ctm: Matrix,
+        bbox: Tuple[float, float, float, float],
+        origin: Tuple[int, int],
+        size: Tuple[int, int],
+    ) -> Image.Image:
+        """把 <pattern> 平铺到指定区域"""
+        if pattern.get("patternTransform") or pattern.get("viewBox"):
+            raise UnsupportedSVGFeatureError("不支持 patternTransform/viewBox")
+        a, b, c, d, _, _ = ctm
+        if abs(b) > 1e-6 or abs(c) > 1e-6:
+            raise UnsupportedSVGFeatureError("不支持旋转/斜切的图案填充")
+
+        x, y = parse_length(pattern.get("x")), parse_length(pattern.get("y"))
+        w, h = parse_length(pattern.get("width")), parse_length(pattern.get("height"))
+        if pattern.get("patternUnits", "objectBoundingBox") == "objectBoundingBox":
+            bw, bh = bbox[2] - bbox[0], bbox[3] - bbox[1]
+            x, y, w, h = bbox[0] + x * bw, bbox[1] + y * bh, w * bw, h * bh
+        if w <= 0 or h <= 0:
+            raise UnsupportedSVGFeatureError("图案尺寸无效")
+
+        tile_w = max(1, int(round(w * abs(a))))
+        tile_h = max(1, int(round(h * abs(d))))
+        tile = Image.new("RGBA", (tile_w, tile_h), (0, 0, 0, 0))
+        content_units = pattern.get("patternContentUnits", "userSpaceOnUse")
+        tile_ctm: Matrix = (abs(a), 0.0, 0.0, abs(d), 0.0, 0.0)
+        if content_units == "objectBoundingBox":
+            tile_ctm = multiply(tile_ctm, (bbox[2] - bbox[0], 0, 0, bbox[3] - bbox[1], 0, 0))
+        self._render_children(pattern, tile_ctm, self._style_of(pattern, {}), tile)
+
+        start_x, start_y = apply(ctm, (x, y))
+        layer = Image.new("RGBA", size, (0, 0, 0, 0))
+        off_x = int(round((start_x - origin[0]) % tile_w)) - tile_w
+        off_y = int(round((start_y - origin[1]) % tile_h)) - tile_h
+        for ty in range(off_y, size[1], tile_h):
+            for tx in range(off_x, size[0], tile_w):
+                layer.paste(tile, (tx, ty))
+        return layer
+
+    # -- 文本 ------------------------------------------------------------
+
+    def _text_chunks(self, element: ET.Element, style: Dict[str, str]) -> List[_TextChunk]:
+        chunks: List[_TextChunk] = []
+        cursor = [0.0, 0.0]
+
+        def first(value: Optional[str]) -> Optional[float]:
+            if value is None:
+                return None
+            numbers = _NUMBER.findall(value)
+            if len(numbers) > 1:
+                raise UnsupportedSVGFeatureError("不支持逐字坐标列表")
+            return float(numbers[0]) if numbers else None
+
+        def position(el: ET.Element, el_style: Dict[str, str]) -> None:
+            x, y = first(el.get("x")), first(el.get("y"))
+            dx, dy = first(el.get("dx")), first(el.get("dy"))
+            if x is not None or y is not None or not chunks:
+                cursor[0] = x if x is not None else cursor[0]
+                cursor[1] = y if y is not None else cursor[1]
+                cursor[0] += dx or 0.0
+                cursor[1] += dy or 0.0
+                chunks.append(_TextChunk(cursor[0], cursor[1], el_style.get("text-anchor", "start")))
+            elif dx or dy:
+                cursor[0] += dx or 0.0
+                cursor[1] += dy or 0.0
+                chunks.append(_TextChunk(cursor[0], cursor[1], el_style.get("text-anchor", "start")))
+
+        def add(text: Optional[str], el_style: Dict[str, str]) -> None:
+            if text:
+                chunks[-1].runs.append((el_style, _WHITESPACE.sub(" ", text)))
+
+        def walk(el: ET.Element, el_style: Dict[str, str]) -> None:
+            position(el, el_style)
+            add(el.text, el_style)
+            for child in el:
+                tag = _local(child.tag)
+                if tag in ("title", "desc"):
+                    continue
+                if tag != "tspan":
+                    raise UnsupportedSVGFeatureError(f"不支持的文本子元素: <{tag}>")
+                child_style = self._style_of(child, el_style)
+                walk(child, child_style)
+                add(child.tail, el_style)
+
+        walk(element, style)
+        for chunk in chunks:
+            if chunk.runs:
+                s, text = chunk.runs[0]
+                chunk.runs[0] = (s, text.lstrip())
+                s, text = chunk.runs[-1]
+                chunk.runs[-1] = (s, text.rstrip())
+        return [chunk for chunk in chunks if any(text for _, text in chunk.runs)]
+
+    def _draw_text(
+        self,
+        element: ET.Element,
+        ctm: Matrix,
+        style: Dict[str, str],
+        target: Image.Image,
+    ) -> None:
+        a, b, c, d, _, _ = ctm
+        if abs(b) > 1e-6 or abs(c) > 1e-6 or abs(a - d) > 1e-6 * max(1.0, abs(a)):
+            raise UnsupportedSVGFeatureError("不支持旋转/斜切/非等比缩放的文本")
+        scale = a
+
+        for chunk in self._text_chunks(element, style):
+            laid_out = []
+            advance = 0.0
+            for run_style, text in chunk.runs:
+                size = max(1, int(round(parse_length(run_style.get("font-size"), 16.0) * scale)))
+                bold = run_style.get("font-weight", "normal") in ("bold", "bolder", "600", "700", "800", "900")
+                for path, part in self.fonts.runs(text, bold):
+                    width = self._text_width(path, part, size)
+                    laid_out.append((run_style, path, part, size, advance))
+                    advance += width
+            if chunk.anchor == "middle":
+                shift = -advance / 2
+            elif chunk.anchor == "end":
+                shift = -advance
+            else:
+                shift = 0.0
+            origin_x, baseline = apply(ctm, (chunk.x, chunk.y))
+            for run_style, path, part, size, offset in laid_out:
+                self._draw_run(run_style, path, part, size, origin_x + shift + offset, baseline, scale, ctm, target)
+
+    def _text_width(self, path: Optional[str], text: str, size: int) -> float:
+        if path == self.fonts.emoji and path is not None:
+            font = _load_font(path, EMOJI_BITMAP_SIZE)
+            return font.getlength(text) * size / EMOJI_BITMAP_SIZE
+        return _load_font(path, size).getlength(text)  # type: ignore[arg-type]
+
+    def _draw_run(
+        self,
+        style: Dict[str, str],
+        path: Optional[str],
+        text: str,
+        size: int,
+        x: float,
+        baseline: float,
+        scale: float,
+        ctm: Matrix,
+        target: Image.Image,
+    ) -> None:
+        if path is not None and path == self.fonts.emoji:
+            self._draw_emoji(path, text, size, x, baseline, target)
+            return
+
+        font = _load_font(path, size)  # type: ignore[arg-type]
+        fill = self._paint(style, "fill")
+        stroke = self._paint(style, "stroke")
+        stroke_width = parse_length(style.get("stroke-width"), 1.0) * scale
+        pad = int(stroke_width) + 2
+        left, top, right, bottom = font.getbbox(text, anchor="ls")
+        region = (
+            int(math.floor(x + left)) - pad,
+            int(math.floor(baseline + top)) - pad,
+            int(math.ceil(x + right)) + pad,
+            int(math.ceil(baseline + bottom)) + pad,
+        )
+        w, h = region[2] - region[0], region[3] - region[1]
+        if w <= 0 or h <= 0:
+            return
+        pos = (x - region[0], baseline - region[1])
+        bbox = (region[0] / scale, region[1] / scale, region[2] / scale, region[3] / scale)
+
+        # paint-order: 先描边后填充, 与 Stage B 提示词要求一致
+        if stroke is not None and stroke_width > 0:
+            mask = Image.new("L", (w, h), 0)
+            ImageDraw.Draw(mask).text(
+                pos, text, font=font, fill=255, anchor="ls",
+                stroke_width=max(1, int(round(stroke_width / 2))), stroke_fill=255,
+            )
+            self._composite(target, mask, region[:2], stroke, ctm, bbox)
+        if fill is not None:
+            mask = Image.new("L", (w, h), 0)
+            ImageDraw.Draw(mask).text(pos, text, font=font, fill=255, anchor="ls")
+            self._composite(target, mask, region[:2], fill, ctm, bbox)
+
+    def _draw_emoji(
+        self, path: str, text: str, size: int, x: float, baseline: float, target: Image.Image
+    ) -> None:
+        font = _load_font(path, EMOJI_BITMAP_SIZE)
+        left, top, right, bottom = font.getbbox(text, anchor="ls")
+        w, h = int(math.ceil(right - left)), int(math.ceil(bottom - top))
+        if w <= 0 or h <= 0:
+            return
+        glyphs = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+        ImageDraw.Draw(glyphs).text((-left, -top), text, font=font, anchor="ls", embedded_color=True)
+        ratio = size / EMOJI_BITMAP_SIZE
+        glyphs = glyphs.resize(
+            (max(1, int(round(w * ratio))), max(1, int(round(h * ratio)))), Image.LANCZOS
+        )
+        dest = (int(round(x + left * ratio)), int(round(baseline + top * ratio)))
+        layer = Image.new("RGBA", target.size, (0, 0, 0, 0))
+        layer.paste(glyphs, dest)
+        target.alpha_composite(layer)
+
+
+def rasterize_svg(
+    svg_content: str,
+    width: int,
+    height: int,
+    background: str = "#ffffff",
+    image_format: str = "png",
+    fonts: Optional[FontConfig] = None,
+    supersample: int = 2,
+) -> bytes:
+    """SVG → 图像字节; 不支持的特性抛出 UnsupportedSVGFeatureError
+
+    纯函数, 参数与返回值均可序列化, 适合在进程池中执行。
+    """
+    image = SVGRasterizer(width, height, background, fonts, supersample).render(svg_content)
+    output = io.BytesIO()
+    if image_format.lower() in ("jpeg", "jpg"):
+        image.convert("RGB").save(output, format="JPEG", quality=95)
+    else:
+        image.save(output, format=image_format.upper(), optimize=False)
+    return output.getvalue()
@@ -0,0 +1,198 @@
+"""
+基础设施层 - 异步任务执行器
+
+TaskRunner: 持久化的有界并发任务执行器
+- 任务提交时先落盘 (pending), 由固定数量的工作协程执行, 限制同时运行的数量
+- 执行中的进度通过 checkpoint 写回任务库, 状态查询直接读库
+- 启动时恢复上次未完成的任务 (pending/processing); 超过最大尝试次数的标记为失败
+- drain: 停止接收新任务, 等待执行中的任务完成; 超时后取消, 未完成任务留待下次恢复
+"""
+
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+import asyncio
+import logging
+
+from ...domain.entities import GenerationTask
+from ...shared.errors import ServiceUnavailableError, ValidationError
+from ...shared.logging import business_logger
+from ...shared.types import RenderResult
+from .task_store import SQLiteTaskStore
+
+
+logger = logging.getLogger(__name__)
+
+TaskHandler = Callable[[GenerationTask, Dict[str, Any]], Awaitable[None]]
+
+
+class TaskRunner:
+    """持久化任务执行器"""
+
+    def __init__(
+        self,
+        store: SQLiteTaskStore,
+        max_concurrency: int = 4,
+        max_attempts: int = 3,
+    ) -> None:
+        self.store = store
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_attempts = max_attempts
+        self._handlers: Dict[str, TaskHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._live: Dict[str, GenerationTask] = {}
+        self._running: Set[str] = set()
+        self._accepting = False
+        self._stats = {"submitted": 0, "resumed": 0, "completed": 0, "failed": 0, "interrupted": 0}
+
+    def register(self, kind: str, handler: TaskHandler) -> None:
+        """注册任务类型的执行函数"""
+        self._handlers[kind] = handler
+
+    async def start(self) -> None:
+        """打开任务库, 启动工作协程并恢复未完成的任务"""
+        if self._workers:
+            return
+        await self.store.initialize()
+        self._queue = asyncio.Queue()
+        self._accepting = True
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(self.max_concurrency)
+        ]
+        await self._resume()
+
+    async def submit(
+        self,
+        task: GenerationTask,
+        kind: str,
+        payload: Dict[str, Any],
+    ) -> None:
+        """持久化并排队执行任务"""
+        if not self._accepting or self._queue is None:
+            raise ServiceUnavailableError(
+                message="任务执行器未启动或正在关闭",
+                error_code="TASK_RUNNER_UNAVAILABLE",
+            )
+        if kind not in self._handlers:
+            raise ValidationError(
+                message=f"未注册的任务类型: {kind}",
+                error_code="UNKNOWN_TASK_KIND",
+            )
+        await self.store.save(task, kind, payload)
+        self._enqueue(task, kind, payload)
+        self._stats["submitted"] += 1
+
+    async def checkpoint(self, task: GenerationTask) -> None:
+        """把执行中的任务进度写回任务库"""
+        await self.store.save(task)
+
+    async def get_by_id(self, task_id: str) -> Optional[GenerationTask]:
+        """任务状态 (执行中的任务直接返回内存对象)"""
+        return self._live.get(str(task_id)) or await self.store.get_by_id(task_id)
+
+    async def drain(self, timeout: Optional[float] = 30.0) -> None:
+        """优雅关闭: 不再接收新任务, 等待执行中的任务完成
+
+        排队中尚未开始的任务保持 pending, 超时被取消的任务保持
+        processing, 两者都会在下次 start() 时恢复。
+        """
+        self._accepting = False
+        if not self._workers:
+            return
+        assert self._queue is not None
+
+        # 让空闲的工作协程退出; 忙碌的协程完成当前任务后退出
+        for _ in self._workers:
+            self._queue.put_nowait(None)
+        done, pending = await asyncio.wait(self._workers, timeout=timeout)
+        for worker in pending:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+        self._stats["interrupted"] += len(self._running)
+        business_logger.logger.info(
+            "任务执行器已停止",
+            operation="task_runner_drain",
+            interrupted=len(self._running),
+            left_pending=len(self._live) - len(self._running),
+        )
+        self._workers = []
+        self._queue = None
+        self._live.clear()
+        self._running.clear()
+        await self.store.close()
+
+    def _enqueue(self, task: GenerationTask, kind: str, payload: Dict[str, Any]) -> None:
+        assert self._queue is not None
+        self._live[str(task.id)] = task
+        self._queue.put_nowait((task, kind, payload))
+
+    async def _resume(self) -> None:
+        for task, kind, payload in await self.store.list_unfinished():
+            if kind not in self._handlers:
+                logger.warning(f"跳过未注册类型的任务: task_id={task.id}, kind={kind}")
+                continue
+            task.status = "pending"
+            self._enqueue(task, kind, payload)
+            self._stats["resumed"] += 1
+        if self._stats["resumed"]:
+            business_logger.logger.info(
+                "已恢复未完成的任务",
+                operation="task_runner_resume",
+                resumed=self._stats["resumed"],
+            )
+
+    async def _worker(self, index: int) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            item = await queue.get()
+            if item is None or not self._accepting:
+                return
+            task, kind, payload = item
+            task_id = str(task.id)
+            self._running.add(task_id)
+            try:
+                await self._execute(task, kind, payload)
+            finally:
+                self._running.discard(task_id)
+                if task.is_finished:
+                    self._live.pop(task_id, None)
+
+    async def _execute(self, task: GenerationTask, kind: str, payload: Dict[str, Any]) -> None:
+        attempts = await self.store.increment_attempts(str(task.id))
+        if attempts > self.max_attempts:
+            self._fail(task, f"超过最大尝试次数 ({self.max_attempts})")
+            await self.store.save(task)
+            return
+
+        task.start()
+        await self.store.save(task)
+        try:
+            await self._handlers[kind](task, payload)
+        except asyncio.CancelledError:
+            # 关闭时被中断: 保持 processing, 下次启动时恢复
+            raise
+        except Exception as e:
+            logger.error(f"任务执行异常: task_id={task.id}, error={e}")
+            if not task.is_finished:
+                self._fail(task, str(e))
+
+        if not task.is_finished:
+            self._fail(task, "任务执行结束但未产生结果")
+        self._stats["completed" if task.is_completed else "failed"] += 1
+        await self.store.save(task)
+
+    @staticmethod
+    def _fail(task: GenerationTask, message: str) -> None:
+        task.complete(RenderResult(svg_content="", success=False, error_message=message))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "accepting": self._accepting,
+            "workers": len(self._workers),
+            "running": len(self._running),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            **self._stats,
+        }
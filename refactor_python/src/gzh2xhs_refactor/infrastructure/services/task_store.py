@@ -0,0 +1,216 @@
+"""
+基础设施层 - 任务持久化
+
+SQLiteTaskStore: 基于 SQLite 的生成任务仓库 (本地/单机部署)
+- 任务状态、进度与执行载荷落盘, 进程重启后可恢复未完成任务
+- 已完成任务的结果 (SVG、元数据) 在重启后仍可查询
+- sqlite3 调用放到线程中执行, 不阻塞事件循环
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+
+from ...domain.entities import CardId, GenerationTask, Timestamp, UserId
+from ...shared.errors import DatabaseError
+from ...shared.types import RenderResult
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS generation_tasks (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    card_id TEXT,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    payload TEXT NOT NULL DEFAULT '{}',
+    result TEXT,
+    error_message TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    completed_at TEXT,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_generation_tasks_status ON generation_tasks (status);
+"""
+
+UNFINISHED_STATUSES = ("pending", "processing")
+
+
+def _timestamp(value: Optional[Timestamp]) -> Optional[str]:
+    return value.iso_format if value is not None else None
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[Timestamp]:
+    return Timestamp(datetime.fromisoformat(value)) if value else None
+
+
+def _encode_result(result: Optional[RenderResult]) -> Optional[str]:
+    """序列化渲染结果; PNG 数据体积大, 不入库"""
+    if result is None:
+        return None
+    data = asdict(result)
+    data.pop("png_data", None)
+    return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def _decode_result(value: Optional[str]) -> Optional[RenderResult]:
+    return RenderResult(**json.loads(value)) if value else None
+
+
+class SQLiteTaskStore:
+    """SQLite 生成任务仓库"""
+
+    def __init__(self, path: str = "data/tasks.db") -> None:
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    async def initialize(self) -> None:
+        """打开数据库并建表"""
+        if self._conn is not None:
+            return
+        await asyncio.to_thread(self._connect)
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            await asyncio.to_thread(conn.close)
+
+    def _connect(self) -> None:
+        try:
+            directory = os.path.dirname(self.path)
+            if directory and self.path != ":memory:":
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+        except sqlite3.Error as e:
+            raise DatabaseError(
+                message=f"任务库初始化失败: {e}",
+                error_code="TASK_STORE_INIT_FAILED",
+                details={"path": self.path},
+                cause=e,
+            ) from e
+        self._conn = conn
+
+    async def _call(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """在线程中执行数据库操作 (连接由锁串行化)"""
+        if self._conn is None:
+            raise DatabaseError(message="任务库尚未初始化", error_code="TASK_STORE_NOT_INITIALIZED")
+        conn = self._conn
+
+        def execute() -> Any:
+            with self._lock:
+                return fn(conn)
+
+        try:
+            return await asyncio.to_thread(execute)
+        except sqlite3.Error as e:
+            raise DatabaseError(
+                message=f"任务库操作失败: {e}",
+                error_code="TASK_STORE_QUERY_FAILED",
+                cause=e,
+            ) from e
+
+    async def _run(self, sql: str, params: Tuple[Any, ...] = ()) -> List[sqlite3.Row]:
+        return await self._call(lambda conn: conn.execute(sql, params).fetchall())
+
+    async def save(
+        self,
+        task: GenerationTask,
+        kind: Optional[str] = None,
+        payload: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """写入任务状态; kind/payload 只在首次写入时需要"""
+        now = datetime.utcnow().isoformat()
+        await self._run(
+            """
+            INSERT INTO generation_tasks (
+                id, kind, user_id, card_id, status, progress, payload, result,
+                error_message, created_at, started_at, completed_at, updated_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                status = excluded.status,
+                progress = excluded.progress,
+                result = excluded.result,
+                error_message = excluded.error_message,
+                started_at = excluded.started_at,
+                completed_at = excluded.completed_at,
+                updated_at = excluded.updated_at
+            """,
+            (
+                str(task.id),
+                kind or "",
+                str(task.user_id),
+                str(task.card_id) if task.card_id else None,
+                task.status,
+                task.progress,
+                json.dumps(payload or {}, ensure_ascii=False),
+                _encode_result(task.result),
+                task.error_message,
+                _timestamp(task.created_at),
+                _timestamp(task.started_at),
+                _timestamp(task.completed_at),
+                now,
+            ),
+        )
+
+    async def get_by_id(self, task_id: str) -> Optional[GenerationTask]:
+        rows = await self._run("SELECT * FROM generation_tasks WHERE id = ?", (str(task_id),))
+        return self._to_task(rows[0]) if rows else None
+
+    async def list_unfinished(self) -> List[Tuple[GenerationTask, str, Dict[str, Any]]]:
+        """未完成任务 (pending/processing), 按创建时间排序"""
+        rows = await self._run(
+            "SELECT * FROM generation_tasks WHERE status IN (?, ?) ORDER BY created_at",
+            UNFINISHED_STATUSES,
+        )
+        return [(self._to_task(row), row["kind"], json.loads(row["payload"])) for row in rows]
+
+    async def increment_attempts(self, task_id: str) -> int:
+        """记录一次执行尝试, 返回累计次数"""
+        def increment(conn: sqlite3.Connection) -> int:
+            conn.execute(
+                "UPDATE generation_tasks SET attempts = attempts + 1 WHERE id = ?",
+                (str(task_id),),
+            )
+            row = conn.execute(
+                "SELECT attempts FROM generation_tasks WHERE id = ?", (str(task_id),)
+            ).fetchone()
+            return row["attempts"] if row else 0
+
+        return await self._call(increment)
+
+    async def count_by_status(self) -> Dict[str, int]:
+        rows = await self._run(
+            "SELECT status, COUNT(*) AS total FROM generation_tasks GROUP BY status"
+        )
+        return {row["status"]: row["total"] for row in rows}
+
+    @staticmethod
+    def _to_task(row: sqlite3.Row) -> GenerationTask:
+        return GenerationTask(
+            id=UUID(row["id"]),
+            card_id=CardId(UUID(row["card_id"])) if row["card_id"] else None,
+            user_id=UserId(row["user_id"]),
+            status=row["status"],
+            progress=row["progress"],
+            result=_decode_result(row["result"]),
+            error_message=row["error_message"],
+            started_at=_parse_timestamp(row["started_at"]),
+            completed_at=_parse_timestamp(row["completed_at"]),
+            created_at=_parse_timestamp(row["created_at"]),
+        )
@@ -0,0 +1,77 @@
+"""
+请求指纹
+
+为生成请求计算跨进程稳定的摘要, 用作缓存键:
+- 内置 hash() 每个进程随机加盐, 不能用于多 worker 共享的缓存 (Redis)
+- 文本规范化 (NFC、换行、首尾空白) 后参与计算, 格式差异不影响命中
+- 枚举取 value, 选项按键排序序列化, 与 repr 和字典顺序无关
+"""
+
+from __future__ import annotations
+
+from enum import Enum
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import unicodedata
+
+from .types import GenerationRequest
+
+
+# 规范形式变化时递增, 旧缓存自然失效
+FINGERPRINT_VERSION = 1
+
+
+def normalize_text(text: str) -> str:
+    """文本规范形式: NFC, LF 换行, 去掉行尾与首尾空白"""
+    text = unicodedata.normalize("NFC", text).replace("\r\n", "\n").replace("\r", "\n")
+    return "\n".join(line.rstrip() for line in text.split("\n")).strip()
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def stable_digest(namespace: str, payload: Any) -> str:
+    """命名空间 + 排序键 JSON 的 SHA-256 摘要"""
+    digest = hashlib.sha256(f"{namespace}:v{FINGERPRINT_VERSION}:".encode())
+    digest.update(
+        json.dumps(
+            payload,
+            sort_keys=True,
+            ensure_ascii=False,
+            separators=(",", ":"),
+            default=_plain,
+        ).encode("utf-8")
+    )
+    return digest.hexdigest()
+
+
+def request_fingerprint(
+    text: str,
+    model: Any,
+    style: Any = None,
+    size: Any = None,
+    options: Optional[Dict[str, Any]] = None,
+) -> str:
+    """生成请求指纹: 覆盖所有影响输出的字段 (session_id/request_id 不参与)"""
+    return stable_digest(
+        "generation",
+        {
+            "text": normalize_text(text),
+            "model": str(_plain(model)).lower(),
+            "style": _plain(style),
+            "size": _plain(size),
+            # 值为 None 的选项与缺省等价
+            "options": {k: v for k, v in (options or {}).items() if v is not None},
+        },
+    )
+
+
+def generation_fingerprint(request: GenerationRequest) -> str:
+    """GenerationRequest 的指纹"""
+    return request_fingerprint(
+        request.text, request.model, request.style, request.size, request.options
+    )
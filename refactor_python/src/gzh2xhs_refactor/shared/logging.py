@@ -11,10 +11,11 @@
 from __future__ import annotations
 
 import logging
+import re
 import sys
 import json
 from datetime import datetime
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Union
 from contextvars import ContextVar
 import structlog
 from structlog.typing import EventDict, Processor
@@ -27,7 +28,13 @@ session_id_var: ContextVar[Optional[str]] = ContextVar("session_id", default=Non
 
 
 class SensitiveDataFilter:
-    """敏感数据过滤处理器"""
+    """敏感数据过滤处理器
+
+    键名包含任一敏感词 (不区分大小写) 即脱敏:
+    - 所有敏感词编译成一个正则, 每个键名只匹配一次, 结果缓存在 _decisions 中
+    - 写时复制: 没有需要脱敏的键时原样返回传入的字典, 不重建;
+      嵌套字典只复制被修改的那一层, 不会改动调用方传入的对象
+    """
     
     SENSITIVE_KEYS = {
         "password", "token", "key", "secret", "api_key", "auth_token",
@@ -35,34 +42,72 @@ class SensitiveDataFilter:
         "phone", "address", "name", "username",
     }
     
+    def __init__(self, sensitive_keys: Optional[Iterable[str]] = None, cache_size: int = 4096) -> None:
+        keys = sorted(sensitive_keys if sensitive_keys is not None else self.SENSITIVE_KEYS, key=len, reverse=True)
+        self._pattern = re.compile("|".join(re.escape(k.lower()) for k in keys)) if keys else None
+        self._decisions: Dict[Any, bool] = {}
+        self._cache_size = cache_size
+    
     def __call__(self, logger: logging.Logger, method_name: str, event_dict: EventDict) -> EventDict:
         """过滤敏感信息"""
-        def _filter_dict(obj: Dict[str, Any]) -> Dict[str, Any]:
-            """递归过滤字典"""
-            filtered = {}
-            for key, value in obj.items():
-                if isinstance(value, dict):
-                    filtered[key] = _filter_dict(value)
-                elif isinstance(value, list):
-                    filtered[key] = [_filter_dict(item) if isinstance(item, dict) else self._filter_value(key, item) for item in value]
-                else:
-                    filtered[key] = self._filter_value(key, value)
-            return filtered
-        
-        return _filter_dict(event_dict)
+        return self._filter_dict(event_dict)
+    
+    def _filter_dict(self, obj: Dict[str, Any]) -> Dict[str, Any]:
+        """递归过滤字典 (无改动时返回原对象)"""
+        decisions = self._decisions
+        filtered = None
+        for key, value in obj.items():
+            if isinstance(value, dict):
+                new_value = self._filter_dict(value)
+            elif isinstance(value, list):
+                new_value = self._filter_list(key, value)
+            else:
+                sensitive = decisions.get(key)
+                if sensitive is None:
+                    sensitive = self._is_sensitive(key)
+                if not sensitive:
+                    continue
+                new_value = self._mask(value)
+            if new_value is not value:
+                if filtered is None:
+                    filtered = dict(obj)
+                filtered[key] = new_value
+        return obj if filtered is None else filtered
+    
+    def _filter_list(self, key: Any, items: List[Any]) -> List[Any]:
+        sensitive = self._is_sensitive(key)
+        filtered = [
+            self._filter_dict(item) if isinstance(item, dict) else self._mask(item) if sensitive else item
+            for item in items
+        ]
+        if all(new is old for new, old in zip(filtered, items)):
+            return items
+        return filtered
+    
+    def _is_sensitive(self, key: Any) -> bool:
+        """键名是否敏感 (结果缓存, 缓存满后不再新增)"""
+        sensitive = self._decisions.get(key)
+        if sensitive is None:
+            sensitive = (
+                self._pattern is not None
+                and isinstance(key, str)
+                and self._pattern.search(key.lower()) is not None
+            )
+            if len(self._decisions) < self._cache_size:
+                self._decisions[key] = sensitive
+        return sensitive
     
     def _filter_value(self, key: str, value: Any) -> Any:
         """过滤单个值"""
-        key_lower = key.lower()
-        if any(sensitive_key in key_lower for sensitive_key in self.SENSITIVE_KEYS):
-            if isinstance(value, str):
-                if len(value) <= 4:
-                    return "*" * len(value)
-                else:
-                    return value[:2] + "*" * (len(value) - 4) + value[-2:]
-            else:
-                return "***"
-        return value
+        return self._mask(value) if self._is_sensitive(key) else value
+    
+    @staticmethod
+    def _mask(value: Any) -> Any:
+        if isinstance(value, str):
+            if len(value) <= 4:
+                return "*" * len(value)
+            return value[:2] + "*" * (len(value) - 4) + value[-2:]
+        return "***"
 
 
 class RequestContextProcessor:
@@ -6,21 +6,44 @@
 - 内存使用监控
 - 响应时间统计
 - 并发性能分析
+- 事件循环延迟与慢回调探测
 """
 
 from __future__ import annotations
 
+from array import array
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Callable, Union
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Callable, Tuple, Union
 import asyncio
+import contextvars
+import math
+import re
+import sys
 import time
+import traceback
 import psutil
 import threading
+import weakref
 from collections import defaultdict, deque
 from contextlib import contextmanager
 import statistics
 
+from .logging import get_logger, request_id_var
+from .types import AppConfig
+
+
+# 标签集合: 排序后的 (name, value) 元组, 可哈希, 作为序列键
+LabelSet = Tuple[Tuple[str, str], ...]
+
+# 超出基数上限的新标签组合都并入这个序列
+OVERFLOW_LABELS: LabelSet = (("overflow", "true"),)
+
+SUMMARY_QUANTILES = (0.5, 0.95, 0.99)
+
+_frexp = math.frexp
+
 
 @dataclass
 class PerformanceMetrics:
@@ -47,51 +70,317 @@ class RequestMetrics:
     error_message: Optional[str] = None
 
 
+class LogHistogram:
+    """对数分桶直方图 (固定内存)
+
+    每个 2 的幂区间再线性切成 sub_buckets 个桶 (HDR 风格), 计数存在
+    array 中: 记录 O(1), 百分位 O(桶数), 内存与样本数无关。
+    以桶中点估计分位值, 相对误差约 1/(2*sub_buckets); min/max/mean 精确。
+    """
+
+    __slots__ = (
+        "lowest", "sub_buckets", "octaves", "counts", "count", "total", "total_sq", "min", "max",
+        "_scale", "_span", "_offset", "_last",
+    )
+
+    def __init__(self, lowest: float = 0.001, highest: float = 3_600_000.0, sub_buckets: int = 32) -> None:
+        self.lowest = lowest
+        self.sub_buckets = sub_buckets
+        # 第 0 个桶容纳小于 lowest 的值
+        self.octaves = math.frexp(highest / lowest)[1] + 1
+        self.counts = array("Q", bytes(8 * (self.octaves * sub_buckets + 1)))
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        # 记录路径用的预计算常量, 见 _index
+        self._scale = 1.0 / lowest
+        self._span = 2 * sub_buckets
+        self._offset = 1 - 2 * sub_buckets
+        self._last = len(self.counts) - 1
+
+    def _index(self, value: float) -> int:
+        if value < self.lowest:
+            return 0
+        # mantissa ∈ [0.5, 1): 区间内的线性位置;
+        # (exponent - 1) * S + int((2m - 1) * S) + 1 化简为 exponent * S + int(2mS) + 1 - 2S
+        mantissa, exponent = _frexp(value * self._scale)
+        index = exponent * self.sub_buckets + int(mantissa * self._span) + self._offset
+        return index if index < self._last else self._last
+
+    def _bucket_value(self, index: int) -> float:
+        # 低于 lowest / 超出 highest 的值落在首尾两个桶, 以实际极值估计
+        if index == 0:
+            return self.min
+        if index == self._last:
+            return self.max
+        octave, sub = divmod(index - 1, self.sub_buckets)
+        low = self.lowest * 2 ** octave * (1 + sub / self.sub_buckets)
+        return low * (1 + 0.5 / self.sub_buckets)
+
+    def record(self, value: float) -> None:
+        # 热路径: 与 _index 相同的计算, 内联以省去一次方法调用
+        if value < self.lowest:
+            index = 0
+        else:
+            mantissa, exponent = _frexp(value * self._scale)
+            index = exponent * self.sub_buckets + int(mantissa * self._span) + self._offset
+            if index > self._last:
+                index = self._last
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.total_sq += value * value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def copy(self) -> LogHistogram:
+        clone = LogHistogram.__new__(LogHistogram)
+        for name in self.__slots__:
+            setattr(clone, name, getattr(self, name))
+        clone.counts = array("Q", self.counts)
+        return clone
+
+    def merge(self, other: LogHistogram) -> None:
+        """合并另一个同参数直方图"""
+        counts = self.counts
+        for index, n in enumerate(other.counts):
+            if n:
+                counts[index] += n
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentiles(self, *percentiles: float) -> List[float]:
+        """一次遍历计算多个百分位 (0-100)"""
+        if not self.count:
+            return [0.0 for _ in percentiles]
+        targets = sorted((max(1, math.ceil(p / 100.0 * self.count)), i) for i, p in enumerate(percentiles))
+        results = [0.0] * len(percentiles)
+        seen, t = 0, 0
+        for index, n in enumerate(self.counts):
+            if not n:
+                continue
+            seen += n
+            while t < len(targets) and targets[t][0] <= seen:
+                value = self._bucket_value(index)
+                results[targets[t][1]] = min(max(value, self.min), self.max)
+                t += 1
+            if t == len(targets):
+                break
+        return results
+
+    def percentile(self, percentile: float) -> float:
+        return self.percentiles(percentile)[0]
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def stdev(self) -> float:
+        if self.count < 2:
+            return 0.0
+        variance = (self.total_sq - self.total * self.total / self.count) / (self.count - 1)
+        return math.sqrt(max(0.0, variance))
+
+    def statistics(self) -> Dict[str, float]:
+        if not self.count:
+            return {}
+        p50, p95, p99 = self.percentiles(50, 95, 99)
+        return {
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.mean,
+            "median": p50,
+            "p95": p95,
+            "p99": p99,
+            "stdev": self.stdev,
+        }
+
+    def clear(self) -> None:
+        for index in range(len(self.counts)):
+            self.counts[index] = 0
+        self.count = 0
+        self.total = self.total_sq = 0.0
+        self.min, self.max = math.inf, -math.inf
+
+
+class _MetricShard:
+    """单个线程的指标累加器: 只由所属线程写入, 读取时合并"""
+
+    __slots__ = ("counters", "histograms", "labels", "thread", "updated_at")
+
+    def __init__(self, thread: Optional[threading.Thread] = None) -> None:
+        self.counters: Dict[str, Dict[LabelSet, float]] = {}
+        self.histograms: Dict[str, Dict[LabelSet, LogHistogram]] = {}
+        # 指标名 -> {原始 tags 元组: 已准入的标签集合}, 命中时不需要排序和加锁
+        self.labels: Dict[str, Dict[Tuple[Tuple[str, str], ...], LabelSet]] = {}
+        self.thread = weakref.ref(thread) if thread is not None else None
+        self.updated_at = 0.0
+
+    @property
+    def alive(self) -> bool:
+        thread = self.thread() if self.thread is not None else None
+        return thread is not None and thread.is_alive()
+
+    def merge_into(self, target: _MetricShard) -> None:
+        for name, series in list(self.counters.items()):
+            merged = target.counters.setdefault(name, {})
+            for labels, value in list(series.items()):
+                merged[labels] = merged.get(labels, 0.0) + value
+        for name, series in list(self.histograms.items()):
+            merged_histograms = target.histograms.setdefault(name, {})
+            for labels, histogram in list(series.items()):
+                existing = merged_histograms.get(labels)
+                if existing is None:
+                    merged_histograms[labels] = histogram.copy()
+                else:
+                    existing.merge(histogram)
+        target.updated_at = max(target.updated_at, self.updated_at)
+
+    def discard(self, name: Optional[str] = None) -> None:
+        if name is None:
+            self.counters.clear()
+            self.histograms.clear()
+            self.labels.clear()
+            return
+        self.counters.pop(name, None)
+        self.histograms.pop(name, None)
+        self.labels.pop(name, None)
+
+
 class MetricsCollector:
-    """性能指标收集器"""
+    """性能指标收集器
+
+    计时指标 (record_timing) 写入对数直方图, get_statistics 直接读直方图,
+    不复制和排序历史记录; 其他指标仍按历史记录计算。
+
+    计数器和计时指标按 tags 分序列存储 (名称 + 标签集合), 同时可读取
+    不带标签的汇总值。每个指标的标签组合数不超过 max_series_per_metric,
+    超出的组合并入 overflow="true" 序列并计数。
+
+    increment_counter/record_timing 写入当前线程自己的分片, 不加锁、
+    不创建 PerformanceMetrics 对象; 读取时合并全部分片, 已结束线程的
+    分片并入 retired 分片。keep_history=True 时这两个方法也写历史记录
+    (get_metrics 可查), 代价是回到加锁路径。
+    """
     
-    def __init__(self, max_history: int = 10000) -> None:
+    def __init__(
+        self,
+        max_history: int = 10000,
+        max_series_per_metric: int = 500,
+        keep_history: bool = False,
+    ) -> None:
         self.max_history = max_history
+        self.max_series_per_metric = max_series_per_metric
+        self.keep_history = keep_history
         self._metrics: Dict[str, deque] = defaultdict(lambda: deque(maxlen=max_history))
-        self._counters: Dict[str, float] = defaultdict(float)
         self._gauges: Dict[str, float] = {}
-        self._histograms: Dict[str, List[float]] = defaultdict(list)
+        self._series: Dict[str, set] = defaultdict(set)
+        self._dropped_series: Dict[str, int] = defaultdict(int)
+        self._local = threading.local()
+        self._shards: List[_MetricShard] = []
+        self._retired = _MetricShard()
         self._lock = threading.RLock()
     
+    def _shard(self) -> _MetricShard:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _MetricShard(threading.current_thread())
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+    
+    def _labels(self, shard: _MetricShard, name: str, tags: Dict[str, str]) -> LabelSet:
+        cache = shard.labels.get(name)
+        if cache is None:
+            cache = shard.labels[name] = {}
+        key = tuple(tags.items())
+        labels = cache.get(key)
+        if labels is None:
+            labels = self._admit(name, tags)
+            # overflow 结果不缓存, 避免异常标签把缓存撑大
+            if labels is not OVERFLOW_LABELS:
+                cache[key] = labels
+        return labels
+    
+    def _admit(self, name: str, tags: Dict[str, str]) -> LabelSet:
+        """标签转为序列键; 超出基数上限时返回 overflow 序列"""
+        labels = tuple(sorted((str(k), str(v)) for k, v in tags.items()))
+        with self._lock:
+            known = self._series[name]
+            if labels in known or len(known) < self.max_series_per_metric:
+                known.add(labels)
+                return labels
+            self._dropped_series[name] += 1
+            return OVERFLOW_LABELS
+    
+    def _add_count(self, name: str, value: float, tags: Optional[Dict[str, str]]) -> None:
+        shard = self._shard()
+        labels = self._labels(shard, name, tags) if tags else ()
+        series = shard.counters.get(name)
+        if series is None:
+            series = shard.counters[name] = {}
+        series[labels] = series.get(labels, 0.0) + value
+        shard.updated_at = time.monotonic()
+    
+    def _add_timing(self, name: str, duration_ms: float, tags: Optional[Dict[str, str]]) -> None:
+        shard = self._shard()
+        labels = self._labels(shard, name, tags) if tags else ()
+        series = shard.histograms.get(name)
+        if series is None:
+            series = shard.histograms[name] = {}
+        histogram = series.get(labels)
+        if histogram is None:
+            histogram = series[labels] = LogHistogram()
+        histogram.record(duration_ms)
+        shard.updated_at = time.monotonic()
+    
     def record_metric(self, metric: PerformanceMetrics) -> None:
         """记录性能指标"""
         with self._lock:
             self._metrics[metric.name].append(metric)
             
-            # 更新计数器
-            if metric.unit == "count":
-                self._counters[metric.name] += metric.value
-            
             # 更新仪表盘
-            elif metric.unit in ["ms", "bytes", "num"]:
+            if metric.unit in ["ms", "bytes", "num"]:
                 self._gauges[metric.name] = metric.value
+        
+        # 更新计数器
+        if metric.unit == "count":
+            self._add_count(metric.name, metric.value, metric.tags)
     
     def increment_counter(self, name: str, value: float = 1.0, tags: Dict[str, str] = None) -> None:
         """增加计数器"""
-        metric = PerformanceMetrics(
-            name=name,
-            value=value,
-            unit="count",
-            timestamp=datetime.utcnow(),
-            tags=tags or {},
-        )
-        self.record_metric(metric)
+        if self.keep_history:
+            self.record_metric(PerformanceMetrics(
+                name=name,
+                value=value,
+                unit="count",
+                timestamp=datetime.utcnow(),
+                tags=tags or {},
+            ))
+            return
+        self._add_count(name, value, tags)
     
     def record_timing(self, name: str, duration_ms: float, tags: Dict[str, str] = None) -> None:
         """记录时间指标"""
-        metric = PerformanceMetrics(
-            name=name,
-            value=duration_ms,
-            unit="ms",
-            timestamp=datetime.utcnow(),
-            tags=tags or {},
-        )
-        self.record_metric(metric)
+        if self.keep_history:
+            self.record_metric(PerformanceMetrics(
+                name=name,
+                value=duration_ms,
+                unit="ms",
+                timestamp=datetime.utcnow(),
+                tags=tags or {},
+            ))
+        self._add_timing(name, duration_ms, tags)
     
     def record_memory_usage(self, process_id: int = None) -> None:
         """记录内存使用情况"""
@@ -120,9 +409,13 @@ class MetricsCollector:
         ))
     
     def record_cpu_usage(self, process_id: int = None) -> None:
-        """记录CPU使用情况"""
+        """记录CPU使用情况
+
+        不阻塞: 取与上一次调用之间的平均值 (首次调用为 0)。
+        需要持续采样时使用 ResourceMonitor。
+        """
         if process_id is None:
-            cpu_percent = psutil.cpu_percent(interval=0.1)
+            cpu_percent = psutil.cpu_percent(interval=None)
         else:
             process = psutil.Process(process_id)
             cpu_percent = process.cpu_percent()
@@ -139,16 +432,59 @@ class MetricsCollector:
         with self._lock:
             return list(self._metrics[name])[-limit:]
     
-    def get_counter(self, name: str) -> float:
-        """获取计数器值"""
-        return self._counters.get(name, 0.0)
+    def _snapshot(self, name: Optional[str] = None) -> _MetricShard:
+        """合并全部线程分片 (可只取一个指标); 已结束线程的分片并入 retired"""
+        merged = _MetricShard()
+        with self._lock:
+            for shard in [shard for shard in self._shards if not shard.alive]:
+                shard.merge_into(self._retired)
+                self._shards.remove(shard)
+            shards = [self._retired, *self._shards]
+        for shard in shards:
+            if name is None:
+                shard.merge_into(merged)
+                continue
+            view = _MetricShard()
+            if name in shard.counters:
+                view.counters[name] = shard.counters[name]
+            if name in shard.histograms:
+                view.histograms[name] = shard.histograms[name]
+            view.merge_into(merged)
+        return merged
+    
+    def get_counter(self, name: str, tags: Optional[Dict[str, str]] = None) -> float:
+        """获取计数器值 (指定 tags 时为对应序列的值)"""
+        series = self._snapshot(name).counters.get(name, {})
+        if tags:
+            labels = tuple(sorted((str(k), str(v)) for k, v in tags.items()))
+            return series.get(labels, 0.0)
+        return sum(series.values())
+    
+    def set_gauge(self, name: str, value: float) -> None:
+        """设置仪表盘值 (不写历史记录)"""
+        with self._lock:
+            self._gauges[name] = value
     
     def get_gauge(self, name: str) -> Optional[float]:
         """获取仪表盘值"""
         return self._gauges.get(name)
     
-    def get_statistics(self, name: str) -> Dict[str, float]:
-        """获取指标统计信息"""
+    def get_histogram(self, name: str, tags: Optional[Dict[str, str]] = None) -> Optional[LogHistogram]:
+        """获取计时指标的直方图 (合并后的副本; 不指定 tags 时为全部序列之和)"""
+        series = self._snapshot(name).histograms.get(name)
+        if not series:
+            return None
+        if tags:
+            return series.get(tuple(sorted((str(k), str(v)) for k, v in tags.items())))
+        return _merge_histograms(series.values())
+
+    def get_statistics(self, name: str, tags: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+        """获取指标统计信息 (计时指标为全部样本, 其他指标为最近的历史记录)"""
+        histogram = self.get_histogram(name, tags)
+        if histogram is not None:
+            return histogram.statistics()
+        if tags:
+            return {}
         metrics = self.get_metrics(name)
         if not metrics:
             return {}
@@ -182,17 +518,107 @@ class MetricsCollector:
             weight = index - lower_index
             return sorted_values[lower_index] * (1 - weight) + sorted_values[upper_index] * weight
     
+    def get_all_statistics(self) -> Dict[str, Dict[str, float]]:
+        """全部计时指标的统计信息 (供指标接口定期抓取)"""
+        histograms = self._snapshot().histograms
+        return {
+            name: _merge_histograms(series.values()).statistics()
+            for name, series in histograms.items()
+        }
+    
     def clear_metrics(self, name: str = None) -> None:
-        """清空指标"""
+        """清空指标 (与并发写入不同步, 用于测试和重置)"""
         with self._lock:
+            for shard in (self._retired, *self._shards):
+                shard.discard(name)
             if name:
                 self._metrics[name].clear()
-                self._counters.pop(name, None)
                 self._gauges.pop(name, None)
+                self._series.pop(name, None)
+                self._dropped_series.pop(name, None)
             else:
                 self._metrics.clear()
-                self._counters.clear()
                 self._gauges.clear()
+                self._series.clear()
+                self._dropped_series.clear()
+    
+    def export_prometheus(self) -> str:
+        """Prometheus 文本格式 (0.0.4)
+
+        计数器 -> counter, 仪表盘 -> gauge, 计时指标 -> summary
+        (分位数 + _sum/_count)。分位数在合并后的副本上计算, 不持有锁。
+        """
+        snapshot = self._snapshot()
+        counters, histograms = snapshot.counters, snapshot.histograms
+        with self._lock:
+            gauges = dict(self._gauges)
+            dropped = dict(self._dropped_series)
+        
+        lines: List[str] = []
+        for name, series in sorted(counters.items()):
+            metric = _metric_name(name)
+            lines.append(f"# TYPE {metric} counter")
+            for labels, value in sorted(series.items()):
+                lines.append(f"{metric}{_format_labels(labels)} {_format_value(value)}")
+        for name, value in sorted(gauges.items()):
+            if name in histograms:
+                # 计时指标以 summary 导出, 不再重复导出最近一次的值
+                continue
+            metric = _metric_name(name)
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {_format_value(value)}")
+        for name, series in sorted(histograms.items()):
+            metric = _metric_name(name)
+            lines.append(f"# TYPE {metric} summary")
+            for labels, histogram in sorted(series.items()):
+                values = histogram.percentiles(*(q * 100 for q in SUMMARY_QUANTILES))
+                for quantile, value in zip(SUMMARY_QUANTILES, values):
+                    quantile_labels = labels + (("quantile", str(quantile)),)
+                    lines.append(f"{metric}{_format_labels(quantile_labels)} {_format_value(value)}")
+                lines.append(f"{metric}_sum{_format_labels(labels)} {_format_value(histogram.total)}")
+                lines.append(f"{metric}_count{_format_labels(labels)} {histogram.count}")
+        if dropped:
+            lines.append("# TYPE metrics_series_overflow_total counter")
+            for name, count in sorted(dropped.items()):
+                lines.append(f'metrics_series_overflow_total{{metric="{_metric_name(name)}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+def _merge_histograms(histograms: Any) -> LogHistogram:
+    merged: Optional[LogHistogram] = None
+    for histogram in histograms:
+        if merged is None:
+            merged = histogram.copy()
+        else:
+            merged.merge(histogram)
+    return merged if merged is not None else LogHistogram()
+
+
+_INVALID_METRIC_CHARS = re.compile(r"[^a-zA-Z0-9_:]")
+
+
+def _metric_name(name: str) -> str:
+    name = _INVALID_METRIC_CHARS.sub("_", name)
+    return f"_{name}" if name[:1].isdigit() else name
+
+
+def _format_labels(labels: LabelSet) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        f'{_INVALID_METRIC_CHARS.sub("_", key)}="{_escape_label(value)}"' for key, value in labels
+    )
+    return "{" + pairs + "}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
 
 
 class RequestProfiler:
@@ -201,6 +627,8 @@ class RequestProfiler:
     def __init__(self, metrics_collector: MetricsCollector) -> None:
         self.metrics_collector = metrics_collector
         self.active_requests: Dict[str, RequestMetrics] = {}
+        # 单调时钟起点, 耗时不受系统时间调整影响
+        self._started: Dict[str, float] = {}
     
     def start_request(
         self,
@@ -220,6 +648,7 @@ class RequestProfiler:
             user_id=user_id,
             request_size=request_size,
         )
+        self._started[request_id] = time.perf_counter()
     
     def finish_request(
         self,
@@ -238,7 +667,7 @@ class RequestProfiler:
         request_metrics.error_message = error_message
         
         # 计算持续时间
-        duration_ms = (datetime.utcnow() - request_metrics.timestamp).total_seconds() * 1000
+        duration_ms = (time.perf_counter() - self._started.pop(request_id)) * 1000
         request_metrics.duration_ms = duration_ms
         
         # 记录指标
@@ -305,12 +734,12 @@ def performance_timer(
     tags: Dict[str, str] = None,
 ):
     """性能计时上下文管理器"""
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     try:
         yield
     finally:
-        duration_ms = (time.time() - start_time) * 1000
+        duration_ms = (time.perf_counter() - start_time) * 1000
         metrics_collector.record_timing(operation_name, duration_ms, tags)
 
 
@@ -330,13 +759,13 @@ class AsyncPerformanceTimer:
     
     async def __aenter__(self) -> AsyncPerformanceTimer:
         """异步上下文管理器入口"""
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()
         return self
     
     async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
         """异步上下文管理器出口"""
         if self.start_time:
-            duration_ms = (time.time() - self.start_time) * 1000
+            duration_ms = (time.perf_counter() - self.start_time) * 1000
             self.metrics_collector.record_timing(
                 self.operation_name,
                 duration_ms,
@@ -344,16 +773,104 @@ class AsyncPerformanceTimer:
             )
 
 
+@dataclass
+class ResourceSample:
+    """一次资源采样 (timestamp 为 time.monotonic())"""
+    timestamp: float
+    cpu_percent: float
+    process_cpu_percent: float
+    rss_bytes: int
+    memory_percent: float
+    open_fds: Optional[int]
+    load_avg_1m: float
+    load_avg_5m: float
+    load_avg_15m: float
+    disk_usage_percent: float
+    network_sent_bytes_per_sec: float
+    network_recv_bytes_per_sec: float
+    loop_lag_ms: float
+
+
+class _ResourceSampler:
+    """基于差值的资源采样器 (在线程中调用, 不 sleep)
+
+    CPU 与网络是两次采样之间的增量, 不依赖 psutil 的模块级状态,
+    也不会像 cpu_percent(interval=0.1) 那样阻塞等待。
+    """
+
+    def __init__(self, disk_path: str = "/") -> None:
+        self.disk_path = disk_path
+        self.process = psutil.Process()
+        self.process.cpu_percent(interval=None)
+        self._last_time = time.monotonic()
+        self._last_cpu = psutil.cpu_times()
+        self._last_net = psutil.net_io_counters()
+
+    def sample(self, loop_lag_ms: float = 0.0) -> ResourceSample:
+        now = time.monotonic()
+        elapsed = max(now - self._last_time, 1e-6)
+
+        cpu = psutil.cpu_times()
+        total = sum(cpu) - sum(self._last_cpu)
+        idle = (cpu.idle + getattr(cpu, "iowait", 0.0)) - (
+            self._last_cpu.idle + getattr(self._last_cpu, "iowait", 0.0)
+        )
+        cpu_percent = max(0.0, min(100.0, (1 - idle / total) * 100)) if total > 0 else 0.0
+
+        net = psutil.net_io_counters()
+        if net is not None and self._last_net is not None:
+            sent_rate = (net.bytes_sent - self._last_net.bytes_sent) / elapsed
+            recv_rate = (net.bytes_recv - self._last_net.bytes_recv) / elapsed
+        else:
+            sent_rate = recv_rate = 0.0
+
+        with self.process.oneshot():
+            rss = self.process.memory_info().rss
+            memory_percent = self.process.memory_percent()
+            process_cpu = self.process.cpu_percent(interval=None)
+            open_fds = self.process.num_fds() if hasattr(self.process, "num_fds") else None
+
+        load_1m, load_5m, load_15m = psutil.getloadavg()
+        disk_percent = psutil.disk_usage(self.disk_path).percent
+
+        self._last_time, self._last_cpu, self._last_net = now, cpu, net
+        return ResourceSample(
+            timestamp=now,
+            cpu_percent=cpu_percent,
+            process_cpu_percent=process_cpu,
+            rss_bytes=rss,
+            memory_percent=memory_percent,
+            open_fds=open_fds,
+            load_avg_1m=load_1m,
+            load_avg_5m=load_5m,
+            load_avg_15m=load_15m,
+            disk_usage_percent=disk_percent,
+            network_sent_bytes_per_sec=max(0.0, sent_rate),
+            network_recv_bytes_per_sec=max(0.0, recv_rate),
+            loop_lag_ms=loop_lag_ms,
+        )
+
+
 class ResourceMonitor:
-    """资源监控器"""
+    """资源监控器
+
+    psutil 调用全部放到线程中执行, 事件循环上只剩一次 sleep; 采样
+    间隔 (interval_seconds) 可配置, 历史保存在定长环形缓冲中。
+    sleep 的超时量记为 resource_monitor_sleep_overshoot_ms (循环被同步代码占用时
+    唤醒会推迟); 细粒度的事件循环延迟由 LoopLagMonitor 记录。
+    """
     
     def __init__(
         self,
         metrics_collector: MetricsCollector,
         interval_seconds: float = 5.0,
+        history_size: int = 720,
+        disk_path: str = "/",
     ) -> None:
         self.metrics_collector = metrics_collector
         self.interval_seconds = interval_seconds
+        self.disk_path = disk_path
+        self.samples: deque = deque(maxlen=history_size)
         self._monitoring = False
         self._monitor_task: Optional[asyncio.Task] = None
     
@@ -375,69 +892,219 @@ class ResourceMonitor:
             except asyncio.CancelledError:
                 pass
     
+    def latest(self) -> Optional[ResourceSample]:
+        """最近一次采样"""
+        return self.samples[-1] if self.samples else None
+    
     async def _monitor_loop(self) -> None:
         """监控循环"""
+        sampler: Optional[_ResourceSampler] = None
         while self._monitoring:
+            if sampler is None:
+                try:
+                    sampler = await asyncio.to_thread(_ResourceSampler, self.disk_path)
+                except Exception:
+                    # 初始化失败同样计入监控错误, 下个间隔重试
+                    self.metrics_collector.increment_counter("monitoring_errors_total")
+            started = time.monotonic()
+            await asyncio.sleep(self.interval_seconds)
+            loop_lag_ms = max(0.0, (time.monotonic() - started - self.interval_seconds) * 1000)
+            if sampler is None:
+                continue
             try:
-                # 记录系统资源使用情况
-                self.metrics_collector.record_cpu_usage()
-                self.metrics_collector.record_memory_usage()
-                
-                # 记录系统负载
-                load_avg = psutil.getloadavg()
-                self.metrics_collector.record_metric(PerformanceMetrics(
-                    name="system_load_avg_1m",
-                    value=load_avg[0],
-                    unit="load",
-                    timestamp=datetime.utcnow(),
-                ))
-                
-                self.metrics_collector.record_metric(PerformanceMetrics(
-                    name="system_load_avg_5m",
-                    value=load_avg[1],
-                    unit="load",
-                    timestamp=datetime.utcnow(),
-                ))
-                
-                self.metrics_collector.record_metric(PerformanceMetrics(
-                    name="system_load_avg_15m",
-                    value=load_avg[2],
-                    unit="load",
-                    timestamp=datetime.utcnow(),
-                ))
-                
-                # 记录磁盘使用情况
-                disk_usage = psutil.disk_usage('/')
-                self.metrics_collector.record_metric(PerformanceMetrics(
-                    name="disk_usage_percent",
-                    value=disk_usage.percent,
-                    unit="percent",
-                    timestamp=datetime.utcnow(),
-                ))
-                
-                # 记录网络统计
-                network_io = psutil.net_io_counters()
-                if network_io:
-                    self.metrics_collector.record_metric(PerformanceMetrics(
-                        name="network_bytes_sent",
-                        value=network_io.bytes_sent,
-                        unit="bytes",
-                        timestamp=datetime.utcnow(),
-                    ))
-                    
-                    self.metrics_collector.record_metric(PerformanceMetrics(
-                        name="network_bytes_recv",
-                        value=network_io.bytes_recv,
-                        unit="bytes",
-                        timestamp=datetime.utcnow(),
-                    ))
-                
-                await asyncio.sleep(self.interval_seconds)
-                
-            except Exception as e:
+                sample = await asyncio.to_thread(sampler.sample, loop_lag_ms)
+            except Exception:
                 # 记录监控错误，但不中断监控
                 self.metrics_collector.increment_counter("monitoring_errors_total")
-                await asyncio.sleep(self.interval_seconds)
+                continue
+            self.samples.append(sample)
+            self._publish(sample)
+    
+    def _publish(self, sample: ResourceSample) -> None:
+        collector = self.metrics_collector
+        # 与 LoopLagMonitor 的 event_loop_lag_ms 采样间隔不同, 单独成序列
+        collector.record_timing("resource_monitor_sleep_overshoot_ms", sample.loop_lag_ms)
+        gauges = {
+            "cpu_usage_percent": sample.cpu_percent,
+            "process_cpu_percent": sample.process_cpu_percent,
+            "memory_usage_bytes": sample.rss_bytes,
+            "memory_usage_percent": sample.memory_percent,
+            "system_load_avg_1m": sample.load_avg_1m,
+            "system_load_avg_5m": sample.load_avg_5m,
+            "system_load_avg_15m": sample.load_avg_15m,
+            "disk_usage_percent": sample.disk_usage_percent,
+            "network_sent_bytes_per_sec": sample.network_sent_bytes_per_sec,
+            "network_recv_bytes_per_sec": sample.network_recv_bytes_per_sec,
+        }
+        if sample.open_fds is not None:
+            gauges["process_open_fds"] = sample.open_fds
+        for name, value in gauges.items():
+            collector.set_gauge(name, value)
+
+
+@dataclass
+class SlowCallback:
+    """一次事件循环阻塞 (duration_ms 为阻塞时长下限: 心跳应唤醒时刻之后的部分)"""
+    timestamp: float
+    duration_ms: float
+    request_id: Optional[str]
+    task_name: Optional[str]
+    stack: List[str]
+
+
+class LoopLagMonitor:
+    """事件循环延迟与慢回调探测
+
+    - 心跳协程每 interval_seconds 醒来一次, 唤醒的推迟量即循环延迟,
+      持续记入 event_loop_lag_ms
+    - 看门狗线程只比较时间戳: 心跳超过 threshold_ms 仍未醒来, 说明有回调正在
+      阻塞循环, 此时抓取循环线程的调用栈和当前任务上下文中的 request_id
+    - 循环恢复后, 心跳把这次阻塞记为 slow_callbacks_total / slow_callback_duration_ms
+      并输出一条结构化日志
+
+    没有慢回调时, 循环上只有每个间隔一次唤醒与一次 record_timing。
+    """
+
+    def __init__(
+        self,
+        metrics_collector: MetricsCollector,
+        threshold_ms: float = 100.0,
+        interval_seconds: float = 0.05,
+        stack_limit: int = 30,
+        history_size: int = 100,
+    ) -> None:
+        self.metrics_collector = metrics_collector
+        self.threshold_ms = threshold_ms
+        self.interval_seconds = interval_seconds
+        self.stack_limit = stack_limit
+        self.reports: deque = deque(maxlen=history_size)
+        self.logger = get_logger(__name__)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        # 心跳应当醒来的时刻 (perf_counter), 心跳醒来后置为 None
+        self._deadline: Optional[float] = None
+        self._captured: Optional[Tuple[float, Optional[str], Optional[str], List[str]]] = None
+        self._task_contexts: "weakref.WeakKeyDictionary[asyncio.Task, Any]" = weakref.WeakKeyDictionary()
+        self._previous_task_factory: Optional[Callable[..., Any]] = None
+
+    async def start(self) -> None:
+        """在要监控的事件循环中调用"""
+        if self._heartbeat_task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._install_task_factory()
+        self._stopped.clear()
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        if self._heartbeat_task is None:
+            return
+        self._stopped.set()
+        self._heartbeat_task.cancel()
+        try:
+            await self._heartbeat_task
+        except asyncio.CancelledError:
+            pass
+        self._heartbeat_task = None
+        if self._loop is not None and self._loop.get_task_factory() == self._task_factory:
+            self._loop.set_task_factory(self._previous_task_factory)
+        await asyncio.to_thread(self._watchdog.join)
+        self._watchdog = None
+        self._deadline = None
+
+    async def _heartbeat(self) -> None:
+        collector = self.metrics_collector
+        interval = self.interval_seconds
+        while True:
+            deadline = time.perf_counter() + interval
+            self._deadline = deadline
+            await asyncio.sleep(interval)
+            lag_ms = max(0.0, (time.perf_counter() - deadline) * 1000)
+            self._deadline = None
+            collector.record_timing("event_loop_lag_ms", lag_ms)
+            if lag_ms >= self.threshold_ms:
+                self._report(deadline, lag_ms)
+
+    def _watch(self) -> None:
+        """看门狗线程: 阻塞期间抓取现场, 每次阻塞只抓一次"""
+        poll = min(self.interval_seconds, self.threshold_ms / 2000)
+        while not self._stopped.wait(poll):
+            deadline = self._deadline
+            if deadline is None or (self._captured is not None and self._captured[0] == deadline):
+                continue
+            if (time.perf_counter() - deadline) * 1000 >= self.threshold_ms:
+                self._captured = (deadline, *self._capture())
+
+    def _capture(self) -> Tuple[Optional[str], Optional[str], List[str]]:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_list(traceback.extract_stack(frame, limit=self.stack_limit)) if frame else []
+        del frame
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            task = None
+        if task is None:
+            return None, None, stack
+        context = self._task_context(task)
+        request_id = context.get(request_id_var) if context is not None else None
+        return request_id, task.get_name(), stack
+
+    def _task_context(self, task: asyncio.Task) -> Any:
+        get_context = getattr(task, "get_context", None)
+        if get_context is not None:
+            return get_context()
+        return self._task_contexts.get(task)
+
+    def _install_task_factory(self) -> None:
+        """Task.get_context() (3.12+) 不可用时, 通过任务工厂记下每个任务的上下文"""
+        if hasattr(asyncio.Task, "get_context") or sys.version_info < (3, 11):
+            return
+        self._previous_task_factory = self._loop.get_task_factory()
+        self._loop.set_task_factory(self._task_factory)
+
+    def _task_factory(self, loop: asyncio.AbstractEventLoop, coro: Any, context: Any = None) -> asyncio.Future:
+        context = context if context is not None else contextvars.copy_context()
+        factory = self._previous_task_factory
+        if factory is None:
+            task = asyncio.Task(coro, loop=loop, context=context)
+        else:
+            task = factory(loop, coro, context=context)
+        self._task_contexts[task] = context
+        return task
+
+    def _report(self, deadline: float, lag_ms: float) -> None:
+        captured, self._captured = self._captured, None
+        if captured is not None and captured[0] == deadline:
+            _, request_id, task_name, stack = captured
+        else:
+            # 阻塞时长刚过阈值时看门狗可能来不及抓取现场
+            request_id = task_name = None
+            stack = []
+        report = SlowCallback(
+            timestamp=time.time(),
+            duration_ms=lag_ms,
+            request_id=request_id,
+            task_name=task_name,
+            stack=stack,
+        )
+        self.reports.append(report)
+        self.metrics_collector.increment_counter("slow_callbacks_total")
+        self.metrics_collector.record_timing("slow_callback_duration_ms", lag_ms)
+        self.logger.warning(
+            "事件循环阻塞",
+            operation="slow_callback",
+            duration_ms=round(lag_ms, 3),
+            threshold_ms=self.threshold_ms,
+            request_id=request_id,
+            task_name=task_name,
+            stack="".join(stack),
+        )
 
 
 class PerformanceBenchmark:
@@ -471,15 +1138,16 @@ class PerformanceBenchmark:
         memory_before = psutil.Process().memory_info().rss
         
         for _ in range(iterations):
-            start_time = time.time()
+            start_time = time.perf_counter()
             func(*args, **kwargs)
-            end_time = time.time()
+            end_time = time.perf_counter()
             
             execution_times.append((end_time - start_time) * 1000)  # 转换为毫秒
         
         memory_after = psutil.Process().memory_info().rss
         
-        # 计算统计信息
+        # 计算统计信息 (排序一次, 供各百分位共用)
+        sorted_times = sorted(execution_times)
         results = {
             "iterations": iterations,
             "warmup_iterations": warmup_iterations,
@@ -487,9 +1155,9 @@ class PerformanceBenchmark:
             "avg_time_ms": statistics.mean(execution_times),
             "min_time_ms": min(execution_times),
             "max_time_ms": max(execution_times),
-            "median_time_ms": statistics.median(execution_times),
-            "p95_time_ms": self._percentile(execution_times, 95),
-            "p99_time_ms": self._percentile(execution_times, 99),
+            "median_time_ms": self._percentile(sorted_times, 50, presorted=True),
+            "p95_time_ms": self._percentile(sorted_times, 95, presorted=True),
+            "p99_time_ms": self._percentile(sorted_times, 99, presorted=True),
             "stdev_time_ms": statistics.stdev(execution_times) if len(execution_times) > 1 else 0.0,
             "memory_delta_bytes": memory_after - memory_before,
             "throughput_per_sec": iterations / (sum(execution_times) / 1000.0),
@@ -514,12 +1182,12 @@ class PerformanceBenchmark:
         
         return results
     
-    def _percentile(self, values: List[float], percentile: float) -> float:
+    def _percentile(self, values: List[float], percentile: float, presorted: bool = False) -> float:
         """计算百分位数"""
         if not values:
             return 0.0
         
-        sorted_values = sorted(values)
+        sorted_values = values if presorted else sorted(values)
         index = (percentile / 100.0) * (len(sorted_values) - 1)
         
         if index.is_integer():
@@ -553,6 +1221,71 @@ class PerformanceBenchmark:
         }
 
 
+class MetricsServer:
+    """Prometheus 指标接口: GET /metrics, 在后台线程中运行, 不占用事件循环"""
+    
+    def __init__(self, metrics_collector: MetricsCollector, host: str = "0.0.0.0", port: int = 9090) -> None:
+        self.metrics_collector = metrics_collector
+        self.host = host
+        self.requested_port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def port(self) -> int:
+        """实际监听端口 (port=0 时由系统分配)"""
+        return self._server.server_address[1] if self._server else self.requested_port
+    
+    def start(self) -> None:
+        if self._server is not None:
+            return
+        collector = self.metrics_collector
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = collector.export_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+        
+        self._server = ThreadingHTTPServer((self.host, self.requested_port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="metrics-server", daemon=True
+        )
+        self._thread.start()
+    
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
+
+
+def start_metrics_server(
+    config: AppConfig,
+    metrics_collector: Optional[MetricsCollector] = None,
+) -> Optional[MetricsServer]:
+    """按配置在 metrics_port 上启动指标接口 (enable_metrics 关闭时返回 None)"""
+    if not config.enable_metrics:
+        return None
+    collector = metrics_collector or get_global_metrics_collector()
+    collector.max_series_per_metric = config.metrics_max_series
+    server = MetricsServer(collector, host=config.host, port=config.metrics_port)
+    server.start()
+    return server
+
+
 # 全局指标收集器实例
 _global_metrics_collector = MetricsCollector()
 _global_profiler = RequestProfiler(_global_metrics_collector)
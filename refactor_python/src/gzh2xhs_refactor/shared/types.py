@@ -261,6 +261,7 @@ class AppConfig:
     # 监控配置
     enable_metrics: bool = True
     metrics_port: int = 9090
+    metrics_max_series: int = 500  # 每个指标的标签组合上限
     sentry_dsn: Optional[str] = None
 
 
@@ -8,6 +8,10 @@
 - GetTaskStatusUseCase 测试
 """
 
+import asyncio
+import os
+import zipfile
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 
@@ -22,6 +26,8 @@ from gzh2xhs_refactor.application.use_cases import (
     GetTaskStatusInput,
 )
 from gzh2xhs_refactor.domain.entities import GenerationTask, Card, UserId, CardId
+from gzh2xhs_refactor.infrastructure.services.batch_exporter import BatchExporter
+from gzh2xhs_refactor.infrastructure.services.image_renderer import RenderPriority, RenderResult
 from gzh2xhs_refactor.shared.errors import ValidationError, QuotaExceededError
 from gzh2xhs_refactor.shared.types import PaginationParams
 
@@ -108,8 +114,8 @@ class TestGenerateCardUseCase:
         
         # 验证调用
         mock_validation_service.validate_generation_request.assert_called_once()
-        mock_business_rule_service.consume_user_quota.assert_called_once_with(
-            "user_456", "generation"
+        mock_business_rule_service.reserve_quota.assert_called_once_with(
+            "user_456", "generation", 1
         )
     
     @pytest.mark.asyncio
@@ -177,7 +183,7 @@ class TestGenerateCardUseCase:
     ) -> None:
         """测试配额超限错误"""
         # 设置配额不足
-        mock_business_rule_service.is_operation_allowed.return_value = False
+        mock_business_rule_service.reserve_quota.return_value = False
         
         # 执行用例
         input_data = GenerateCardInput(
@@ -205,25 +211,51 @@ class TestExportCardUseCase:
     @pytest.fixture
     def mock_business_rule_service(self) -> MagicMock:
         """模拟业务规则服务"""
-        return MagicMock()
+        service = MagicMock()
+        service.reserve_quota = AsyncMock(return_value=True)
+        service.release_quota = AsyncMock()
+        return service
     
     @pytest.fixture
     def mock_validation_service(self) -> MagicMock:
         """模拟验证服务"""
         return MagicMock()
     
+    @pytest.fixture
+    def mock_card_repository(self) -> MagicMock:
+        """模拟卡片仓库: card_missing 不存在, 其余卡片都已生成"""
+        async def get_by_id(card_id: str) -> object:
+            if card_id == "card_missing":
+                return None
+            card = MagicMock()
+            card.render_result.svg_content = f"<svg id='{card_id}'/>"
+            return card
+        
+        repository = MagicMock()
+        repository.get_by_id = get_by_id
+        return repository
+    
     @pytest.fixture
     def use_case(
         self,
         mock_cache_service: MagicMock,
         mock_business_rule_service: MagicMock,
         mock_validation_service: MagicMock,
+        mock_card_repository: MagicMock,
+        tmp_path: object,
     ) -> ExportCardUseCase:
         """创建导出卡片用例实例"""
+        renderer = MagicMock()
+        renderer.render_svg_to_image = AsyncMock(
+            return_value=RenderResult(success=True, image_data=b"png")
+        )
         return ExportCardUseCase(
             cache_service=mock_cache_service,
             business_rule_service=mock_business_rule_service,
             validation_service=mock_validation_service,
+            card_repository=mock_card_repository,
+            batch_exporter=BatchExporter(renderer, concurrency=2),
+            output_dir=str(tmp_path),
         )
     
     @pytest.mark.asyncio
@@ -231,10 +263,11 @@ class TestExportCardUseCase:
         self,
         use_case: ExportCardUseCase,
         mock_business_rule_service: MagicMock,
+        mock_validation_service: MagicMock,
     ) -> None:
         """测试成功导出"""
         # 设置业务规则检查通过
-        mock_business_rule_service.is_operation_allowed.return_value = True
+        mock_business_rule_service.reserve_quota.return_value = True
         
         # 执行用例
         input_data = ExportCardInput(
@@ -252,13 +285,41 @@ class TestExportCardUseCase:
         assert result.failed_count == 0
         assert len(result.files) == 2
         
+        assert zipfile.ZipFile(result.archive_path).namelist().count("card_1.png") == 1
+        
         # 验证调用
         mock_validation_service.validate_export_request.assert_called_once_with(
             ["card_1", "card_2"]
         )
-        mock_business_rule_service.consume_user_quota.assert_called_once_with(
+        mock_business_rule_service.reserve_quota.assert_called_once_with(
             "user_456", "export", 2
         )
+        mock_business_rule_service.release_quota.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_partial_export(
+        self,
+        use_case: ExportCardUseCase,
+        mock_business_rule_service: MagicMock,
+    ) -> None:
+        """测试部分成功: 缺失的卡片计为失败, 失败部分的配额退回"""
+        input_data = ExportCardInput(
+            card_ids=["card_1", "card_missing"],
+            user_id="user_456",
+        )
+        
+        result = await use_case.execute(input_data)
+        
+        assert result.success
+        assert result.success_count == 1
+        assert result.failed_count == 1
+        assert result.failures[0]["key"] == "card_missing"
+        mock_business_rule_service.reserve_quota.assert_called_once_with(
+            "user_456", "export", 2
+        )
+        mock_business_rule_service.release_quota.assert_called_once_with(
+            "user_456", "export", 1
+        )
     
     @pytest.mark.asyncio
     async def test_validation_error(
@@ -295,7 +356,7 @@ class TestExportCardUseCase:
     ) -> None:
         """测试配额超限错误"""
         # 设置配额不足
-        mock_business_rule_service.is_operation_allowed.return_value = False
+        mock_business_rule_service.reserve_quota.return_value = False
         
         # 执行用例
         input_data = ExportCardInput(
@@ -312,6 +373,62 @@ class TestExportCardUseCase:
         assert result.success_count == 0
         assert result.failed_count == 1
 
+    
+    @pytest.mark.asyncio
+    async def test_failed_export_removes_partial_archive(
+        self,
+        use_case: ExportCardUseCase,
+        mock_business_rule_service: MagicMock,
+        tmp_path: object,
+    ) -> None:
+        """测试导出中途异常: 删除写了一半的压缩包并退回全部配额"""
+        written = []
+        
+        async def export_cards(items: list, path: str, **kwargs: object) -> None:
+            with open(path, "wb") as output:
+                output.write(b"PK partial")
+            written.append(path)
+            raise OSError("磁盘已满")
+        
+        use_case._batch_exporter = MagicMock()
+        use_case._batch_exporter.export_cards = export_cards
+        
+        result = await use_case.execute(
+            ExportCardInput(card_ids=["card_1", "card_2"], user_id="user_456")
+        )
+        
+        assert not result.success
+        assert written and not os.path.exists(written[0])
+        assert os.listdir(str(tmp_path)) == []
+        mock_business_rule_service.release_quota.assert_called_once_with(
+            "user_456", "export", 2
+        )
+    
+    @pytest.mark.asyncio
+    async def test_batch_mode_selects_render_priority(
+        self,
+        use_case: ExportCardUseCase,
+    ) -> None:
+        """测试 batch_mode 决定渲染优先级"""
+        priorities = []
+        
+        async def add_render_task(**kwargs: object) -> asyncio.Future:
+            priorities.append(kwargs["priority"])
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(RenderResult(success=True, image_data=b"png"))
+            return future
+        
+        render_queue = MagicMock()
+        render_queue.add_render_task = add_render_task
+        use_case._batch_exporter.render_queue = render_queue
+        
+        for batch_mode in (True, False):
+            result = await use_case.execute(
+                ExportCardInput(card_ids=["card_1"], user_id="user_456", batch_mode=batch_mode)
+            )
+            assert result.success
+        
+        assert priorities == [RenderPriority.BATCH, RenderPriority.STANDARD]
 
 class TestGetUserCardsUseCase:
     """测试获取用户卡片用例"""
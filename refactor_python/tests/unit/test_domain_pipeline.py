@@ -0,0 +1,80 @@
+"""
+领域层单元测试 - 生成流水线
+
+验证各阶段并发上限, 以及渲染与其他卡片的 LLM 阶段重叠执行。
+"""
+
+import asyncio
+
+import pytest
+
+from gzh2xhs_refactor.domain.pipeline import (
+    STAGE_DESIGN,
+    STAGE_RENDER,
+    GenerationPipeline,
+    PipelineStage,
+)
+
+
+class TestPipelineStage:
+    """测试流水线阶段"""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit_and_stats(self) -> None:
+        stage = PipelineStage("render", 2)
+        active = peak = 0
+
+        async def job() -> None:
+            nonlocal active, peak
+            async with stage.slot():
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        await asyncio.gather(*(job() for _ in range(6)))
+        stats = stage.stats()
+
+        assert peak == 2
+        assert stats["completed"] == 6
+        assert stats["active"] == 0
+        assert stats["waiting"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failure_releases_slot(self) -> None:
+        stage = PipelineStage("design", 1)
+
+        with pytest.raises(RuntimeError):
+            async with stage.slot():
+                raise RuntimeError("boom")
+        async with stage.slot():
+            pass
+
+        assert stage.stats()["failed"] == 1
+        assert stage.stats()["completed"] == 1
+
+
+class TestGenerationPipeline:
+    """测试流水线整体行为"""
+
+    @pytest.mark.asyncio
+    async def test_render_overlaps_llm_stages(self) -> None:
+        pipeline = GenerationPipeline(design_concurrency=4, svg_concurrency=4, render_concurrency=1)
+        overlapped = False
+        rendering = 0
+
+        async def card(index: int) -> None:
+            nonlocal overlapped, rendering
+            async with pipeline.stage(STAGE_DESIGN).slot():
+                await asyncio.sleep(0.01 * (index + 1))
+                overlapped = overlapped or rendering > 0
+            async with pipeline.stage(STAGE_RENDER).slot():
+                rendering += 1
+                await asyncio.sleep(0.03)
+                rendering -= 1
+
+        await asyncio.gather(*(card(i) for i in range(4)))
+
+        assert overlapped
+        assert pipeline.capacity == 9
+        assert pipeline.stats()[STAGE_RENDER]["completed"] == 4
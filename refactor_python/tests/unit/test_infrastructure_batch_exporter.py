@@ -0,0 +1,109 @@
+"""
+基础设施层单元测试 - 批量导出
+
+使用伪造的渲染器验证并发上限、流式 ZIP 输出与部分成功报告。
+"""
+
+import asyncio
+import io
+import json
+import zipfile
+
+import pytest
+
+from gzh2xhs_refactor.infrastructure.services.batch_exporter import (
+    MANIFEST_NAME,
+    BatchExporter,
+    BatchExportReport,
+    ExportItem,
+)
+from gzh2xhs_refactor.infrastructure.services.image_renderer import (
+    RenderOptions,
+    RenderResult,
+)
+
+
+class CountingRenderer:
+    """记录并发数的伪造渲染器; svg 为 "fail" 时渲染失败"""
+
+    def __init__(self, delay: float = 0.01) -> None:
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+
+    async def render_svg_to_image(self, svg_content: str, options: RenderOptions) -> RenderResult:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if svg_content == "fail":
+            return RenderResult(success=False, error_message="渲染失败")
+        return RenderResult(success=True, image_data=svg_content.encode() * 100)
+
+
+def _items(count: int, failing: int = -1) -> list:
+    return [
+        ExportItem(name=f"card_{i}", svg_content="fail" if i == failing else f"<svg {i}>", key=str(i))
+        for i in range(count)
+    ]
+
+
+class TestBatchExporter:
+    """测试批量导出器"""
+
+    @pytest.mark.asyncio
+    async def test_streams_zip_with_partial_success(self) -> None:
+        renderer = CountingRenderer()
+        exporter = BatchExporter(renderer, concurrency=3)
+        report = BatchExportReport()
+
+        chunks = [
+            chunk
+            async for chunk in exporter.iter_zip(_items(10, failing=4), RenderOptions(), report)
+        ]
+
+        # 每张成功的卡片各产出一个字节块, 最后一块是 manifest 与中央目录
+        assert len(chunks) == 10
+        assert renderer.max_active == 3
+        assert report.total == 10
+        assert report.success_count == 9
+        assert report.failed_count == 1
+        assert report.failed[0]["key"] == "4"
+
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+        assert archive.testzip() is None
+        assert sorted(archive.namelist()) == sorted(
+            [f"card_{i}.png" for i in range(10) if i != 4] + [MANIFEST_NAME]
+        )
+        assert archive.read("card_0.png") == b"<svg 0>" * 100
+        manifest = json.loads(archive.read(MANIFEST_NAME))
+        assert manifest["success_count"] == 9
+        assert manifest["failures"][0]["error"] == "渲染失败"
+
+    @pytest.mark.asyncio
+    async def test_slow_consumer_bounds_inflight_results(self) -> None:
+        """写入方变慢时渲染协程被背压, 不会把整批结果堆在内存里"""
+        renderer = CountingRenderer(delay=0)
+        exporter = BatchExporter(renderer, concurrency=2)
+        report = BatchExportReport()
+
+        async for _ in exporter.iter_zip(_items(20), RenderOptions(), report):
+            # 已渲染但尚未写入的卡片数不超过 2×concurrency
+            assert report.total - report.success_count <= 2 * exporter.concurrency + 1
+            await asyncio.sleep(0.001)
+
+        assert report.success_count == 20
+
+    @pytest.mark.asyncio
+    async def test_duplicate_names_are_unique(self, tmp_path: object) -> None:
+        exporter = BatchExporter(CountingRenderer(delay=0), concurrency=2)
+        items = [ExportItem(name="../同名", svg_content="<svg>") for _ in range(3)]
+        path = f"{tmp_path}/out.zip"
+
+        report = await exporter.export_to_file(items, RenderOptions(), path)
+
+        assert report.success_count == 3
+        names = zipfile.ZipFile(path).namelist()
+        assert sorted(names) == sorted(["同名.png", "同名_2.png", "同名_3.png", MANIFEST_NAME])
@@ -0,0 +1,189 @@
+"""
+基础设施层单元测试 - 图像渲染
+
+使用伪造的浏览器页面验证渲染流程与渲染队列调度, 无需真实浏览器。
+"""
+
+import asyncio
+
+import pytest
+
+from gzh2xhs_refactor.infrastructure.services.image_renderer import (
+    PAINT_READY_SCRIPT,
+    PlaywrightRenderer,
+    RenderOptions,
+    RenderPriority,
+    RenderQueue,
+    RenderResult,
+)
+from gzh2xhs_refactor.shared.errors import RateLimitError
+
+
+class FakePage:
+    """伪造的 Playwright 页面"""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.calls: list = []
+        self.closed = False
+        self.fail = fail
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    def set_default_timeout(self, timeout: int) -> None:
+        self.calls.append("set_default_timeout")
+
+    async def set_viewport_size(self, size: dict) -> None:
+        self.calls.append("set_viewport_size")
+
+    async def set_content(self, html: str, wait_until: str) -> None:
+        self.calls.append(("set_content", wait_until))
+
+    async def evaluate(self, script: str) -> None:
+        self.calls.append(("evaluate", script))
+
+    async def screenshot(self, **kwargs: object) -> bytes:
+        if self.fail:
+            raise RuntimeError("截图失败")
+        return b"png-bytes"
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeContext:
+    """伪造的浏览器上下文"""
+
+    def __init__(self, fail_first: bool = False) -> None:
+        self.pages: list = []
+        self.fail_first = fail_first
+
+    async def new_page(self) -> FakePage:
+        page = FakePage(fail=self.fail_first and not self.pages)
+        self.pages.append(page)
+        return page
+
+
+@pytest.fixture
+def renderer() -> PlaywrightRenderer:
+    renderer = PlaywrightRenderer(page_pool_size=1)
+    renderer.context = FakeContext()
+    renderer._page_slots = asyncio.Semaphore(1)
+    renderer._initialized = True
+    return renderer
+
+
+class TestPlaywrightRenderer:
+    """测试 Playwright 渲染器"""
+
+    @pytest.mark.asyncio
+    async def test_renders_in_memory_with_paint_ready_signal(
+        self, renderer: PlaywrightRenderer
+    ) -> None:
+        """测试使用 set_content 与字体/绘制就绪信号, 而非固定等待"""
+        result = await renderer.render_svg_to_image("<svg></svg>", RenderOptions())
+
+        assert result.success
+        assert result.image_data == b"png-bytes"
+        calls = renderer.context.pages[0].calls
+        assert ("set_content", "domcontentloaded") in calls
+        assert ("evaluate", PAINT_READY_SCRIPT) in calls
+
+    @pytest.mark.asyncio
+    async def test_pages_are_reused(self, renderer: PlaywrightRenderer) -> None:
+        """测试连续渲染复用同一页面"""
+        for _ in range(3):
+            await renderer.render_svg_to_image("<svg></svg>", RenderOptions())
+
+        assert len(renderer.context.pages) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_page_is_discarded(
+        self, renderer: PlaywrightRenderer
+    ) -> None:
+        """测试渲染失败的页面被关闭且不再复用"""
+        renderer.context = FakeContext(fail_first=True)
+
+        failed = await renderer.render_svg_to_image("<svg></svg>", RenderOptions())
+        assert not failed.success
+        assert renderer.context.pages[0].closed
+
+        result = await renderer.render_svg_to_image("<svg></svg>", RenderOptions())
+        assert result.success
+        assert len(renderer.context.pages) == 2
+
+
+class SlowRenderer:
+    """记录执行顺序的伪渲染器"""
+
+    def __init__(self) -> None:
+        self.order: list = []
+        self.release = asyncio.Event()
+
+    async def render_svg_to_image(
+        self, svg_content: str, options: RenderOptions
+    ) -> RenderResult:
+        await self.release.wait()
+        self.order.append(svg_content)
+        return RenderResult(success=True, image_data=b"png")
+
+
+class TestRenderQueue:
+    """测试渲染优先级队列"""
+
+    @pytest.mark.asyncio
+    async def test_higher_priority_runs_first(self) -> None:
+        """测试交互式任务先于批量导出执行"""
+        queue = RenderQueue(max_concurrent=1, queue_size=10)
+        renderer = SlowRenderer()
+
+        # 第一个任务占住唯一的工作协程
+        first = await queue.add_render_task("t0", "first", RenderOptions(), renderer)
+        await asyncio.sleep(0)
+        batch = await queue.add_render_task(
+            "t1", "batch", RenderOptions(), renderer, priority=RenderPriority.BATCH
+        )
+        preview = await queue.add_render_task(
+            "t2", "preview", RenderOptions(), renderer,
+            priority=RenderPriority.INTERACTIVE,
+        )
+        renderer.release.set()
+        await asyncio.gather(first, batch, preview)
+
+        assert renderer.order == ["first", "preview", "batch"]
+        stats = queue.get_queue_stats()
+        assert stats["by_priority"]["batch"]["completed"] == 1
+        assert stats["by_priority"]["interactive"]["completed"] == 1
+        assert stats["queue_depth"] == 0
+        await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_applies_backpressure_then_rejects(self) -> None:
+        """测试队列满时等待空位, 不等待或超时则返回 429"""
+        queue = RenderQueue(max_concurrent=1, queue_size=1)
+        renderer = SlowRenderer()
+        await queue.add_render_task("t0", "a", RenderOptions(), renderer)
+        await asyncio.sleep(0)
+        await queue.add_render_task("t1", "b", RenderOptions(), renderer)
+
+        with pytest.raises(RateLimitError) as exc_info:
+            await queue.add_render_task(
+                "t2", "c", RenderOptions(), renderer, wait=False
+            )
+        assert exc_info.value.error_code == "RENDER_QUEUE_FULL"
+        assert exc_info.value.details["status_code"] == 429
+
+        with pytest.raises(RateLimitError):
+            await queue.add_render_task(
+                "t3", "d", RenderOptions(), renderer, timeout=0.01
+            )
+
+        waiting = asyncio.create_task(
+            queue.add_render_task("t4", "e", RenderOptions(), renderer)
+        )
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+        renderer.release.set()
+        assert (await (await waiting)).success
+        assert queue.get_queue_stats()["by_priority"]["standard"]["rejected"] == 2
+        await queue.stop()
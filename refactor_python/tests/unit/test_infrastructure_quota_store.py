@@ -0,0 +1,142 @@
+"""
+基础设施层单元测试 - 配额存储
+
+验证原子扣减不超额、令牌缓存减少存储访问、过期令牌自动退回, 以及业务规则服务的预扣/退回。
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from gzh2xhs_refactor.domain.entities import User, UserId
+from gzh2xhs_refactor.domain.services import BusinessRuleService
+from gzh2xhs_refactor.infrastructure.services.quota_store import (
+    QuotaTokenCache,
+    SQLiteQuotaStore,
+)
+
+
+async def _stores(path: str, count: int) -> list:
+    stores = [SQLiteQuotaStore(path) for _ in range(count)]
+    for store in stores:
+        await store.initialize()
+    return stores
+
+
+class TestSQLiteQuotaStore:
+    """测试原子配额存储"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_consume_never_exceeds_limit(self, tmp_path: object) -> None:
+        # 两个连接模拟两个 worker 共享同一个库
+        stores = await _stores(f"{tmp_path}/quota.db", 2)
+        results = await asyncio.gather(*(
+            stores[i % 2].try_consume("user_1", "generation", 1, 10) for i in range(30)
+        ))
+
+        assert sum(results) == 10
+        assert await stores[0].get_used("user_1", "generation") == 10
+
+        await stores[1].refund("user_1", "generation", 3)
+        assert await stores[0].try_consume("user_1", "generation", 3, 10)
+        assert not await stores[0].try_consume("user_1", "generation", 1, 10)
+        # 单次请求超过上限时不会建行
+        assert not await stores[0].try_consume("user_2", "export", 11, 10)
+        assert await stores[0].get_used("user_2", "export") == 0
+        for store in stores:
+            await store.close()
+
+
+class TestQuotaTokenCache:
+    """测试令牌缓存"""
+
+    @pytest.mark.asyncio
+    async def test_hot_user_served_locally(self, tmp_path: object) -> None:
+        (store,) = await _stores(f"{tmp_path}/quota.db", 1)
+        cache = QuotaTokenCache(store, lease_size=5, hot_after=2)
+
+        for _ in range(12):
+            assert await cache.try_consume("user_1", "generation", 1, 100)
+        stats = cache.stats()
+
+        assert stats["local_hits"] >= 8
+        assert stats["store_calls"] <= 4
+        assert await cache.get_used("user_1", "generation") == 12
+
+        await cache.flush()
+        assert await store.get_used("user_1", "generation") == 12
+        await store.close()
+
+    @pytest.mark.asyncio
+    async def test_leases_respect_global_limit(self, tmp_path: object) -> None:
+        stores = await _stores(f"{tmp_path}/quota.db", 2)
+        caches = [QuotaTokenCache(store, lease_size=4, hot_after=1) for store in stores]
+
+        granted = 0
+        for i in range(20):
+            granted += await caches[i % 2].try_consume("user_1", "generation", 1, 7)
+
+        assert granted == 7
+        for cache in caches:
+            await cache.flush()
+        assert await stores[0].get_used("user_1", "generation") == 7
+        for store in stores:
+            await store.close()
+
+
+    @pytest.mark.asyncio
+    async def test_lease_is_capped_at_remaining_quota(self, tmp_path: object) -> None:
+        (store,) = await _stores(f"{tmp_path}/quota.db", 1)
+
+        assert await store.try_lease("user_1", "generation", 1, 10, 8) == 7
+        assert await store.get_used("user_1", "generation") == 8
+        assert await store.try_lease("user_1", "generation", 1, 10, 8) is None
+        await store.refund("user_1", "generation", 2)
+        assert await store.try_lease("user_1", "generation", 1, 10, 8) == 1
+        await store.close()
+
+    @pytest.mark.asyncio
+    async def test_expired_leases_are_refunded_without_new_requests(self, tmp_path: object) -> None:
+        stores = await _stores(f"{tmp_path}/quota.db", 2)
+        cache = QuotaTokenCache(stores[0], lease_size=10, ttl=0.05, hot_after=1)
+
+        for _ in range(3):
+            assert await cache.try_consume("user_1", "generation", 1, 20)
+        assert await stores[0].get_used("user_1", "generation") == 11
+
+        # 本 worker 之后不再有请求, 过期令牌仍由清扫任务退回
+        await asyncio.sleep(0.2)
+        assert await stores[0].get_used("user_1", "generation") == 3
+        assert cache.stats()["leases"] == 0
+
+        # 另一个 worker 可以用满剩余额度
+        granted = [await stores[1].try_consume("user_1", "generation", 1, 20) for _ in range(17)]
+        assert all(granted)
+        await cache.flush()
+        for store in stores:
+            await store.close()
+
+class TestBusinessRuleServiceQuota:
+    """测试业务规则服务的预扣与退回"""
+
+    @pytest.mark.asyncio
+    async def test_reserve_and_release_batch(self, tmp_path: object) -> None:
+        (store,) = await _stores(f"{tmp_path}/quota.db", 1)
+        user = User(id=UserId("user_1"), username="u", preferences={"export_quota": 10})
+        repository = MagicMock()
+        repository.get_by_id = AsyncMock(return_value=user)
+        service = BusinessRuleService(repository, quota_store=store)
+
+        assert await service.reserve_quota("user_1", "export", 8)
+        assert not await service.reserve_quota("user_1", "export", 3)
+        await service.release_quota("user_1", "export", 2)
+        assert await service.reserve_quota("user_1", "export", 4)
+
+        # 每次预扣只读一次用户
+        assert repository.get_by_id.await_count == 3
+        assert await store.get_used("user_1", "export") == 10
+
+        user.is_active = False
+        assert not await service.reserve_quota("user_1", "generation")
+        await store.close()
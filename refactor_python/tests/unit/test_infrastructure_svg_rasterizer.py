@@ -0,0 +1,246 @@
+"""
+基础设施层单元测试 - 原生SVG光栅化
+
+验证常见 Stage B 元素的像素输出, 以及不支持特性时回退到浏览器渲染。
+"""
+
+import asyncio
+import io
+
+import pytest
+from PIL import Image
+
+from gzh2xhs_refactor.infrastructure.services import image_renderer
+from gzh2xhs_refactor.infrastructure.services.image_renderer import (
+    PillowRenderer,
+    PlaywrightRenderer,
+    RenderOptions,
+)
+from gzh2xhs_refactor.infrastructure.services.svg_rasterizer import (
+    FontConfig,
+    UnsupportedSVGFeatureError,
+    parse_path,
+    rasterize_svg,
+)
+from gzh2xhs_refactor.shared.errors import RenderServiceError
+
+
+requires_font = pytest.mark.skipif(
+    not FontConfig().resolve("regular"), reason="系统中没有可用字体"
+)
+
+
+def _render(svg: str, width: int = 100, height: int = 100) -> Image.Image:
+    return Image.open(io.BytesIO(rasterize_svg(svg, width, height))).convert("RGB")
+
+
+def _svg(body: str, size: int = 100) -> str:
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" '
+        f'viewBox="0 0 {size} {size}">{body}</svg>'
+    )
+
+
+class TestRasterizeSVG:
+    """测试原生光栅化"""
+
+    def test_rect_fill_and_viewbox_scaling(self) -> None:
+        """viewBox 等比缩放到输出尺寸"""
+        image = _render(_svg('<rect x="0" y="0" width="5" height="5" fill="#ff0000"/>', 10))
+        assert image.getpixel((20, 20)) == (255, 0, 0)
+        assert image.getpixel((75, 75)) == (255, 255, 255)
+
+    def test_opacity_blends_with_background(self) -> None:
+        """半透明高亮条与背景混合"""
+        image = _render(_svg('<rect width="100" height="100" fill="#000" opacity="0.5"/>'))
+        r, g, b = image.getpixel((50, 50))
+        assert 120 <= r <= 135 and r == g == b
+
+    def test_rgba_alpha_is_a_fraction(self) -> None:
+        """rgba() 的 alpha 是 0~1 小数 (或百分比), 并与 opacity 相乘"""
+        image = _render(_svg(
+            '<rect width="50" height="100" fill="rgba(255, 0, 0, 1)"/>'
+            '<rect x="50" width="50" height="100" fill="rgba(0,0,0,0.5)"/>'
+        ))
+        assert image.getpixel((25, 50)) == (255, 0, 0)
+        r, g, b = image.getpixel((75, 50))
+        assert 120 <= r <= 135 and r == g == b
+
+        image = _render(_svg('<rect width="100" height="100" fill="rgb(0 0 0 / 100%)" opacity="0.5"/>'))
+        r, g, b = image.getpixel((50, 50))
+        assert 120 <= r <= 135 and r == g == b
+
+    def test_polyline_default_fill_matches_browser(self) -> None:
+        """未设置 fill 的 polyline 与浏览器一样填充黑色, line 不填充"""
+        image = _render(_svg('<polyline points="0,0 100,0 100,100"/>'))
+        assert image.getpixel((90, 20)) == (0, 0, 0)
+        assert image.getpixel((20, 90)) == (255, 255, 255)
+
+        image = _render(_svg('<line x1="0" y1="0" x2="100" y2="100"/>'))
+        assert image.getpixel((90, 20)) == (255, 255, 255)
+
+    def test_path_evenodd_hole(self) -> None:
+        """多个子路径按 even-odd 镂空"""
+        image = _render(_svg('<path d="M10 10h80v80h-80z M30 30h40v40h-40z" fill="blue"/>'))
+        assert image.getpixel((20, 20)) == (0, 0, 255)
+        assert image.getpixel((50, 50)) == (255, 255, 255)
+
+    def test_pattern_tiles(self) -> None:
+        """点阵 pattern 平铺"""
+        image = _render(_svg(
+            '<defs><pattern id="p" width="10" height="10" patternUnits="userSpaceOnUse">'
+            '<rect width="5" height="5" fill="#000"/></pattern></defs>'
+            '<rect width="100" height="100" fill="url(#p)"/>'
+        ))
+        assert image.getpixel((12, 12)) == (0, 0, 0)
+        assert image.getpixel((17, 17)) == (255, 255, 255)
+        assert image.getpixel((92, 2)) == (0, 0, 0)
+
+    @requires_font
+    def test_text_anchor_middle(self) -> None:
+        """text-anchor=middle 时文字以 x 为中心"""
+        image = _render(
+            _svg('<text x="100" y="60" font-size="40" text-anchor="middle" fill="#000">HH</text>', 200),
+            200,
+            200,
+        )
+        dark = [x for x in range(200) if image.getpixel((x, 45))[0] < 128]
+        assert dark
+        assert abs((min(dark) + max(dark)) / 2 - 100) < 4
+
+    @pytest.mark.parametrize(
+        "body",
+        [
+            '<defs><linearGradient id="g"/></defs><rect width="5" height="5" fill="url(#g)"/>',
+            '<defs><filter id="f"/></defs><rect width="5" height="5" filter="url(#f)"/>',
+            '<foreignObject width="5" height="5"/>',
+            '<rect width="50%" height="5"/>',
+        ],
+    )
+    def test_unsupported_features_raise(self, body: str) -> None:
+        with pytest.raises(UnsupportedSVGFeatureError):
+            rasterize_svg(_svg(body), 10, 10)
+
+    def test_missing_glyph_is_unsupported(self) -> None:
+        """没有字体包含的字符交给浏览器"""
+        fonts = FontConfig(regular=FontConfig().resolve("regular"), emoji=())
+        if not fonts.regular:
+            pytest.skip("系统中没有可用字体")
+        with pytest.raises(UnsupportedSVGFeatureError):
+            rasterize_svg(_svg('<text x="0" y="50">\U0001F525</text>'), 100, 100, fonts=fonts)
+
+    def test_parse_path_relative_and_arcs(self) -> None:
+        subpaths = parse_path("m10 10 h20 v20 a10 10 0 0 1 -20 0 z")
+        points, closed = subpaths[0]
+        assert closed
+        assert points[:3] == [(10, 10), (30, 10), (30, 30)]
+        assert points[-1] == pytest.approx((10, 30))
+
+
+class FakePage:
+    """伪造的 Playwright 页面"""
+
+    def is_closed(self) -> bool:
+        return False
+
+    def set_default_timeout(self, timeout: int) -> None:
+        pass
+
+    async def set_viewport_size(self, size: dict) -> None:
+        pass
+
+    async def set_content(self, html: str, wait_until: str) -> None:
+        pass
+
+    async def evaluate(self, script: str) -> None:
+        pass
+
+    async def screenshot(self, **kwargs: object) -> bytes:
+        return b"browser"
+
+
+class FakeContext:
+    """伪造的浏览器上下文"""
+
+    async def new_page(self) -> FakePage:
+        return FakePage()
+
+    async def close(self) -> None:
+        pass
+
+
+class StubPlaywrightRenderer(PlaywrightRenderer):
+    """不启动浏览器的 Playwright 渲染器, 其余逻辑 (含初始化检查) 保持不变"""
+
+    instances: list = []
+
+    async def initialize(self) -> None:
+        self.context = FakeContext()
+        self._page_slots = asyncio.Semaphore(self.page_pool_size)
+        StubPlaywrightRenderer.instances.append(self)
+
+
+class BrokenPlaywrightRenderer(PlaywrightRenderer):
+    """初始化失败的 Playwright 渲染器"""
+
+    async def initialize(self) -> None:
+        raise RenderServiceError(message="浏览器启动失败", error_code="PLAYWRIGHT_INIT_FAILED")
+
+
+UNSUPPORTED_SVG = '<defs><radialGradient id="g"/></defs><rect width="5" height="5" fill="url(#g)"/>'
+
+
+class TestPillowRenderer:
+    """测试 Pillow 渲染器"""
+
+    @pytest.mark.asyncio
+    async def test_renders_in_process_pool(self) -> None:
+        renderer = PillowRenderer(max_workers=1)
+        async with renderer:
+            result = await renderer.render_svg_to_image(
+                _svg('<rect width="100" height="100" fill="#00ff00"/>'),
+                RenderOptions(width=20, height=20),
+            )
+        assert result.success
+        assert result.metadata["renderer"] == "Pillow"
+        image = Image.open(io.BytesIO(result.image_data))
+        assert image.size == (20, 20)
+        assert renderer.native_renders == 1
+
+    @pytest.mark.asyncio
+    async def test_unsupported_svg_falls_back(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        StubPlaywrightRenderer.instances.clear()
+        monkeypatch.setattr(image_renderer, "PlaywrightRenderer", StubPlaywrightRenderer)
+        renderer = PillowRenderer(use_process_pool=False)
+        for _ in range(2):
+            result = await renderer.render_svg_to_image(
+                _svg(UNSUPPORTED_SVG), RenderOptions(width=20, height=20)
+            )
+            assert result.success, result.error_message
+            assert result.image_data == b"browser"
+            assert result.metadata["renderer"] == "Playwright"
+            assert "fallback_reason" in result.metadata
+        # 回退渲染器只创建一次
+        assert len(StubPlaywrightRenderer.instances) == 1
+        assert renderer.fallback_renders == 2
+
+    @pytest.mark.asyncio
+    async def test_fallback_failure_reports_failure(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(image_renderer, "PlaywrightRenderer", BrokenPlaywrightRenderer)
+        renderer = PillowRenderer(use_process_pool=False)
+        result = await renderer.render_svg_to_image(
+            _svg(UNSUPPORTED_SVG), RenderOptions(width=20, height=20)
+        )
+        assert not result.success
+        assert "浏览器启动失败" in result.error_message
+        assert renderer.fallback_renders == 0
+
+    @pytest.mark.asyncio
+    async def test_without_fallback_reports_failure(self) -> None:
+        renderer = PillowRenderer(use_process_pool=False, fallback_renderer_type=None)
+        result = await renderer.render_svg_to_image(
+            _svg('<image href="x.png" width="5" height="5"/>'),
+            RenderOptions(width=20, height=20),
+        )
+        assert not result.success
+        assert "image" in result.error_message
@@ -0,0 +1,137 @@
+"""
+基础设施层单元测试 - 持久化任务执行器
+
+验证并发上限、任务落盘、优雅关闭与重启后恢复。
+"""
+
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from gzh2xhs_refactor.application.use_cases import (
+    GetTaskStatusInput,
+    GetTaskStatusUseCase,
+)
+from gzh2xhs_refactor.domain.entities import CardId, GenerationTask, UserId
+from gzh2xhs_refactor.infrastructure.services.task_runner import TaskRunner
+from gzh2xhs_refactor.infrastructure.services.task_store import SQLiteTaskStore
+from gzh2xhs_refactor.shared.errors import ServiceUnavailableError
+from gzh2xhs_refactor.shared.types import RenderResult
+
+
+def _task() -> GenerationTask:
+    return GenerationTask(id=uuid4(), card_id=CardId.generate(), user_id=UserId("user_1"))
+
+
+async def _wait_finished(runner: TaskRunner, task_id: str) -> GenerationTask:
+    for _ in range(200):
+        task = await runner.store.get_by_id(task_id)
+        if task is not None and task.is_finished:
+            return task
+        await asyncio.sleep(0.01)
+    raise AssertionError("任务未在预期时间内完成")
+
+
+class TestTaskRunner:
+    """测试任务执行器"""
+
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency_and_persisted_result(self, tmp_path: object) -> None:
+        path = f"{tmp_path}/tasks.db"
+        active = peak = 0
+
+        async def handler(task: GenerationTask, payload: dict) -> None:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            task.complete(RenderResult(svg_content=payload["svg"]))
+
+        runner = TaskRunner(SQLiteTaskStore(path), max_concurrency=2)
+        runner.register("demo", handler)
+        await runner.start()
+        tasks = [_task() for _ in range(6)]
+        for task in tasks:
+            await runner.submit(task, "demo", {"svg": "<svg/>"})
+        for task in tasks:
+            await _wait_finished(runner, str(task.id))
+        await runner.drain()
+
+        assert peak == 2
+        assert runner.stats()["completed"] == 6
+
+        # 新进程 (新连接) 仍能读到已完成的结果
+        store = SQLiteTaskStore(path)
+        await store.initialize()
+        use_case = GetTaskStatusUseCase(task_repository=store)
+        output = await use_case.execute(GetTaskStatusInput(task_id=str(tasks[0].id), user_id="user_1"))
+        await store.close()
+
+        assert output.status == "completed"
+        assert output.progress == 100.0
+        assert output.result_url
+
+    @pytest.mark.asyncio
+    async def test_drain_timeout_then_resume(self, tmp_path: object) -> None:
+        path = f"{tmp_path}/tasks.db"
+        release = asyncio.Event()
+        calls = []
+
+        async def handler(task: GenerationTask, payload: dict) -> None:
+            calls.append(str(task.id))
+            await release.wait()
+            task.complete(RenderResult(svg_content="<svg/>"))
+
+        runner = TaskRunner(SQLiteTaskStore(path), max_concurrency=1)
+        runner.register("demo", handler)
+        await runner.start()
+        running, queued = _task(), _task()
+        await runner.submit(running, "demo", {})
+        await runner.submit(queued, "demo", {})
+        await asyncio.sleep(0.05)
+
+        # 执行中的任务超时被中断, 排队中的任务未开始
+        await runner.drain(timeout=0.05)
+        store = SQLiteTaskStore(path)
+        await store.initialize()
+        assert (await store.get_by_id(str(running.id))).status == "processing"
+        assert (await store.get_by_id(str(queued.id))).status == "pending"
+        await store.close()
+
+        release.set()
+        restarted = TaskRunner(SQLiteTaskStore(path), max_concurrency=2)
+        restarted.register("demo", handler)
+        await restarted.start()
+        assert restarted.stats()["resumed"] == 2
+        for task in (running, queued):
+            assert (await _wait_finished(restarted, str(task.id))).is_completed
+        await restarted.drain()
+
+    @pytest.mark.asyncio
+    async def test_failures_and_attempt_limit(self, tmp_path: object) -> None:
+        async def handler(task: GenerationTask, payload: dict) -> None:
+            raise RuntimeError("AI 服务不可用")
+
+        runner = TaskRunner(SQLiteTaskStore(f"{tmp_path}/tasks.db"), max_attempts=1)
+        runner.register("demo", handler)
+        await runner.start()
+        task = _task()
+        await runner.submit(task, "demo", {})
+        finished = await _wait_finished(runner, str(task.id))
+
+        assert finished.is_failed
+        assert finished.error_message == "AI 服务不可用"
+        assert await runner.store.increment_attempts(str(task.id)) == 2
+        await runner.drain()
+
+    @pytest.mark.asyncio
+    async def test_rejects_after_drain(self, tmp_path: object) -> None:
+        runner = TaskRunner(SQLiteTaskStore(f"{tmp_path}/tasks.db"))
+        runner.register("demo", lambda task, payload: asyncio.sleep(0))
+        await runner.start()
+        await runner.drain()
+
+        with pytest.raises(ServiceUnavailableError):
+            await runner.submit(_task(), "demo", {})
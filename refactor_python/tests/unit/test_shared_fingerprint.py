@@ -0,0 +1,89 @@
+"""
+共享层单元测试 - 请求指纹
+
+验证缓存键跨进程稳定 (不同 PYTHONHASHSEED), 以及规范化规则。
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from gzh2xhs_refactor.domain.services import CacheService
+from gzh2xhs_refactor.shared.fingerprint import generation_fingerprint
+from gzh2xhs_refactor.shared.types import AIModel, CardSize, CardStyle, GenerationRequest
+
+
+SRC = str(Path(__file__).resolve().parents[2] / "src")
+
+TEXTS = ["公众号文章一", "第二篇\r\n内容  ", "Third article"]
+
+# 子进程: 用 CacheService 生成缓存键, 模拟另一个 worker
+CHILD = """
+import json, sys
+from gzh2xhs_refactor.domain.services import CacheService
+from gzh2xhs_refactor.shared.types import AIModel, CardStyle, GenerationRequest
+service = CacheService(cache_backend=None)
+print(json.dumps([
+    service._generate_cache_key(GenerationRequest(text=t, model=AIModel.DEEPSEEK, style=CardStyle.RICH))
+    for t in json.loads(sys.argv[1])
+]))
+"""
+
+
+class _SharedCache:
+    """模拟多 worker 共享的缓存 (Redis)"""
+
+    def __init__(self, data: dict) -> None:
+        self.data = data
+
+    async def get(self, key: str):
+        return self.data.get(key)
+
+    async def set(self, key: str, value, ttl: int) -> None:
+        self.data[key] = value
+
+
+def _keys_in_subprocess(hash_seed: str) -> list:
+    env = {**os.environ, "PYTHONHASHSEED": hash_seed, "PYTHONPATH": SRC}
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, json.dumps(TEXTS)],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+class TestRequestFingerprint:
+    """测试请求指纹"""
+
+    @pytest.mark.asyncio
+    async def test_cache_hits_across_processes(self) -> None:
+        # 另一个进程写入的缓存, 当前进程全部命中
+        shared = {key: {"card_id": key} for key in _keys_in_subprocess("1")}
+        assert _keys_in_subprocess("2") == list(shared)
+
+        service = CacheService(_SharedCache(shared))
+        hits = 0
+        for text in TEXTS:
+            request = GenerationRequest(text=text, model=AIModel.DEEPSEEK, style=CardStyle.RICH)
+            hits += await service.get_generation_result(request) is not None
+
+        assert hits == len(TEXTS)
+
+    def test_normalization(self) -> None:
+        base = GenerationRequest(text="你好\n世界", model=AIModel.DEEPSEEK)
+
+        same = GenerationRequest(text="  你好 \r\n世界\n", model=AIModel.DEEPSEEK)
+        as_strings = GenerationRequest(text="你好\n世界", model="deepseek", style="standard", size="4:5")
+        other_size = GenerationRequest(text="你好\n世界", model=AIModel.DEEPSEEK, size=CardSize.RATIO_1_1)
+        with_options = GenerationRequest(text="你好\n世界", model=AIModel.DEEPSEEK, options={"b": 1, "a": 2})
+        reordered = GenerationRequest(text="你好\n世界", model=AIModel.DEEPSEEK, options={"a": 2, "b": 1})
+
+        assert generation_fingerprint(same) == generation_fingerprint(base)
+        assert generation_fingerprint(as_strings) == generation_fingerprint(base)
+        assert generation_fingerprint(other_size) != generation_fingerprint(base)
+        assert generation_fingerprint(with_options) == generation_fingerprint(reordered)
+        assert generation_fingerprint(with_options) != generation_fingerprint(base)
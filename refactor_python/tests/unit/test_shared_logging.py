@@ -0,0 +1,70 @@
+"""
+共享层单元测试 - 日志脱敏
+
+验证敏感键脱敏规则、无敏感键时原样返回, 以及嵌套结构的写时复制。
+"""
+
+from gzh2xhs_refactor.shared.logging import SensitiveDataFilter
+
+
+class TestSensitiveDataFilter:
+    """测试敏感数据过滤处理器"""
+
+    def test_masks_keys_containing_sensitive_words(self) -> None:
+        event = {
+            "event": "用户登录",
+            "user_id": "u-1",
+            "Password": "hunter22",
+            "api_key": "sk",
+            "retry_count": 3,
+            "card_number_secret": 1234,
+        }
+
+        filtered = SensitiveDataFilter()(None, "info", event)
+
+        assert filtered == {
+            "event": "用户登录",
+            "user_id": "u-1",
+            "Password": "hu****22",
+            "api_key": "**",
+            "retry_count": 3,
+            "card_number_secret": "***",
+        }
+        assert event["Password"] == "hunter22"
+
+    def test_returns_same_dict_when_nothing_matches(self) -> None:
+        event = {
+            "event": "卡片生成完成",
+            "operation": "card_generation",
+            "card_id": "c-1",
+            "duration_ms": 12.5,
+            "context": {"template_id": "t-1", "tags": ["a", "b"]},
+        }
+
+        assert SensitiveDataFilter()(None, "info", event) is event
+
+    def test_nested_values_are_copied_on_write(self) -> None:
+        context = {"template_id": "t-1", "auth": {"access_token": "abcdefgh"}}
+        untouched = {"style": "minimal"}
+        event = {
+            "event": "应用错误",
+            "context": context,
+            "options": untouched,
+            "emails": ["alice@example.com", {"phone": "13800000000"}],
+        }
+
+        filtered = SensitiveDataFilter()(None, "error", event)
+
+        assert filtered["context"]["auth"]["access_token"] == "ab****gh"
+        assert filtered["context"]["template_id"] == "t-1"
+        assert filtered["options"] is untouched
+        assert filtered["emails"] == ["al*************om", {"phone": "13*******00"}]
+        assert context["auth"]["access_token"] == "abcdefgh"
+
+    def test_key_decisions_are_cached(self) -> None:
+        data_filter = SensitiveDataFilter(sensitive_keys={"token"}, cache_size=2)
+
+        data_filter(None, "info", {"refresh_token": "x", "event": "e", "level": "info"})
+
+        assert data_filter._decisions == {"refresh_token": True, "event": False}
+        assert data_filter._filter_value("level", "info") == "info"
@@ -0,0 +1,268 @@
+"""
+共享层单元测试 - 性能指标
+
+验证对数直方图的精度、固定内存与合并, 指标收集器的统计接口,
+按标签分序列、基数上限、Prometheus 导出、线程分片记录, 资源监控不阻塞事件循环,
+以及慢回调探测。
+"""
+
+import asyncio
+import random
+import threading
+import time
+from urllib.request import urlopen
+
+import pytest
+
+from gzh2xhs_refactor.shared import performance
+from gzh2xhs_refactor.shared.logging import set_request_context
+from gzh2xhs_refactor.shared.performance import (
+    LogHistogram,
+    LoopLagMonitor,
+    MetricsCollector,
+    MetricsServer,
+    RequestProfiler,
+    ResourceMonitor,
+)
+
+
+class TestLogHistogram:
+    """测试对数直方图"""
+
+    def test_percentiles_within_relative_error(self) -> None:
+        rng = random.Random(7)
+        values = [rng.lognormvariate(3, 1) for _ in range(20000)]
+        histogram = LogHistogram()
+        buckets = len(histogram.counts)
+        for value in values:
+            histogram.record(value)
+
+        exact = sorted(values)
+        for p in (50, 95, 99):
+            expected = exact[int(p / 100 * len(exact)) - 1]
+            assert histogram.percentile(p) == pytest.approx(expected, rel=0.02)
+
+        assert len(histogram.counts) == buckets
+        assert histogram.count == len(values)
+        assert histogram.min == min(values)
+        assert histogram.max == max(values)
+        assert histogram.mean == pytest.approx(sum(values) / len(values))
+
+    def test_merge_and_edge_values(self) -> None:
+        first, second = LogHistogram(), LogHistogram()
+        for value in (0.0, 0.5, 1.0):
+            first.record(value)
+        for value in (10.0, 1e9):
+            second.record(value)
+        first.merge(second)
+
+        assert first.count == 5
+        assert first.percentile(100) == 1e9
+        assert first.percentile(1) == 0.0
+        assert LogHistogram().statistics() == {}
+
+
+class TestMetricsCollector:
+    """测试指标收集器"""
+
+    def test_timing_statistics_from_histogram(self) -> None:
+        collector = MetricsCollector(max_history=10)
+        for value in range(1, 101):
+            collector.record_timing("request_duration_ms", float(value))
+
+        stats = collector.get_statistics("request_duration_ms")
+
+        # 直方图覆盖全部样本, 不受历史长度限制
+        assert stats["count"] == 100
+        assert stats["median"] == pytest.approx(50, rel=0.02)
+        assert stats["p99"] == pytest.approx(99, rel=0.02)
+        assert set(collector.get_all_statistics()) == {"request_duration_ms"}
+
+        collector.clear_metrics("request_duration_ms")
+        assert collector.get_statistics("request_duration_ms") == {}
+
+
+class TestLabeledSeries:
+    """测试按标签分序列与 Prometheus 导出"""
+
+    def test_series_are_split_by_tags(self) -> None:
+        collector = MetricsCollector()
+        profiler = RequestProfiler(collector)
+        for i, (endpoint, status) in enumerate([("/a", 200), ("/b", 200), ("/a", 200)]):
+            profiler.start_request(str(i), "GET", endpoint)
+            profiler.finish_request(str(i), status)
+
+        assert collector.get_counter("request_success_total") == 3
+        assert collector.get_counter("request_success_total", {"method": "GET", "endpoint": "/a"}) == 2
+        assert collector.get_statistics(
+            "request_duration_ms", {"method": "GET", "endpoint": "/b", "status_code": "200"}
+        )["count"] == 1
+
+    def test_cardinality_cap_and_exposition(self) -> None:
+        collector = MetricsCollector(max_series_per_metric=3)
+        for i in range(100):
+            collector.increment_counter("jobs_total", tags={"user": f"u{i}"})
+            collector.record_timing("job_ms", 5.0, tags={"user": f"u{i}"})
+
+        text = collector.export_prometheus()
+
+        assert collector.get_counter("jobs_total", {"overflow": "true"}) == 97
+        assert collector.get_counter("jobs_total") == 100
+        assert "# TYPE jobs_total counter" in text
+        assert 'jobs_total{user="u0"} 1.0' in text
+        assert 'job_ms{user="u1",quantile="0.99"} 5.0' in text
+        assert 'job_ms_count{overflow="true"} 97' in text
+        assert 'metrics_series_overflow_total{metric="job_ms"} 97' in text
+        # 每个指标最多 cap + 1 (overflow) 个序列
+        assert text.count("job_ms_count{") == 4
+        assert "# TYPE job_ms gauge" not in text
+
+    def test_metrics_server(self) -> None:
+        collector = MetricsCollector()
+        collector.increment_counter("requests_total", tags={"path": 'a"b'})
+        server = MetricsServer(collector, host="127.0.0.1", port=0)
+        server.start()
+        try:
+            with urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as response:
+                body = response.read().decode()
+                content_type = response.headers["Content-Type"]
+        finally:
+            server.stop()
+
+        assert content_type.startswith("text/plain; version=0.0.4")
+        assert 'requests_total{path="a\\"b"} 1.0' in body
+
+
+class TestShardedRecording:
+    """测试线程分片记录"""
+
+    def test_threads_merge_on_read(self) -> None:
+        collector = MetricsCollector()
+        tags = {"endpoint": "/a"}
+
+        def work() -> None:
+            for i in range(1000):
+                collector.increment_counter("jobs_total", tags=tags)
+                collector.record_timing("job_ms", float(i % 10 + 1), tags)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # 已结束线程的分片在读取时并入 retired, 数据不丢
+        assert collector.get_counter("jobs_total", tags) == 4000
+        assert collector.get_statistics("job_ms")["count"] == 4000
+        assert collector.get_counter("jobs_total") == 4000
+        assert collector._shards == []
+
+    def test_keep_history(self) -> None:
+        collector = MetricsCollector(keep_history=True)
+        collector.record_timing("job_ms", 3.0)
+        collector.increment_counter("jobs_total")
+
+        assert [m.value for m in collector.get_metrics("job_ms")] == [3.0]
+        assert collector.get_counter("jobs_total") == 1
+        assert collector.get_statistics("job_ms")["count"] == 1
+        assert MetricsCollector().get_metrics("job_ms") == []
+
+
+class TestResourceMonitor:
+    """测试资源监控器"""
+
+    @pytest.mark.asyncio
+    async def test_sampling_does_not_block_loop(self) -> None:
+        collector = MetricsCollector()
+        monitor = ResourceMonitor(collector, interval_seconds=0.02, history_size=3)
+        ticks = []
+
+        async def ticker() -> None:
+            for _ in range(20):
+                started = time.perf_counter()
+                await asyncio.sleep(0.005)
+                ticks.append(time.perf_counter() - started)
+
+        await monitor.start_monitoring()
+        await ticker()
+        await asyncio.sleep(0.1)
+        await monitor.stop_monitoring()
+
+        sample = monitor.latest()
+        assert sample is not None
+        assert len(monitor.samples) == 3
+        assert sample.rss_bytes > 0
+        assert 0.0 <= sample.cpu_percent <= 100.0
+        assert collector.get_gauge("memory_usage_bytes") == sample.rss_bytes
+        assert collector.get_statistics("resource_monitor_sleep_overshoot_ms")["count"] >= 3
+        assert collector.get_histogram("event_loop_lag_ms") is None
+        # 监控期间其他协程的唤醒没有被 psutil 调用拖慢
+        assert max(ticks) < 0.05
+
+    @pytest.mark.asyncio
+    async def test_sampler_init_failure_is_counted(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        def broken_sampler(disk_path: str) -> None:
+            raise OSError("psutil 不可用")
+
+        monkeypatch.setattr(performance, "_ResourceSampler", broken_sampler)
+        collector = MetricsCollector()
+        monitor = ResourceMonitor(collector, interval_seconds=0.01)
+        await monitor.start_monitoring()
+        await asyncio.sleep(0.1)
+        assert not monitor._monitor_task.done()
+        await monitor.stop_monitoring()
+
+        assert collector.get_counter("monitoring_errors_total") >= 2
+        assert monitor.latest() is None
+
+    def test_record_cpu_usage_is_non_blocking(self) -> None:
+        collector = MetricsCollector()
+        started = time.perf_counter()
+        collector.record_cpu_usage()
+        assert time.perf_counter() - started < 0.05
+
+
+def _blocking_hash() -> None:
+    time.sleep(0.3)
+
+
+class TestLoopLagMonitor:
+    """测试事件循环延迟与慢回调探测"""
+
+    @pytest.mark.asyncio
+    async def test_slow_callback_captures_stack_and_request_id(self) -> None:
+        collector = MetricsCollector()
+        monitor = LoopLagMonitor(collector, threshold_ms=50.0, interval_seconds=0.01)
+        await monitor.start()
+
+        async def handler() -> None:
+            set_request_context(request_id="req-42")
+            await asyncio.sleep(0.02)
+            _blocking_hash()
+
+        await asyncio.create_task(handler(), name="handler")
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+        assert collector.get_counter("slow_callbacks_total") == 1
+        report = monitor.reports[-1]
+        assert report.duration_ms >= 150
+        assert report.request_id == "req-42"
+        assert report.task_name == "handler"
+        assert "_blocking_hash" in "".join(report.stack)
+        assert collector.get_statistics("slow_callback_duration_ms")["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_no_reports_when_loop_is_idle(self) -> None:
+        collector = MetricsCollector()
+        monitor = LoopLagMonitor(collector, threshold_ms=100.0, interval_seconds=0.01)
+        loop = asyncio.get_running_loop()
+        factory = loop.get_task_factory()
+        await monitor.start()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+
+        assert collector.get_counter("slow_callbacks_total") == 0
+        assert len(monitor.reports) == 0
+        assert collector.get_statistics("event_loop_lag_ms")["count"] >= 3
+        assert loop.get_task_factory() is factory